@@ -1,18 +1,25 @@
 import streamlit as st
 import os
-from groq import Groq
-import tempfile
-from gtts import gTTS
 import audio_recorder_streamlit as ast
-from deep_translator import GoogleTranslator
 import time
 import numpy as np
-from dotenv import load_dotenv
 import logging
-from cryptography.fernet import Fernet
 import secrets
-from langdetect import detect, LangDetectException
-import datetime
+import re
+from core import (
+    security, languages, translation_memory, enhancement_policy, language_verifier, glossary, new_status,
+    PIPELINE_MODE, secure_transcribe_audio_bytes, secure_enhance_and_translate,
+    secure_stream_enhance_translate, secure_fan_out, secure_text_to_speech, secure_prerender_speech
+)
+from result_cache import PipelineResultCache, make_cache_key
+from streaming import StreamingTranscriber
+from telemetry import tracer
+from resources import registry
+from jobs import JobQueue
+from history_store import HistoryStore
+from secure_text import secure_scope
+from language_registry import language_registry
+from dispatcher import dispatcher
 
 # Configure basic logging
 logging.basicConfig(
@@ -21,36 +28,49 @@ logging.basicConfig(
     filename='app.log'
 )
 
-# Load environment variables
-load_dotenv()
-
-# Basic security setup
-class BasicSecurity:
-    def __init__(self):
-        # Generate or load encryption key
-        self.encryption_key = os.getenv("ENCRYPTION_KEY") or Fernet.generate_key()
-        self.cipher_suite = Fernet(self.encryption_key)
-
-    def encrypt_text(self, text):
-        """Encrypt sensitive text data"""
-        if isinstance(text, str):
-            return self.cipher_suite.encrypt(text.encode()).decode()
-        return text
-
-    def decrypt_text(self, encrypted_text):
-        """Decrypt sensitive text data"""
-        if isinstance(encrypted_text, str):
-            try:
-                return self.cipher_suite.decrypt(encrypted_text.encode()).decode()
-            except:
-                return None
-        return encrypted_text
-
-# Initialize security
-security = BasicSecurity()
-
-# Initialize Groq client
-client = Groq(api_key=os.getenv("api_key"))
+# In live mode the recorder hands back a clip after each short pause
+LIVE_PAUSE_THRESHOLD = 2.0
+
+# Show text and audio sentence by sentence while the LLM is still generating
+# (not available in the fused pipeline mode)
+STREAM_RESULTS = os.getenv("STREAM_RESULTS", "1") == "1" and PIPELINE_MODE != "fused"
+
+@st.cache_resource
+def get_result_cache():
+    """Process-wide cache of pipeline results, shared across reruns and sessions"""
+    # The disk tier is only usable with a stable key, otherwise entries written
+    # by one process could never be decrypted by the next
+    disk_dir = os.getenv("RESULT_CACHE_DIR") if os.getenv("ENCRYPTION_KEY") else None
+    return PipelineResultCache(
+        max_entries=int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "256")),
+        max_bytes=int(float(os.getenv("RESULT_CACHE_MAX_MB", "16")) * 1024 * 1024),
+        ttl_seconds=int(os.getenv("RESULT_CACHE_TTL", "3600")),
+        disk_dir=disk_dir,
+        cipher=security if disk_dir else None
+    )
+
+# Translations shown per page of the History tab
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "10"))
+
+@st.cache_resource
+def get_history_store():
+    """Process-wide encrypted conversation history of every session"""
+    # Like the result cache's disk tier, a history file needs a stable key
+    path = os.getenv("HISTORY_DB_PATH", "lingualink_history.db") if os.getenv("ENCRYPTION_KEY") else None
+    return HistoryStore(path=path, cipher=security)
+
+@st.cache_resource
+def get_job_queue():
+    """Process-wide pool that runs the pipeline outside the Streamlit script thread"""
+    return JobQueue(
+        max_workers=int(os.getenv("JOB_WORKERS", "4")),
+        max_queue=int(os.getenv("JOB_QUEUE_MAX", "16"))
+    )
+
+@st.cache_resource(show_spinner="Connecting to services...")
+def warm_resources():
+    """Build the shared clients and HTTP pools once, when the first session starts"""
+    return registry.warm()
 
 # Initialize session state
 if 'recording_state' not in st.session_state:
@@ -61,283 +81,478 @@ if 'language_error' not in st.session_state:
     st.session_state.language_error = False
 if 'error_message' not in st.session_state:
     st.session_state.error_message = ""
-# Initialize conversation history
-if 'conversation_history' not in st.session_state:
-    st.session_state.conversation_history = []
-
-# Language code mapping (reverse mapping from language code to language name)
-def get_lang_code_mapping():
-    # Create reverse mapping
-    reverse_lang_map = {}
-    for lang, code in languages.items():
-        reverse_lang_map[code] = lang
-    return reverse_lang_map
-
-# Language detection to ISO code mapping
-lang_detect_to_iso = {
-    'en': 'en', 'es': 'es', 'fr': 'fr', 'de': 'de', 'it': 'it', 'pt': 'pt',
-    'zh-cn': 'zh-CN', 'zh-tw': 'zh-TW', 'ja': 'ja', 'ko': 'ko', 'hi': 'hi',
-    'ar': 'ar', 'ru': 'ru', 'bn': 'bn', 'id': 'id', 'tr': 'tr', 'vi': 'vi',
-    'nl': 'nl', 'el': 'el', 'he': 'he', 'sv': 'sv', 'no': 'no', 'da': 'da',
-    'pl': 'pl', 'cs': 'cs', 'hu': 'hu', 'fi': 'fi', 'th': 'th', 'fil': 'fil',
-    'ms': 'ms', 'ur': 'ur', 'ta': 'ta', 'te': 'te', 'mr': 'mr', 'pa': 'pa',
-    'gu': 'gu', 'uk': 'uk', 'ro': 'ro', 'bg': 'bg', 'sr': 'sr', 'hr': 'hr',
-    'sk': 'sk', 'sl': 'sl', 'lt': 'lt', 'lv': 'lv', 'et': 'et', 'is': 'is',
-    'af': 'af', 'sq': 'sq', 'am': 'am', 'hy': 'hy', 'az': 'az', 'eu': 'eu',
-    'be': 'be', 'bs': 'bs', 'ca': 'ca', 'ceb': 'ceb', 'co': 'co', 'eo': 'eo',
-    'fy': 'fy', 'gl': 'gl', 'ka': 'ka', 'ht': 'ht', 'ha': 'ha', 'haw': 'haw',
-    'hmn': 'hmn', 'is': 'is', 'ig': 'ig', 'ga': 'ga', 'jw': 'jw', 'kn': 'kn',
-    'kk': 'kk', 'km': 'km', 'rw': 'rw', 'ku': 'ku', 'ky': 'ky', 'lo': 'lo',
-    'la': 'la', 'lb': 'lb', 'mk': 'mk', 'mg': 'mg', 'ml': 'ml', 'mt': 'mt',
-    'mi': 'mi', 'mn': 'mn', 'my': 'my', 'ne': 'ne', 'ny': 'ny', 'or': 'or',
-    'ps': 'ps', 'fa': 'fa', 'sm': 'sm', 'gd': 'gd', 'st': 'st', 'sn': 'sn',
-    'sd': 'sd', 'si': 'si', 'so': 'so', 'su': 'su', 'sw': 'sw', 'tl': 'tl',
-    'tg': 'tg', 'tt': 'tt', 'tk': 'tk', 'ug': 'ug', 'uz': 'uz', 'cy': 'cy',
-    'xh': 'xh', 'yi': 'yi', 'yo': 'yo', 'zu': 'zu'
-}
-
-def secure_save_audio(audio_bytes):
-    """Save audio with secure file handling"""
-    try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav', mode='wb') as f:
-            # Set secure file permissions (readable only by owner)
-            os.chmod(f.name, 0o600)
-            f.write(audio_bytes)
-            return f.name
-    except Exception as e:
-        logging.error(f"Error saving audio: {str(e)}")
-        return None
-
-def secure_transcribe_audio(audio_file, expected_lang_code):
-    """Transcribe audio with encryption and language validation"""
-    try:
-        with open(audio_file, "rb") as file:
-            # Instruct Whisper to focus on the expected language
-            transcription = client.audio.transcriptions.create(
-                file=(audio_file, file.read()),
-                model="whisper-large-v3",
-                response_format="verbose_json",
-                language=expected_lang_code  # Tell Whisper which language to expect
-            )
-            
-            # Get the transcribed text
-            transcribed_text = transcription.text
-            
-            # Verify the language of the transcribed text
-            try:
-                detected_lang = detect(transcribed_text)
-                
-                # Map detected language to ISO code for comparison
-                detected_iso = lang_detect_to_iso.get(detected_lang, detected_lang)
-                expected_iso = expected_lang_code
-                
-                # Normalize codes for comparison (some languages have different formats)
-                if detected_iso.lower() != expected_iso.lower() and detected_iso.split('-')[0] != expected_iso.split('-')[0]:
-                    reverse_lang_map = get_lang_code_mapping()
-                    st.session_state.language_error = True
-                    st.session_state.error_message = f"Language mismatch detected. You selected {reverse_lang_map.get(expected_iso, expected_iso)} but spoke in {reverse_lang_map.get(detected_iso, detected_iso)}."
-                    return None
-                
-                # Reset error state if no error
-                st.session_state.language_error = False
-                st.session_state.error_message = ""
-                
-            except LangDetectException:
-                # If language detection fails, proceed with caution but don't block
-                logging.warning("Language detection failed, proceeding with transcription")
-            
-            # Encrypt the transcribed text
-            return security.encrypt_text(transcribed_text)
-    except Exception as e:
-        logging.error(f"Transcription error: {str(e)}")
-        st.session_state.language_error = True
-        st.session_state.error_message = f"Error during transcription: {str(e)}"
-        return None
-    finally:
-        # Cleanup temporary file
-        try:
-            os.remove(audio_file)
-        except:
-            pass
-
-def secure_translate_text(encrypted_text, target_lang):
-    """Translate text with encryption"""
-    try:
-        # Decrypt for translation
-        decrypted_text = security.decrypt_text(encrypted_text)
-        if not decrypted_text:
-            return None
-
-        translator = GoogleTranslator(source='auto', target=target_lang)
-        translation = translator.translate(decrypted_text)
-
-        # Re-encrypt before returning
-        return security.encrypt_text(translation)
-    except Exception as e:
-        logging.error(f"Translation error: {str(e)}")
-        return None
-
-def secure_enhance_medical_terms(encrypted_text):
-    """Enhance medical terms with encryption"""
-    try:
-        # Decrypt for processing
-        decrypted_text = security.decrypt_text(encrypted_text)
-        if not decrypted_text:
-            return None
-
-        completion = client.chat.completions.create(
-            model="llama3-groq-70b-8192-tool-use-preview",
-            messages=[{
-                "role": "system",
-                "content": "You are a translation and transcription expert. Correct and enhance any terminology in the following text while preserving the original meaning. just translate what input you receive."
-            }, {
-                "role": "user",
-                "content": decrypted_text
-            }],
-            temperature=0.3,
-            max_tokens=1024
-        )
-
-        # Re-encrypt enhanced text
-        return security.encrypt_text(completion.choices[0].message.content)
-    except Exception as e:
-        logging.error(f"Medical term enhancement error: {str(e)}")
-        return encrypted_text
-
-def secure_text_to_speech(encrypted_text, lang_code):
-    """Convert text to speech with secure handling"""
-    try:
-        # Decrypt for TTS
-        decrypted_text = security.decrypt_text(encrypted_text)
-        if not decrypted_text:
-            return None
-
-        tts = gTTS(text=decrypted_text, lang=lang_code)
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3', mode='wb') as f:
-            os.chmod(f.name, 0o600)
-            tts.save(f.name)
-            return f.name
-    except Exception as e:
-        logging.error(f"Text-to-speech error: {str(e)}")
-        return None
-
-# Global language dictionary
-languages = {
-    'English': 'en', 'Spanish': 'es', 'French': 'fr',
-    'German': 'de', 'Italian': 'it', 'Portuguese': 'pt',
-    'Chinese (Simplified)': 'zh-CN', 'Chinese (Traditional)': 'zh-TW',
-    'Japanese': 'ja', 'Korean': 'ko', 'Hindi': 'hi',
-    'Arabic': 'ar', 'Russian': 'ru', 'Bengali': 'bn',
-    'Indonesian': 'id', 'Turkish': 'tr', 'Vietnamese': 'vi',
-    'Dutch': 'nl', 'Greek': 'el', 'Hebrew': 'he',
-    'Swedish': 'sv', 'Norwegian': 'no', 'Danish': 'da',
-    'Polish': 'pl', 'Czech': 'cs', 'Hungarian': 'hu',
-    'Finnish': 'fi', 'Thai': 'th', 'Filipino': 'fil',
-    'Malay': 'ms', 'Urdu': 'ur', 'Tamil': 'ta',
-    'Telugu': 'te', 'Marathi': 'mr', 'Punjabi': 'pa',
-    'Gujarati': 'gu', 'Ukrainian': 'uk', 'Romanian': 'ro',
-    'Bulgarian': 'bg', 'Serbian': 'sr', 'Croatian': 'hr',
-    'Slovak': 'sk', 'Slovenian': 'sl', 'Lithuanian': 'lt',
-    'Latvian': 'lv', 'Estonian': 'et', 'Icelandic': 'is',
-    'Afrikaans': 'af', 'Albanian': 'sq', 'Amharic': 'am', 
-    'Armenian': 'hy', 'Azerbaijani': 'az', 'Basque': 'eu', 
-    'Belarusian': 'be', 'Bosnian': 'bs', 'Catalan': 'ca',
-    'Cebuano': 'ceb', 'Corsican': 'co', 'Esperanto': 'eo',
-    'Frisian': 'fy', 'Galician': 'gl', 'Georgian': 'ka',
-    'Haitian Creole': 'ht', 'Hausa': 'ha', 'Hawaiian': 'haw', 
-    'Hmong': 'hmn', 'Icelandic': 'is', 'Igbo': 'ig',
-    'Irish': 'ga', 'Javanese': 'jw', 'Kannada': 'kn',
-    'Kazakh': 'kk', 'Khmer': 'km', 'Kinyarwanda': 'rw',
-    'Kurdish': 'ku', 'Kyrgyz': 'ky', 'Lao': 'lo',
-    'Latin': 'la', 'Luxembourgish': 'lb', 'Macedonian': 'mk',
-    'Malagasy': 'mg', 'Malayalam': 'ml', 'Maltese': 'mt',
-    'Maori': 'mi', 'Mongolian': 'mn', 'Myanmar (Burmese)': 'my',
-    'Nepali': 'ne', 'Nyanja (Chichewa)': 'ny', 'Odia (Oriya)': 'or',
-    'Pashto': 'ps', 'Persian': 'fa', 'Samoan': 'sm',
-    'Scots Gaelic': 'gd', 'Sesotho': 'st', 'Shona': 'sn',
-    'Sindhi': 'sd', 'Sinhala (Sinhalese)': 'si', 'Somali': 'so',
-    'Sundanese': 'su', 'Swahili': 'sw', 'Tagalog (Filipino)': 'tl',
-    'Tajik': 'tg', 'Tatar': 'tt', 'Turkmen': 'tk',
-    'Uyghur': 'ug', 'Uzbek': 'uz', 'Welsh': 'cy',
-    'Xhosa': 'xh', 'Yiddish': 'yi', 'Yoruba': 'yo', 'Zulu': 'zu'
-}
+if 'live_transcriber' not in st.session_state:
+    st.session_state.live_transcriber = None
+if 'live_result' not in st.session_state:
+    st.session_state.live_result = None
+if 'transcript_segments' not in st.session_state:
+    st.session_state.transcript_segments = None
+# Background pipeline job of this session and the last finished result
+if 'session_id' not in st.session_state:
+    # Never kept in the URL, where it would leak into browser history and
+    # logs; the History tab shows it as a resume code instead
+    st.session_state.session_id = secrets.token_hex(16)
+if "session" in st.query_params:
+    # Links from older versions carried the history token
+    del st.query_params["session"]
+if 'job_id' not in st.session_state:
+    st.session_state.job_id = None
+if 'job_result' not in st.session_state:
+    st.session_state.job_result = None
+# Page of the conversation history shown in the History tab
+if 'history_page' not in st.session_state:
+    st.session_state.history_page = 0
 
 def save_to_history(source_lang, target_lang, original_text, translated_text):
     """Save the current translation to history"""
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    history_entry = {
-        "timestamp": timestamp,
-        "source_language": source_lang,
-        "target_language": target_lang,
-        "original_text": original_text,
-        "translated_text": translated_text
-    }
-    st.session_state.conversation_history.append(history_entry)
-    
-    # Keep only the last 50 entries to prevent memory issues
-    if len(st.session_state.conversation_history) > 50:
-        st.session_state.conversation_history = st.session_state.conversation_history[-50:]
+    get_history_store().append(
+        st.session_state.session_id, source_lang, target_lang, original_text, translated_text
+    )
+
+def display_resume_code():
+    """Show the session's resume code and let the user resume with another one or rotate it"""
+    store = get_history_store()
+    with st.expander("Resume code"):
+        st.caption(
+            "Anyone with this code can read and download your history. Enter it after a reload or "
+            "on another device to continue, and get a new code if it may have been seen by someone else."
+        )
+        st.code(st.session_state.session_id, language=None)
+        code = st.text_input("Resume with a code", key="resume_code", type="password").strip().lower()
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("Resume", disabled=not code, key="resume_session"):
+                if re.fullmatch(r"[0-9a-f]{32}", code):
+                    st.session_state.session_id = code
+                    st.session_state.history_page = 0
+                    st.rerun()
+                else:
+                    st.error("That is not a valid resume code.")
+        with col2:
+            if st.button("Get a new code", key="rotate_session"):
+                new_session_id = secrets.token_hex(16)
+                store.rekey(st.session_state.session_id, new_session_id)
+                st.session_state.session_id = new_session_id
+                st.rerun()
 
 def display_conversation_history():
-    """Display the conversation history"""
-    if not st.session_state.conversation_history:
+    """Display one page of the conversation history"""
+    store = get_history_store()
+    display_resume_code()
+    session_id = st.session_state.session_id
+    if not store.count(session_id):
         st.info("No conversation history yet. Start translating to build your history!")
         return
     
     st.subheader("Conversation History")
+
+    pair = None
+    pairs = store.language_pairs(session_id)
+    if len(pairs) > 1:
+        labels = ["All language pairs"] + [f"{source} to {target}" for source, target in pairs]
+        choice = st.selectbox("Language pair", range(len(labels)), format_func=labels.__getitem__, key="history_pair")
+        if choice:
+            pair = pairs[choice - 1]
     
-    # Add download button for history
-    if st.download_button(
-        label="Download History as CSV",
-        data=generate_history_csv(),
-        file_name="lingualink_history.csv",
-        mime="text/csv"
-    ):
-        st.success("History downloaded successfully!")
+    # Exports are built only when a download button is clicked
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.download_button(
+            label="Download History as CSV",
+            data=lambda: store.export(session_id, "csv", pair),
+            file_name="lingualink_history.csv",
+            mime="text/csv"
+        ):
+            st.success("History downloaded successfully!")
+    with col2:
+        if st.download_button(
+            label="Download History as JSONL",
+            data=lambda: store.export(session_id, "jsonl", pair),
+            file_name="lingualink_history.jsonl",
+            mime="application/jsonl"
+        ):
+            st.success("History downloaded successfully!")
     
     # Add clear history button
     if st.button("Clear History"):
-        st.session_state.conversation_history = []
+        store.clear(session_id)
+        st.session_state.history_page = 0
         st.success("History cleared successfully!")
         st.rerun()
     
-    # Display history in an expandable format
-    for i, entry in enumerate(reversed(st.session_state.conversation_history)):
-        with st.expander(f"#{len(st.session_state.conversation_history)-i}: {entry['timestamp']} - {entry['source_language']} to {entry['target_language']}"):
+    # Only the current page is read and decrypted
+    total = store.count(session_id, pair)
+    pages = max(1, -(-total // HISTORY_PAGE_SIZE))
+    page = min(st.session_state.history_page, pages - 1)
+    nav1, nav2, nav3 = st.columns([1, 2, 1])
+    with nav1:
+        if st.button("◀ Newer", disabled=page == 0, key="history_newer"):
+            st.session_state.history_page = page - 1
+            st.rerun()
+    with nav2:
+        st.caption(f"Page {page + 1} of {pages} ({total} translations)")
+    with nav3:
+        if st.button("Older ▶", disabled=page >= pages - 1, key="history_older"):
+            st.session_state.history_page = page + 1
+            st.rerun()
+
+    for entry in store.page(session_id, page, HISTORY_PAGE_SIZE, pair):
+        with st.expander(f"#{entry['number']}: {entry['timestamp']} - {entry['source_language']} to {entry['target_language']}"):
             col1, col2 = st.columns(2)
             with col1:
                 st.markdown(f"**Original ({entry['source_language']}):**")
-                st.markdown(f"<div style='background-color:#528AAE; padding:10px; border-radius:5px;'>{entry['original_text']}</div>", unsafe_allow_html=True)
+                st.markdown(f"<div style='background-color:#528AAE; padding:10px; border-radius:5px;'>{entry['original_text'] or ''}</div>", unsafe_allow_html=True)
             
             with col2:
                 st.markdown(f"**Translation ({entry['target_language']}):**")
-                st.markdown(f"<div style='background-color:#528AAE; padding:10px; border-radius:5px;'>{entry['translated_text']}</div>", unsafe_allow_html=True)
+                st.markdown(f"<div style='background-color:#528AAE; padding:10px; border-radius:5px;'>{entry['translated_text'] or ''}</div>", unsafe_allow_html=True)
 
-def generate_history_csv():
-    """Generate CSV data from conversation history"""
-    import csv
-    import io
-    
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Write header
-    writer.writerow(['Timestamp', 'Source Language', 'Target Language', 'Original Text', 'Translated Text'])
-    
-    # Write data
-    for entry in st.session_state.conversation_history:
-        writer.writerow([
-            entry['timestamp'],
-            entry['source_language'],
-            entry['target_language'],
-            entry['original_text'],
-            entry['translated_text']
-        ])
-    
-    return output.getvalue()
+def display_translation(source_lang, target_lang, original_text, translated_text):
+    """Show the original and translated text side by side with play buttons"""
+    # The texts are already in the clear here; the scope saves encrypting them
+    # only for the speech functions to decrypt them again
+    with secure_scope():
+        encrypted_original = security.wrap(original_text)
+        encrypted_translation = security.wrap(translated_text)
+
+        # Start synthesis now so the play buttons do not have to wait for gTTS
+        secure_prerender_speech(encrypted_original, languages[source_lang])
+        secure_prerender_speech(encrypted_translation, languages[target_lang])
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown(f"<h3>Original Text ({source_lang})</h3><p>{original_text}</p>", unsafe_allow_html=True)
+
+            if st.button("🔊 Play Original", disabled=not language_registry.supports("gtts", languages[source_lang])):
+                audio = secure_text_to_speech(encrypted_original, languages[source_lang])
+                if audio:
+                    st.audio(audio, format="audio/mp3")
+
+        with col2:
+            st.markdown(f"<h3>Translation ({target_lang})</h3><p>{translated_text}</p>", unsafe_allow_html=True)
+
+            if st.button("🔊 Play Translation", disabled=not language_registry.supports("gtts", languages[target_lang])):
+                audio = secure_text_to_speech(encrypted_translation, languages[target_lang])
+                if audio:
+                    st.audio(audio, format="audio/mp3")
+
+def display_streamed_translation(source_lang, target_lang, events):
+    """Render the sentences, translations and translated audio a running job has published"""
+    originals = [security.decrypt_text(event["text"]) or "" for event in events if event["event"] == "sentence"]
+    translations = [security.decrypt_text(event["text"]) or "" for event in events if event["event"] == "translation"]
+    clips = [event["audio"] for event in events if event["event"] == "audio" and event["audio"]]
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown(f"<h3>Original Text ({source_lang})</h3>", unsafe_allow_html=True)
+        st.markdown(" ".join(originals))
+    with col2:
+        st.markdown(f"<h3>Translation ({target_lang})</h3>", unsafe_allow_html=True)
+        st.markdown(" ".join(translations))
+        for clip in clips:
+            st.audio(clip, format="audio/mp3")
+
+def translation_job(job, audio_bytes, source_lang_code, target_lang_code, result_cache, cache_key):
+    """Run the pipeline for one recording on a job worker
+
+    Runs outside the script thread, so it must not touch ``st``; progress
+    goes out through ``job.publish`` and the texts come back as the result.
+    """
+    with secure_scope():
+        return _translation_job(job, audio_bytes, source_lang_code, target_lang_code, result_cache, cache_key)
+
+def _translation_job(job, audio_bytes, source_lang_code, target_lang_code, result_cache, cache_key):
+    result = {"key": cache_key, "transcription": None, "translation": None,
+              "language_error": False, "error_message": "", "partial": False}
+    status = new_status()
+    transcription = secure_transcribe_audio_bytes(audio_bytes, source_lang_code, status)
+    if not transcription or status.language_error:
+        result["language_error"] = status.language_error
+        result["error_message"] = status.error_message or "Failed to transcribe audio. Please try again."
+        return result
+    if job.cancelled:
+        return result
+
+    # Sentences are translated one by one with Google Translate while streaming
+    if STREAM_RESULTS and language_registry.supports("google_translate", target_lang_code):
+        enhanced_text = translation = None
+        for event in secure_stream_enhance_translate(
+            transcription, target_lang_code, source_lang_code, status.transcript_segments
+        ):
+            if event["event"] == "done":
+                enhanced_text, translation = event["original"], event["translation"]
+                if event["missing"] and translation is not None:
+                    result["partial"] = True
+                    result["error_message"] = (
+                        f"{len(event['missing'])} sentence(s) could not be translated and are shown "
+                        "in the original language. Please try again."
+                    )
+            else:
+                # Sessions read published events after this scope has ended
+                if event.get("text") is not None:
+                    event["text"].seal()
+                job.publish(event)
+    else:
+        enhanced_text, translation = secure_enhance_and_translate(
+            transcription, target_lang_code, source_lang_code, status.transcript_segments
+        )
+
+    result["transcription"] = security.decrypt_text(enhanced_text)
+    result["translation"] = security.decrypt_text(translation)
+    if result["transcription"] and result["translation"]:
+        # A partial translation is not cached, so the next attempt redoes it
+        if not result["partial"]:
+            result_cache.put(cache_key, {
+                "transcription": result["transcription"],
+                "translation": result["translation"]
+            })
+    elif not result["partial"]:
+        result["error_message"] = "Failed to translate audio. Please try again."
+    return result
+
+def follow_job(cache_key, fn, args, display_events):
+    """Submit (or keep following) this session's job for the current recording
+
+    ``fn(job, *args)`` runs on the job pool; while it runs ``display_events``
+    renders what it has published so far. Returns the finished job result,
+    or None while the job is queued or running.
+    """
+    job_queue = get_job_queue()
+    job = job_queue.get(st.session_state.job_id) if st.session_state.job_id else None
+    if job is None or job.key != cache_key or job.cancelled:
+        job = job_queue.submit(fn, *args, key=cache_key, owner=st.session_state.session_id)
+        if job is None:
+            stats = job_queue.stats()
+            st.warning(f"The service is busy ({stats['queued']} recordings waiting). Please try again in a moment.")
+            return None
+        st.session_state.job_id = job.id
+
+    if job.state == "queued":
+        position = job_queue.position(job.id)
+        st.info(f"Waiting for a free worker (position {position} of {job_queue.stats()['queued']} in the queue)...")
+        return None
+    if job.state == "running":
+        st.info("Processing audio...")
+        display_events(job.events_since(0))
+        return None
+
+    st.session_state.job_id = None
+    if job.state == "failed":
+        return {"key": cache_key, "transcription": None, "translation": None, "translations": {},
+                "language_error": False, "error_message": "Failed to process audio. Please try again."}
+    return job.result
+
+def follow_translation_job(source_lang, target_lang, cache_key):
+    """Follow the single-target pipeline job for the current recording"""
+    return follow_job(
+        cache_key, translation_job,
+        (st.session_state.audio_bytes, languages[source_lang], languages[target_lang], get_result_cache(), cache_key),
+        lambda events: display_streamed_translation(source_lang, target_lang, events)
+    )
+
+def fan_out_job(job, audio_bytes, source_lang_code, target_lang_codes, result_cache, cache_keys):
+    """Transcribe and enhance one recording once and translate it into several languages
+
+    Runs on a job worker like ``translation_job``; the enhanced text and each
+    target's translation and audio are published as soon as they are ready.
+    """
+    with secure_scope():
+        return _fan_out_job(job, audio_bytes, source_lang_code, target_lang_codes, result_cache, cache_keys)
+
+def _fan_out_job(job, audio_bytes, source_lang_code, target_lang_codes, result_cache, cache_keys):
+    result = {"key": job.key, "transcription": None, "translations": {},
+              "language_error": False, "error_message": ""}
+    status = new_status()
+    transcription = secure_transcribe_audio_bytes(audio_bytes, source_lang_code, status)
+    if not transcription or status.language_error:
+        result["language_error"] = status.language_error
+        result["error_message"] = status.error_message or "Failed to transcribe audio. Please try again."
+        return result
+    if job.cancelled:
+        return result
+
+    for event in secure_fan_out(transcription, target_lang_codes, source_lang_code, status.transcript_segments):
+        if event["event"] == "done":
+            continue
+        # Sessions read published events after this scope has ended
+        if event["text"] is not None:
+            event["text"].seal()
+        job.publish(event)
+        if event["event"] == "original":
+            result["transcription"] = security.decrypt_text(event["text"])
+        else:
+            result["translations"][event["target"]] = security.decrypt_text(event["text"])
+
+    for target_lang_code, translation in result["translations"].items():
+        if result["transcription"] and translation:
+            result_cache.put(cache_keys[target_lang_code], {
+                "transcription": result["transcription"],
+                "translation": translation
+            })
+    failed = [code for code in target_lang_codes if not result["translations"].get(code)]
+    if not result["transcription"] or failed:
+        names = ", ".join(language_registry.name(code) for code in failed)
+        result["error_message"] = f"Failed to translate audio into {names or 'the selected languages'}. Please try again."
+    return result
+
+def display_streamed_fan_out(source_lang, events):
+    """Render the enhanced text and each language's translation as the job publishes them"""
+    for event in events:
+        if event["event"] == "original":
+            st.markdown(f"<h3>Original Text ({source_lang})</h3>", unsafe_allow_html=True)
+            st.markdown(security.decrypt_text(event["text"]) or "")
+        elif event["event"] == "translation":
+            st.markdown(f"<h3>Translation ({language_registry.name(event['target'])})</h3>", unsafe_allow_html=True)
+            st.markdown(security.decrypt_text(event["text"]) or "Translation failed.")
+            if event["audio"]:
+                st.audio(event["audio"], format="audio/mp3")
+
+def display_fan_out(source_lang, original_text, translations):
+    """Show the original text and one translation per target language with play buttons"""
+    with secure_scope():
+        encrypted_original = security.wrap(original_text)
+        secure_prerender_speech(encrypted_original, languages[source_lang])
+        st.markdown(f"<h3>Original Text ({source_lang})</h3><p>{original_text}</p>", unsafe_allow_html=True)
+        if st.button("🔊 Play Original", disabled=not language_registry.supports("gtts", languages[source_lang])):
+            audio = secure_text_to_speech(encrypted_original, languages[source_lang])
+            if audio:
+                st.audio(audio, format="audio/mp3")
+
+        columns = st.columns(min(len(translations), 3))
+        for position, (target_lang, translated_text) in enumerate(translations.items()):
+            target_lang_code = languages[target_lang]
+            with columns[position % len(columns)]:
+                st.markdown(f"<h3>Translation ({target_lang})</h3><p>{translated_text or ''}</p>", unsafe_allow_html=True)
+                if not translated_text:
+                    st.caption("Translation failed.")
+                    continue
+                encrypted_translation = security.wrap(translated_text)
+                # Already rendered by the job, so this is normally a cache hit
+                secure_prerender_speech(encrypted_translation, target_lang_code)
+                if st.button(f"🔊 Play {target_lang}", key=f"play_{target_lang_code}",
+                             disabled=not language_registry.supports("gtts", target_lang_code)):
+                    audio = secure_text_to_speech(encrypted_translation, target_lang_code)
+                    if audio:
+                        st.audio(audio, format="audio/mp3")
+
+def display_fan_out_results(source_lang, target_langs):
+    """Translate the current recording into every selected language, reusing cached targets"""
+    audio_bytes = st.session_state.audio_bytes
+    source_lang_code = languages[source_lang]
+    result_cache = get_result_cache()
+    cache_keys = {
+        languages[target_lang]: make_cache_key(audio_bytes, source_lang_code, languages[target_lang])
+        for target_lang in target_langs
+    }
+
+    original_text = None
+    translations = {}
+    for target_lang_code, cache_key in cache_keys.items():
+        # While a job runs, keep following it until it hands back its result
+        cached = result_cache.get(cache_key) if not st.session_state.job_id else None
+        if cached:
+            original_text = cached["transcription"]
+            translations[target_lang_code] = cached["translation"]
+
+    # Only the targets without a stored result are sent to the job
+    missing = [code for code in cache_keys if code not in translations]
+    if missing:
+        # Namespaced so a single missing target never matches (and joins) a
+        # single-target translation job with the same audio and language pair
+        job_key = "fanout:" + make_cache_key(audio_bytes, source_lang_code, ",".join(missing))
+        job_result = st.session_state.job_result
+        if job_result is None or job_result["key"] != job_key:
+            job_result = follow_job(
+                job_key, fan_out_job,
+                (audio_bytes, source_lang_code, missing, result_cache, cache_keys),
+                lambda events: display_streamed_fan_out(source_lang, events)
+            )
+            if job_result is None:
+                return
+            st.session_state.job_result = job_result
+            if job_result["language_error"]:
+                st.session_state.language_error = True
+                st.session_state.error_message = job_result["error_message"]
+                st.rerun()
+            for target_lang_code, translation in job_result["translations"].items():
+                if job_result["transcription"] and translation:
+                    save_to_history(source_lang, language_registry.name(target_lang_code), job_result["transcription"], translation)
+        if job_result["error_message"] and not job_result["language_error"]:
+            st.error(job_result["error_message"])
+        original_text = original_text or job_result["transcription"]
+        translations.update(job_result["translations"])
+
+    if original_text:
+        display_fan_out(source_lang, original_text, {
+            target_lang: translations.get(languages[target_lang]) for target_lang in target_langs
+        })
+
+def display_live_partials(transcriber):
+    """Show the segments translated so far while a live recording is running"""
+    if transcriber is None:
+        st.caption("Live mode: speak, pause briefly and click the microphone again to continue. Each phrase is translated as soon as you pause.")
+        return
+
+    for segment in transcriber.partials():
+        if segment["error"]:
+            st.caption(f"Segment {segment['index'] + 1}: {segment['error']}")
+            continue
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown(segment["transcription"])
+        with col2:
+            st.markdown(segment["translation"] or "")
+
+    pending = transcriber.pending()
+    if pending:
+        st.caption(f"Translating {pending} more segment(s)...")
+
+def display_diagnostics():
+    """Per-stage latency panel, shown only with ?diagnostics=1 or LINGUALINK_DIAGNOSTICS=1"""
+    if st.query_params.get("diagnostics") != "1" and os.getenv("LINGUALINK_DIAGNOSTICS") != "1":
+        return
+
+    with st.sidebar.expander("Diagnostics"):
+        st.dataframe([
+            {"resource": name, "built": entry["built"], "healthy": entry["ok"],
+             "build ms": entry["build_ms"], "detail": entry["detail"]}
+            for name, entry in registry.health().items()
+        ], hide_index=True)
+
+        provider_stats = dispatcher.stats()
+        if provider_stats:
+            st.dataframe([
+                {"service": service, **counters}
+                for service, counters in provider_stats.items()
+            ], hide_index=True)
+
+        verdicts = language_verifier.stats()
+        if verdicts:
+            st.dataframe([
+                {"language check": check, "transcripts": count}
+                for check, count in verdicts.items()
+            ], hide_index=True)
+
+        snapshot = tracer.snapshot()
+        if not snapshot:
+            st.caption("No pipeline stages recorded yet.")
+            return
+        st.dataframe([
+            {"stage": name, "calls": stats["count"], "p50 ms": stats["p50_ms"],
+             "p95 ms": stats["p95_ms"], "p99 ms": stats["p99_ms"],
+             "errors": stats["outcomes"].get("error", 0)}
+            for name, stats in snapshot.items()
+        ], hide_index=True)
+        st.download_button(
+            label="Download Prometheus metrics",
+            data=tracer.prometheus(),
+            file_name="lingualink_metrics.txt",
+            mime="text/plain"
+        )
 
 def main():
     st.set_page_config(page_title="lingualink", layout="wide")
+    warm_resources()
 
     # Add custom CSS styles
     st.markdown(
@@ -419,10 +634,10 @@ def main():
     st.sidebar.markdown("## How to Use This App")
     st.sidebar.markdown(
         """
-        1. **Select Languages:** Choose the source language (your spoken language) and the target language (desired translation).
+        1. **Select Languages:** Choose the source language (your spoken language) and the target language (desired translation). Tick **Translate into several languages** to get the same speech in more than one language at once.
         2. **Record Your Voice:** Click on **Start Recording** and speak clearly in the selected source language. When done, click **Stop**.
         3. **Review & Play:** Once processed, view the transcription and translation. Use the play buttons to listen to both the original and the translated audio.
-        4. **History:** View your conversation history in the History tab. You can download it as a CSV file.
+        4. **History:** View your conversation history in the History tab, page by page. You can download it as a CSV or JSONL file, and use its resume code to continue after a reload.
         5. **Reset if Needed:** If you want to start over, click the **Reset** button.
         
         **Important Note:** You must speak in the language you selected as the source language. The app will verify this and alert you if there's a mismatch.
@@ -430,6 +645,36 @@ def main():
     )
     st.sidebar.info("This application securely processes audio, transcribes the content, and translates it while enhancing terminologies. Enjoy a seamless and secure experience!")
 
+    cache_stats = get_result_cache().stats()
+    st.sidebar.caption(
+        f"Result cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+        f"({cache_stats['entries']} entries)"
+    )
+    job_stats = get_job_queue().stats()
+    st.sidebar.caption(
+        f"Job queue: {job_stats['running']}/{job_stats['workers']} workers busy, "
+        f"{job_stats['queued']}/{job_stats['max_queue']} waiting"
+    )
+    display_diagnostics()
+
+    memory_stats = translation_memory.stats()
+    st.sidebar.caption(
+        f"Translation memory: {memory_stats['hit_rate']:.0%} sentence hit rate, "
+        f"{memory_stats['saved_calls']} translator calls saved"
+    )
+
+    policy_stats = enhancement_policy.stats()
+    st.sidebar.caption(
+        f"Terminology pass: {policy_stats['calls_avoided_share']:.0%} of LLM calls and "
+        f"{policy_stats['tokens_avoided_share']:.0%} of tokens avoided"
+    )
+
+    glossary_stats = glossary.stats()
+    st.sidebar.caption(
+        f"Glossary: {glossary_stats['corrections']} corrections, "
+        f"{glossary_stats['calls_saved']} LLM calls and {glossary_stats['tokens_saved']} tokens saved"
+    )
+
     # Main page header
     st.markdown('<div class="main-title"><i> Lingualink! </i></div>', unsafe_allow_html=True)
     st.markdown('<div class="sub-title">Real-Time Generative AI powered Translation Web App</div>', unsafe_allow_html=True)
@@ -439,14 +684,30 @@ def main():
     tab1, tab2 = st.tabs(["Translation", "History"])
     
     with tab1:
+        multi_target = st.checkbox("Translate into several languages", key="multi_target",
+                                   disabled=st.session_state.recording_state == 'recording')
         col1, col2 = st.columns(2)
         with col1:
             source_lang = st.selectbox("Source Language ", list(languages.keys()), index=0)
         with col2:
-            target_lang = st.selectbox("Target Language", list(languages.keys()), index=1)
+            if multi_target:
+                target_langs = st.multiselect("Target Languages", list(languages.keys()),
+                                              default=[list(languages.keys())[1]], key="target_langs")
+            else:
+                target_langs = [st.selectbox("Target Language", list(languages.keys()), index=1)]
+        target_lang = target_langs[0] if target_langs else None
 
         # Display language guidance
         st.info(f"Please make sure to speak in {source_lang} for accurate transcription and translation.")
+        if not language_registry.supports("whisper", languages[source_lang]):
+            st.warning(f"Speech recognition is not available for {source_lang}. Please choose another source language.")
+        for name in target_langs:
+            if not language_registry.supports("gtts", languages[name]):
+                st.caption(f"Spoken output is not available for {name}; the translation is shown as text only.")
+
+        # Live mode translates into a single target language
+        live_mode = st.checkbox("Live mode (translate while you speak)", key="live_mode",
+                                disabled=st.session_state.recording_state == 'recording' or multi_target) and not multi_target
 
         st.subheader("Voice Recording")
 
@@ -458,8 +719,14 @@ def main():
                         disabled=st.session_state.recording_state == 'recording'):
                 st.session_state.recording_state = 'recording'
                 st.session_state.audio_bytes = None
+                st.session_state.live_transcriber = None
+                st.session_state.live_result = None
                 st.session_state.language_error = False
                 st.session_state.error_message = ""
+                if st.session_state.job_id:
+                    get_job_queue().cancel(st.session_state.job_id)
+                st.session_state.job_id = None
+                st.session_state.job_result = None
                 st.rerun()
 
         with col2:
@@ -467,6 +734,17 @@ def main():
                         type="primary" if st.session_state.recording_state == 'recording' else "secondary",
                         disabled=st.session_state.recording_state != 'recording'):
                 st.session_state.recording_state = 'stopped'
+                transcriber = st.session_state.live_transcriber
+                if transcriber is not None:
+                    with st.spinner("Finishing live translation..."):
+                        live_result = transcriber.finish()
+                    st.session_state.live_transcriber = None
+                    if live_result["error"]:
+                        st.session_state.language_error = True
+                        st.session_state.error_message = live_result["error"]
+                    else:
+                        st.session_state.live_result = live_result
+                        save_to_history(source_lang, target_lang, live_result["transcription"], live_result["translation"])
                 st.rerun()
 
         with col3:
@@ -474,69 +752,108 @@ def main():
                         disabled=st.session_state.recording_state == 'recording'):
                 st.session_state.recording_state = 'stopped'
                 st.session_state.audio_bytes = None
+                st.session_state.live_transcriber = None
+                st.session_state.live_result = None
                 st.session_state.language_error = False
                 st.session_state.error_message = ""
+                if st.session_state.job_id:
+                    get_job_queue().cancel(st.session_state.job_id)
+                st.session_state.job_id = None
+                st.session_state.job_result = None
                 st.rerun()
 
         if st.session_state.recording_state == 'recording':
             st.markdown("""<div class="recording-status" style="background-color: #ff4b4b; color: white;"> Recording in progress... 🎙️ </div>""", unsafe_allow_html=True)
 
-            audio_bytes = ast.audio_recorder(pause_threshold=60.0, sample_rate=44100)
+            if live_mode:
+                audio_bytes = ast.audio_recorder(pause_threshold=LIVE_PAUSE_THRESHOLD, sample_rate=44100)
+
+                if audio_bytes:
+                    if st.session_state.live_transcriber is None:
+                        st.session_state.live_transcriber = StreamingTranscriber(
+                            languages[source_lang], languages[target_lang]
+                        )
+                    st.session_state.live_transcriber.feed(audio_bytes)
 
-            if audio_bytes:
-                st.session_state.audio_bytes = audio_bytes
+                display_live_partials(st.session_state.live_transcriber)
+            else:
+                audio_bytes = ast.audio_recorder(pause_threshold=60.0, sample_rate=44100)
+
+                if audio_bytes:
+                    st.session_state.audio_bytes = audio_bytes
 
         # Display language error if detected
         if st.session_state.language_error and st.session_state.error_message:
             st.markdown(f"""<div class="error-message">{st.session_state.error_message}</div>""", unsafe_allow_html=True)
 
-        if st.session_state.audio_bytes:
+        if st.session_state.audio_bytes and multi_target:
             st.audio(st.session_state.audio_bytes, format="audio/wav")
+            if target_langs:
+                display_fan_out_results(source_lang, target_langs)
+            else:
+                st.info("Choose at least one target language.")
 
-            with st.spinner("Processing audio..."):
-                audio_file = secure_save_audio(st.session_state.audio_bytes)
-
-                if audio_file:
-                    # Use the selected source language code for transcription
-                    source_lang_code = languages[source_lang]
-                    transcription = secure_transcribe_audio(audio_file, source_lang_code)
-
-                    # Only proceed if there's no language mismatch error
-                    if transcription and not st.session_state.language_error:
-                        enhanced_text = secure_enhance_medical_terms(transcription)
-                        translation = secure_translate_text(enhanced_text, languages[target_lang])
-
-                        # Get decrypted texts for display
-                        original_decrypted = security.decrypt_text(enhanced_text)
-                        translation_decrypted = security.decrypt_text(translation)
+        elif st.session_state.audio_bytes:
+            st.audio(st.session_state.audio_bytes, format="audio/wav")
 
+            source_lang_code = languages[source_lang]
+            target_lang_code = languages[target_lang]
+            result_cache = get_result_cache()
+            cache_key = make_cache_key(st.session_state.audio_bytes, source_lang_code, target_lang_code)
+            cached_result = result_cache.get(cache_key)
+
+            original_decrypted = None
+            translation_decrypted = None
+            job_result = st.session_state.job_result
+            if cached_result and not st.session_state.job_id:
+                # Same clip and language pair as an earlier run: reuse the stored texts
+                original_decrypted = cached_result["transcription"]
+                translation_decrypted = cached_result["translation"]
+            elif job_result is not None and job_result["key"] == cache_key:
+                # Already processed in this session without a cacheable result
+                original_decrypted = job_result["transcription"]
+                translation_decrypted = job_result["translation"]
+                if job_result.get("partial"):
+                    st.warning(job_result["error_message"])
+                elif not original_decrypted and not job_result["language_error"]:
+                    st.error(job_result["error_message"])
+            else:
+                # The pipeline runs on the shared job pool, so reruns and other
+                # sessions do not block it; this run only reports progress
+                job_result = follow_translation_job(source_lang, target_lang, cache_key)
+                if job_result is not None:
+                    st.session_state.job_result = job_result
+                    if job_result["language_error"]:
+                        st.session_state.language_error = True
+                        st.session_state.error_message = job_result["error_message"]
+                        st.rerun()
+                    original_decrypted = job_result["transcription"]
+                    translation_decrypted = job_result["translation"]
+                    if job_result.get("partial"):
+                        # Incomplete translations are neither cached nor kept in history
+                        st.warning(job_result["error_message"])
+                    elif original_decrypted and translation_decrypted:
                         # Save to history
                         save_to_history(source_lang, target_lang, original_decrypted, translation_decrypted)
+                    else:
+                        st.error(job_result["error_message"])
+
+            if original_decrypted:
+                display_translation(source_lang, target_lang, original_decrypted, translation_decrypted)
 
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            st.markdown(f"<h3>Original Text ({source_lang})</h3><p>{original_decrypted}</p>", unsafe_allow_html=True)
-
-                            if st.button("🔊 Play Original"):
-                                audio_file = secure_text_to_speech(enhanced_text, languages[source_lang])
-                                if audio_file:
-                                    st.audio(audio_file)
-                                    os.remove(audio_file)
-
-                        with col2:
-                            st.markdown(f"<h3>Translation ({target_lang})</h3><p>{translation_decrypted}</p>", unsafe_allow_html=True)
-
-                            if st.button("🔊 Play Translation"):
-                                audio_file = secure_text_to_speech(translation, languages[target_lang])
-                                if audio_file:
-                                    st.audio(audio_file)
-                                    os.remove(audio_file)
-                    elif not st.session_state.language_error:
-                        st.error("Failed to transcribe audio. Please try again.")
+        if st.session_state.live_result and not multi_target:
+            live_result = st.session_state.live_result
+            display_translation(source_lang, target_lang, live_result["transcription"], live_result["translation"])
     
     with tab2:
         # Display conversation history
         display_conversation_history()
 
+    # Keep polling while live segments or a pipeline job are still running in the background
+    transcriber = st.session_state.live_transcriber
+    if (transcriber is not None and transcriber.pending()) or st.session_state.job_id:
+        time.sleep(0.5)
+        st.rerun()
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,258 @@
+import io
+import wave
+
+import numpy as np
+
+
+def decode_wav(audio_bytes):
+    """Decode PCM WAV bytes into float32 samples of shape (frames, channels)"""
+    with wave.open(io.BytesIO(audio_bytes), "rb") as wav:
+        channels = wav.getnchannels()
+        sample_width = wav.getsampwidth()
+        sample_rate = wav.getframerate()
+        raw = wav.readframes(wav.getnframes())
+
+    if sample_width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sample_width == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif sample_width == 3:
+        packed = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+        ints = (packed[:, 0].astype(np.int32)
+                | (packed[:, 1].astype(np.int32) << 8)
+                | (packed[:, 2].astype(np.int32) << 16))
+        ints = np.where(ints & 0x800000, ints - 0x1000000, ints)
+        samples = ints.astype(np.float32) / 8388608.0
+    elif sample_width == 4:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {sample_width}")
+
+    return samples.reshape(-1, channels), sample_rate
+
+
+def encode_wav(samples, sample_rate):
+    """Encode float samples (frames[, channels]) as 16-bit PCM WAV bytes"""
+    samples = np.asarray(samples, dtype=np.float32)
+    if samples.ndim == 1:
+        samples = samples[:, None]
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767.0).astype("<i2")
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(pcm.shape[1])
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def to_mono(samples):
+    """Average all channels into a 1-D signal"""
+    samples = np.asarray(samples, dtype=np.float32)
+    if samples.ndim == 1:
+        return samples
+    return samples.mean(axis=1)
+
+
+def frame_energies(samples, sample_rate, frame_ms=30):
+    """Per-frame RMS energy in dBFS for a mono signal"""
+    frame_length = max(1, int(sample_rate * frame_ms / 1000))
+    frame_count = len(samples) // frame_length
+    if frame_count == 0:
+        return np.empty(0, dtype=np.float32), frame_length
+    frames = samples[:frame_count * frame_length].reshape(frame_count, frame_length)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    return 20.0 * np.log10(np.maximum(rms, 1e-10)), frame_length
+
+
+def detect_speech(samples, sample_rate, frame_ms=30, margin_db=12.0, floor_db=-50.0, ceiling_db=-35.0):
+    """Energy VAD: a boolean array marking frames that contain speech
+
+    The threshold adapts to the recording: it sits ``margin_db`` above the
+    estimated noise floor (the 10th percentile of frame energies), but never
+    below ``floor_db`` so that digital silence is not treated as speech, and
+    never above ``ceiling_db`` so that a clip with no pauses at all still
+    counts as speech.
+    """
+    energies, frame_length = frame_energies(to_mono(samples), sample_rate, frame_ms)
+    if len(energies) == 0:
+        return np.zeros(0, dtype=bool), frame_length
+    noise_floor = float(np.percentile(energies, 10))
+    threshold = min(max(noise_floor + margin_db, floor_db), ceiling_db)
+    return energies > threshold, frame_length
+
+
+def speech_regions(samples, sample_rate, frame_ms=30, min_silence_ms=500, min_speech_ms=150):
+    """Return (start, end) sample ranges of speech separated by real pauses
+
+    Gaps shorter than ``min_silence_ms`` are bridged and bursts shorter than
+    ``min_speech_ms`` are dropped as clicks or noise.
+    """
+    voiced, frame_length = detect_speech(samples, sample_rate, frame_ms)
+    min_gap = max(1, int(min_silence_ms / frame_ms))
+    min_run = max(1, int(min_speech_ms / frame_ms))
+
+    regions = []
+    start = None
+    silent_run = 0
+    for index, is_voiced in enumerate(voiced):
+        if is_voiced:
+            if start is None:
+                start = index
+            silent_run = 0
+        elif start is not None:
+            silent_run += 1
+            if silent_run >= min_gap:
+                regions.append((start, index - silent_run + 1))
+                start = None
+                silent_run = 0
+    if start is not None:
+        regions.append((start, len(voiced) - silent_run))
+
+    return [
+        (begin * frame_length, end * frame_length)
+        for begin, end in regions
+        if end - begin >= min_run
+    ]
+
+
+def split_on_silence(samples, sample_rate, min_silence_ms=500, padding_ms=200,
+                     min_segment_s=1.0, max_segment_s=30.0):
+    """Group speech regions into segments that break at silence boundaries
+
+    Each region is padded by ``padding_ms`` on both sides. A segment keeps
+    absorbing the following regions while it is shorter than ``min_segment_s``
+    and the result stays within ``max_segment_s``; speech that runs longer than
+    ``max_segment_s`` without a pause is cut into pieces of that length.
+    Returns a list of (start, end) sample ranges.
+    """
+    padding = int(sample_rate * padding_ms / 1000)
+    min_length = int(sample_rate * min_segment_s)
+    max_length = int(sample_rate * max_segment_s)
+    total = len(samples)
+
+    segments = []
+    for start, end in speech_regions(samples, sample_rate, min_silence_ms=min_silence_ms):
+        start = max(0, start - padding)
+        end = min(total, end + padding)
+        if segments:
+            previous_start, previous_end = segments[-1]
+            start = max(start, previous_end)
+            if previous_end - previous_start < min_length and end - previous_start <= max_length:
+                segments[-1] = (previous_start, end)
+                continue
+        while end - start > max_length:
+            segments.append((start, start + max_length))
+            start += max_length
+        if end > start:
+            segments.append((start, end))
+    return segments
+
+
+def trailing_silence_ms(samples, sample_rate, frame_ms=30):
+    """Length of the silent tail of a recording in milliseconds"""
+    voiced, _ = detect_speech(samples, sample_rate, frame_ms)
+    if not voiced.any():
+        return len(voiced) * frame_ms
+    return int((len(voiced) - 1 - np.flatnonzero(voiced)[-1]) * frame_ms)
+
+
+def trim_silence(samples, sample_rate, padding_ms=150):
+    """Cut leading and trailing silence, keeping ``padding_ms`` around the speech"""
+    regions = speech_regions(samples, sample_rate)
+    if not regions:
+        return samples[:0]
+    padding = int(sample_rate * padding_ms / 1000)
+    start = max(0, regions[0][0] - padding)
+    end = min(len(samples), regions[-1][1] + padding)
+    return samples[start:end]
+
+
+def resample(samples, source_rate, target_rate):
+    """Resample a mono signal with a windowed-sinc low-pass and interpolation"""
+    samples = np.asarray(samples, dtype=np.float32)
+    if source_rate == target_rate or len(samples) == 0:
+        return samples
+
+    if target_rate < source_rate:
+        # Low-pass just below the new Nyquist frequency to avoid aliasing
+        cutoff = 0.45 * target_rate / source_rate
+        taps = np.arange(-32, 33)
+        kernel = 2 * cutoff * np.sinc(2 * cutoff * taps) * np.hamming(len(taps))
+        kernel /= kernel.sum()
+        samples = np.convolve(samples, kernel.astype(np.float32), mode="same")
+
+    duration = len(samples) / source_rate
+    target_length = int(round(duration * target_rate))
+    source_times = np.arange(len(samples)) / source_rate
+    target_times = np.arange(target_length) / target_rate
+    return np.interp(target_times, source_times, samples).astype(np.float32)
+
+
+def encode_audio(samples, sample_rate, audio_format="flac"):
+    """Encode a mono signal as flac, opus (in ogg) or wav; returns (bytes, extension)
+
+    FLAC and Opus need the optional ``soundfile`` package; without it the
+    signal is sent as 16-bit WAV.
+    """
+    if audio_format in ("flac", "opus"):
+        try:
+            import soundfile
+        except ImportError:
+            return encode_wav(samples, sample_rate), "wav"
+        buffer = io.BytesIO()
+        if audio_format == "flac":
+            soundfile.write(buffer, samples, sample_rate, format="FLAC", subtype="PCM_16")
+            return buffer.getvalue(), "flac"
+        soundfile.write(buffer, samples, sample_rate, format="OGG", subtype="OPUS")
+        return buffer.getvalue(), "ogg"
+    return encode_wav(samples, sample_rate), "wav"
+
+
+def prepare_speech(audio_bytes, target_rate=16000):
+    """Decode a recorded WAV into trimmed mono samples at ``target_rate``
+
+    Returns a dict with the ``samples`` (empty when no speech was found), the
+    ``sample_rate``, the original byte count and the speech duration in seconds.
+    """
+    samples, sample_rate = decode_wav(audio_bytes)
+    trimmed = trim_silence(to_mono(samples), sample_rate)
+    return {
+        "samples": resample(trimmed, sample_rate, target_rate),
+        "sample_rate": target_rate,
+        "original_bytes": len(audio_bytes),
+        "duration": len(trimmed) / sample_rate,
+        "has_speech": len(trimmed) > 0,
+    }
+
+
+def plan_windows(samples, sample_rate, chunk_s=20.0, overlap_s=1.0):
+    """Cut a long recording into overlapping windows that break at pauses
+
+    Each window owns a "core" range; the core ranges partition the recording
+    and meet halfway between two speech segments. The window itself extends
+    ``overlap_s`` into its neighbours so that words at a boundary are heard in
+    full by at least one request. Returns dicts of sample offsets with keys
+    ``start``, ``end``, ``core_start`` and ``core_end``.
+    """
+    total = len(samples)
+    segments = split_on_silence(samples, sample_rate, min_segment_s=chunk_s, max_segment_s=chunk_s * 1.5)
+    if len(segments) <= 1:
+        return [{"start": 0, "end": total, "core_start": 0, "core_end": total}]
+
+    boundaries = [0]
+    for (_, previous_end), (next_start, _) in zip(segments, segments[1:]):
+        boundaries.append((previous_end + next_start) // 2)
+    boundaries.append(total)
+
+    overlap = int(sample_rate * overlap_s)
+    return [
+        {
+            "start": max(0, core_start - overlap),
+            "end": min(total, core_end + overlap),
+            "core_start": core_start,
+            "core_end": core_end,
+        }
+        for core_start, core_end in zip(boundaries, boundaries[1:])
+    ]
@@ -0,0 +1,185 @@
+"""Batch-translate recorded WAV files with a pool of concurrent workers.
+
+Examples:
+    python batch_translate.py recordings/ --source en --target es --workers 8
+    python batch_translate.py manifest.jsonl --executor asyncio -o results.jsonl
+
+A manifest is a JSONL file with one {"path", "source", "target"} object per
+line, or a CSV file with the same column names. Relative paths are resolved
+against the manifest's directory.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from core import enhancement_policy
+from pipeline import TranslationPipeline
+from telemetry import tracer
+
+
+def load_jobs(input_path, default_source, default_target):
+    """Expand a directory or manifest into (path, source, target) tuples"""
+    if os.path.isdir(input_path):
+        jobs = []
+        for root, _, files in os.walk(input_path):
+            for name in sorted(files):
+                if name.lower().endswith(".wav"):
+                    jobs.append((os.path.join(root, name), default_source, default_target))
+        return sorted(jobs)
+
+    base_dir = os.path.dirname(os.path.abspath(input_path))
+    with open(input_path, newline="") as f:
+        if input_path.lower().endswith(".csv"):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    jobs = []
+    for row in rows:
+        path = row["path"]
+        if not os.path.isabs(path):
+            path = os.path.join(base_dir, path)
+        jobs.append((path, row.get("source") or default_source, row.get("target") or default_target))
+    return jobs
+
+
+def audio_duration(path):
+    """Duration of a WAV file in seconds, or None if it cannot be parsed"""
+    try:
+        with wave.open(path, "rb") as wav:
+            return wav.getnframes() / float(wav.getframerate())
+    except Exception:
+        return None
+
+
+def run_job(pipeline, job, tts_dir=None):
+    path, source, target = job
+    try:
+        result = pipeline.process_file(path, source, target)
+    except Exception as e:
+        logging.error(f"Batch job failed for {path}: {str(e)}")
+        result = {"path": path, "status": "error", "error": str(e), "timings": {}}
+    result["audio_seconds"] = audio_duration(path)
+
+    # Audio is written next to the results, never into the JSONL records
+    original_audio = result.pop("original_audio", None)
+    translation_audio = result.pop("translation_audio", None)
+    if tts_dir:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        for audio, suffix in ((original_audio, source), (translation_audio, target)):
+            if audio:
+                with open(os.path.join(tts_dir, f"{stem}.{suffix}.mp3"), "wb") as f:
+                    f.write(audio)
+    return result
+
+
+def run_threaded(pipeline, jobs, workers, on_result, tts_dir=None):
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_job, pipeline, job, tts_dir) for job in jobs]
+        for future in as_completed(futures):
+            on_result(future.result())
+
+
+def run_asyncio(pipeline, jobs, workers, on_result, tts_dir=None):
+    async def runner():
+        semaphore = asyncio.Semaphore(workers)
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=workers)
+
+        async def bounded(job):
+            async with semaphore:
+                result = await loop.run_in_executor(executor, run_job, pipeline, job, tts_dir)
+                on_result(result)
+
+        try:
+            await asyncio.gather(*(bounded(job) for job in jobs))
+        finally:
+            executor.shutdown(wait=True)
+
+    asyncio.run(runner())
+
+
+def summarize(results, wall_seconds):
+    """Aggregate throughput figures for a finished batch"""
+    succeeded = [r for r in results if r.get("status") == "ok"]
+    audio_seconds = sum(r.get("audio_seconds") or 0 for r in results)
+    busy_seconds = sum(r["timings"].get("total", 0) for r in results)
+    return {
+        "files": len(results),
+        "succeeded": len(succeeded),
+        "failed": len(results) - len(succeeded),
+        "wall_seconds": round(wall_seconds, 3),
+        "files_per_second": round(len(results) / wall_seconds, 3) if wall_seconds else 0.0,
+        "audio_seconds": round(audio_seconds, 3),
+        "audio_seconds_per_second": round(audio_seconds / wall_seconds, 3) if wall_seconds else 0.0,
+        "mean_file_seconds": round(busy_seconds / len(results), 3) if results else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="Directory of .wav files or a JSONL/CSV manifest")
+    parser.add_argument("--source", default="en", help="Default source language code")
+    parser.add_argument("--target", default="es", help="Default target language code")
+    parser.add_argument("-o", "--output", default="-", help="JSONL results file ('-' for stdout)")
+    parser.add_argument("--workers", type=int, default=4, help="Number of concurrent workers")
+    parser.add_argument("--executor", choices=["thread", "asyncio"], default="thread")
+    parser.add_argument("--no-enhance", action="store_true", help="Skip the LLM terminology pass")
+    parser.add_argument("--mode", choices=["two_step", "fused"], help="Enhance/translate path (default: PIPELINE_MODE)")
+    parser.add_argument("--tts-dir", help="Also synthesize speech and write MP3 files here")
+    parser.add_argument("--metrics-out", help="Write per-stage metrics in Prometheus text format here")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    jobs = load_jobs(args.input, args.source, args.target)
+    if not jobs:
+        print("No input files found", file=sys.stderr)
+        return 1
+
+    pipeline = TranslationPipeline(enhance=not args.no_enhance, tts=bool(args.tts_dir), mode=args.mode)
+    if args.tts_dir:
+        os.makedirs(args.tts_dir, exist_ok=True)
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w")
+    results = []
+    lock = threading.Lock()
+
+    def on_result(result):
+        with lock:
+            results.append(result)
+            output.write(json.dumps(result, ensure_ascii=False) + "\n")
+            output.flush()
+            total = result["timings"].get("total", 0)
+            print(f"[{len(results)}/{len(jobs)}] {result['status']:5} {total:7.2f}s {result['path']}", file=sys.stderr)
+
+    started = time.perf_counter()
+    try:
+        if args.executor == "asyncio":
+            run_asyncio(pipeline, jobs, args.workers, on_result, args.tts_dir)
+        else:
+            run_threaded(pipeline, jobs, args.workers, on_result, args.tts_dir)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    summary = summarize(results, time.perf_counter() - started)
+    summary["enhancement"] = enhancement_policy.stats()
+    summary["stages"] = tracer.snapshot()
+    print(json.dumps(summary, indent=2), file=sys.stderr)
+    if args.metrics_out:
+        with open(args.metrics_out, "w") as f:
+            f.write(tracer.prometheus())
+    return 0 if summary["failed"] == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
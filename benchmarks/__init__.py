@@ -0,0 +1,7 @@
+"""Offline benchmarks for the translation pipeline.
+
+Run from the repository root:
+
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json
+"""
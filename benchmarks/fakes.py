@@ -0,0 +1,250 @@
+"""Local stand-ins for Groq, Google Translate and gTTS with injected latency.
+
+Every fake sleeps for ``base + per_unit * size`` seconds (scaled and
+jittered) and fails with the configured error rate, so the pipeline can be
+exercised end to end without network access or API keys.
+"""
+import hashlib
+import io
+import json
+import random
+import re
+import threading
+import time
+import wave
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from language_registry import WHISPER_NAMES
+
+_WORDS = (
+    "patient reports mild chest pain since yesterday evening please take two tablets "
+    "after meals the doctor will see you shortly blood pressure is slightly elevated "
+    "we need a urine sample do you have any allergies breathe in slowly and hold"
+).split()
+
+# Seconds per generated token; a 70B model streams roughly 250 tokens per second
+LLM_TOKEN_SECONDS = 0.004
+
+# Mis-hearings from the built-in glossary that low-confidence fake segments may contain
+_MISHEARINGS = ("met foreman", "high per tension", "diagnosed with a fib", "lisa no pril")
+
+# verbose_json names the language; with a hint Whisper echoes it back
+_WHISPER_LANGUAGE_NAMES = {code: name for name, code in WHISPER_NAMES.items()}
+
+
+class FakeServiceError(Exception):
+    """Raised by a fake to simulate a provider failure"""
+
+    def __init__(self, message, status_code=500):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class LatencyModel:
+    """Latency and failure behaviour of one fake service"""
+
+    def __init__(self, base=0.1, per_unit=0.0, jitter=0.2, error_rate=0.0, rate_limit_share=0.5, seed=0):
+        self.base = base
+        self.per_unit = per_unit
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_share = rate_limit_share
+        self.scale = 1.0
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def wait(self, units=0):
+        with self._lock:
+            self.calls += 1
+            factor = self._random.lognormvariate(0, self.jitter) if self.jitter else 1.0
+            fail = self._random.random() < self.error_rate
+            rate_limited = self._random.random() < self.rate_limit_share
+        time.sleep((self.base + self.per_unit * units) * factor * self.scale)
+        if fail:
+            if rate_limited:
+                raise FakeServiceError("Rate limit reached", status_code=429)
+            raise FakeServiceError("Simulated upstream failure", status_code=500)
+
+
+def _sentence(seed, index, words=8):
+    rng = random.Random(f"{seed}:{index}")
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _audio_duration(data):
+    try:
+        import soundfile
+        return soundfile.info(io.BytesIO(data)).duration
+    except Exception:
+        pass
+    try:
+        with wave.open(io.BytesIO(data), "rb") as wav:
+            return wav.getnframes() / float(wav.getframerate())
+    except Exception:
+        return len(data) / 32000.0
+
+
+class _FakeTranscriptions:
+    def __init__(self, latency, seconds_per_segment=3.0, low_confidence_rate=0.0, mishearing_rate=0.0):
+        self.latency = latency
+        self.seconds_per_segment = seconds_per_segment
+        self.low_confidence_rate = low_confidence_rate
+        self.mishearing_rate = mishearing_rate
+
+    def create(self, file, model, response_format="json", language=None, **kwargs):
+        _, data = file
+        duration = _audio_duration(data)
+        self.latency.wait(duration)
+
+        seed = hashlib.sha256(data).hexdigest()[:16]
+        segments = []
+        start = 0.0
+        index = 0
+        while start < duration or not segments:
+            end = min(duration, start + self.seconds_per_segment) or self.seconds_per_segment
+            rng = random.Random(f"{seed}:{index}:confidence")
+            low = rng.random() < self.low_confidence_rate
+            text = _sentence(seed, index)
+            if low and rng.random() < self.mishearing_rate:
+                # A known mis-hearing is what made Whisper unsure of this segment
+                text = f"{text[:-1]} {rng.choice(_MISHEARINGS)}."
+            segments.append({
+                "id": index, "start": start, "end": end, "text": " " + text,
+                "avg_logprob": -0.9 if low else -0.2, "no_speech_prob": 0.01, "compression_ratio": 1.4,
+            })
+            start = end
+            index += 1
+        return SimpleNamespace(
+            text="".join(segment["text"] for segment in segments).strip(),
+            segments=segments,
+            language=_WHISPER_LANGUAGE_NAMES.get(language, language) if language else "english",
+            duration=duration,
+        )
+
+
+class _FakeCompletions:
+    def __init__(self, latency, token_seconds=LLM_TOKEN_SECONDS):
+        self.latency = latency
+        self.token_seconds = token_seconds
+
+    def create(self, model, messages, temperature=None, max_tokens=None, response_format=None, stream=False, **kwargs):
+        prompt = messages[-1]["content"]
+        tokens = max(1, len(prompt) // 4)
+        if stream:
+            return self._stream(prompt, tokens)
+        content = prompt
+        completion_tokens = tokens
+        if response_format and response_format.get("type") == "json_object":
+            # Fused enhance-and-translate: echo the text and a tagged "translation"
+            match = re.search(r'language code "([^"]+)"', messages[0]["content"])
+            target = match.group(1) if match else "xx"
+            content = json.dumps({"corrected": prompt, "translation": f"[{target}] {prompt}"})
+            completion_tokens = 2 * tokens
+        # Prompt processing, then generation at the per-token output rate
+        self.latency.wait(tokens)
+        time.sleep(self.token_seconds * completion_tokens * self.latency.scale)
+        usage = SimpleNamespace(
+            prompt_tokens=tokens + 40, completion_tokens=completion_tokens, total_tokens=tokens + completion_tokens + 40
+        )
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content), finish_reason="stop")],
+            usage=usage,
+        )
+
+    def _stream(self, content, prompt_tokens):
+        # Time to first token, then one delta per word at the per-token output rate
+        self.latency.wait(prompt_tokens)
+        for piece in re.findall(r"\S+\s*", content):
+            time.sleep(self.token_seconds * max(1, len(piece) // 4) * self.latency.scale)
+            delta = SimpleNamespace(content=piece)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason=None)])
+
+
+class FakeGroq:
+    """Quacks like ``groq.Groq`` for the calls the pipeline makes"""
+
+    def __init__(self, whisper_latency, llm_latency, low_confidence_rate=0.0, mishearing_rate=0.0,
+                 llm_token_seconds=LLM_TOKEN_SECONDS):
+        self.audio = SimpleNamespace(transcriptions=_FakeTranscriptions(
+            whisper_latency, low_confidence_rate=low_confidence_rate, mishearing_rate=mishearing_rate
+        ))
+        self.chat = SimpleNamespace(completions=_FakeCompletions(llm_latency, llm_token_seconds))
+
+
+def make_fake_translator(latency):
+    """Build a GoogleTranslator replacement bound to ``latency``"""
+
+    class FakeGoogleTranslator:
+        def __init__(self, source="auto", target="en", **kwargs):
+            self.source = source
+            self.target = target
+
+        def translate(self, text, **kwargs):
+            latency.wait(len(text))
+            return "\n".join(f"[{self.target}] {line}" if line.strip() else line for line in text.split("\n"))
+
+        def translate_batch(self, batch, **kwargs):
+            return [self.translate(text) for text in batch]
+
+    return FakeGoogleTranslator
+
+
+def make_fake_gtts(latency):
+    """Build a gTTS replacement bound to ``latency``"""
+
+    class FakeGTTS:
+        def __init__(self, text, lang="en", **kwargs):
+            self.text = text
+            self.lang = lang
+
+        def _audio(self):
+            latency.wait(len(self.text))
+            # Roughly the size of a 32 kbit/s MP3 at normal speaking rate
+            return b"\xff\xfb" + b"\0" * (len(self.text) * 300)
+
+        def write_to_fp(self, fp):
+            fp.write(self._audio())
+
+        def save(self, path):
+            with open(path, "wb") as f:
+                f.write(self._audio())
+
+    return FakeGTTS
+
+
+class FakeServices:
+    """Latency settings for every fake, plus the patching logic"""
+
+    def __init__(self, scale=1.0, error_rate=0.0, seed=0, low_confidence_rate=0.2, mishearing_rate=0.0,
+                 llm_token_seconds=LLM_TOKEN_SECONDS):
+        self.low_confidence_rate = low_confidence_rate
+        self.mishearing_rate = mishearing_rate
+        self.llm_token_seconds = llm_token_seconds
+        self.whisper = LatencyModel(base=0.35, per_unit=0.02, error_rate=error_rate, seed=seed)
+        self.llm = LatencyModel(base=0.4, per_unit=0.001, error_rate=error_rate, seed=seed + 1)
+        self.translate = LatencyModel(base=0.15, per_unit=0.0002, error_rate=error_rate, seed=seed + 2)
+        self.tts = LatencyModel(base=0.25, per_unit=0.001, error_rate=error_rate, seed=seed + 3)
+        for model in self.models().values():
+            model.scale = scale
+
+    def models(self):
+        return {"whisper": self.whisper, "llm": self.llm, "translate": self.translate, "tts": self.tts}
+
+    def call_counts(self):
+        return {name: model.calls for name, model in self.models().items()}
+
+    @contextmanager
+    def installed(self):
+        """Swap the shared clients for the fakes for the duration of the block"""
+        from resources import registry
+
+        with registry.overridden(
+            groq=FakeGroq(
+                self.whisper, self.llm, self.low_confidence_rate, self.mishearing_rate, self.llm_token_seconds
+            ),
+            translator=make_fake_translator(self.translate),
+            tts=make_fake_gtts(self.tts),
+        ):
+            yield self
@@ -0,0 +1,92 @@
+"""Check the glossary pre-pass on known corrections and on segment boundaries.
+
+Correction cases run Glossary.correct on the built-in English glossary:
+known mis-hearings must be fixed and everyday speech that merely looks
+like one ("tell a fib") must be left alone. Boundary cases run the
+partial enhancement path against the local fakes with a term split across
+two Whisper segments ("cat" | "scan"), which no per-segment correction
+can see; the rebuilt transcript must still contain the corrected term.
+Exits 1 if any case fails.
+"""
+import argparse
+import os
+import sys
+
+os.environ.setdefault("api_key", "offline-benchmark")
+os.environ["TRANSLATION_MEMORY_PATH"] = ""
+
+import core
+from benchmarks.fakes import FakeServices
+from glossary import Glossary
+
+# (text, expected text after correction)
+CORRECTION_CASES = [
+    ("He takes met foreman twice a day.", "He takes metformin twice a day."),
+    ("High per tension runs in the family.", "Hypertension runs in the family."),
+    ("She was diagnosed with a fib last year.", "She was diagnosed with AFib last year."),
+    ("Did he tell a fib about the tablets?", "Did he tell a fib about the tablets?"),
+    ("The cat scanned the room.", "The cat scanned the room."),
+]
+
+# (segment texts, index of the low-confidence segment, term the result must contain)
+BOUNDARY_CASES = [
+    (["The doctor wants a cat", "scan of the head tomorrow morning.", "Please arrive at the clinic early.",
+      "Bring your insurance card and a list of your medicines."], 0, "CT scan"),
+    (["Her blood pressure shows high per", "tension again.", "We will repeat the reading next week.",
+      "Keep taking the tablets every morning with water."], 1, "hypertension"),
+]
+
+
+def _segments(texts, low):
+    return [
+        {"text": " " + text, "avg_logprob": -0.9 if index == low else -0.2,
+         "no_speech_prob": 0.01, "compression_ratio": 1.4}
+        for index, text in enumerate(texts)
+    ]
+
+
+def check_corrections():
+    """(text, corrected, ok) for every correction case"""
+    glossary = Glossary()
+    results = []
+    for text, expected in CORRECTION_CASES:
+        corrected, _ = glossary.correct(text, "en")
+        results.append((text, corrected, corrected == expected))
+    return results
+
+
+def check_boundaries():
+    """(enhanced text, action, ok) for every boundary case, with the fakes installed"""
+    results = []
+    with FakeServices(scale=0.01).installed():
+        for texts, low, term in BOUNDARY_CASES:
+            text = " ".join(texts)
+            corrected, segments, decision, terms = core._glossary_pass(text, _segments(texts, low), "en")
+            enhanced = core._enhance_decided(
+                core.security.wrap(text), text, corrected, segments, decision, terms, lang="en"
+            )
+            enhanced_text = enhanced.reveal() if enhanced is not None else ""
+            results.append((enhanced_text, decision["action"], decision["action"] == "partial" and term in enhanced_text))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args(argv)
+
+    failures = 0
+    corrections = check_corrections()
+    for text, corrected, ok in corrections:
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} correct   {text} -> {corrected}", file=sys.stderr)
+    boundaries = check_boundaries()
+    for enhanced_text, action, ok in boundaries:
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {action:9} {enhanced_text}", file=sys.stderr)
+    total = len(corrections) + len(boundaries)
+    print(f"{total - failures}/{total} cases passed", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""Check that the translation memory never reuses a translation that changes the meaning.
+
+Every case stores one sentence and looks up a near-duplicate of it with a
+fuzzy threshold low enough for the MinHash index to return the stored
+sentence as a candidate. Cases marked unsafe change a number, a negation,
+a meaningful word or a question into a statement and must miss; cases
+marked safe differ only by spoken fillers or punctuation and may reuse the
+stored translation. Split cases check that decimals and abbreviations stay
+inside their sentence, both in a whole text and when it is streamed into a
+SentenceBuffer one character at a time. Exits 1 if any case fails.
+"""
+import argparse
+import sys
+
+from translation_memory import (
+    SentenceBuffer, TranslationMemory, _jaccard, _shingles, normalize_sentence, split_sentences
+)
+
+# (stored sentence, looked-up sentence, reuse allowed)
+CASES = [
+    ("Take 20 mg of morphine every 4 hours as needed for pain.",
+     "Take 200 mg of morphine every 4 hours as needed for pain.", False),
+    ("Take 20 mg of morphine every 4 hours as needed for pain.",
+     "Take 20 mg of morphine every 6 hours as needed for pain.", False),
+    ("Give 2.5 ml of the syrup twice a day after meals.",
+     "Give 25 ml of the syrup twice a day after meals.", False),
+    ("Blood pressure was 120 over 80 this morning.",
+     "Blood pressure was 180 over 80 this morning.", False),
+    ("The patient is allergic to penicillin and it must not be given.",
+     "The patient is not allergic to penicillin and it must be given.", False),
+    ("The patient is allergic to penicillin and it must not be given.",
+     "The patient is allergic to penicillin and it must be given.", False),
+    ("Do not take this medicine with alcohol.",
+     "Do take this medicine with alcohol.", False),
+    ("Don't stop taking the tablets before the course is finished.",
+     "Stop taking the tablets before the course is finished.", False),
+    ("She has never had a seizure before today.",
+     "She has had a seizure before today.", False),
+    ("El paciente no es alérgico a la penicilina.",
+     "El paciente es alérgico a la penicilina.", False),
+    ("Der Patient hat keine Schmerzen in der Brust.",
+     "Der Patient hat Schmerzen in der Brust.", False),
+    ("Take 20 mg of morphine every 4 hours as needed for pain.",
+     "Take 20 mg of codeine every 4 hours as needed for pain.", False),
+    ("You took the pill this morning.",
+     "You took the pill this morning?", False),
+    ("Take the tablets with food.",
+     "Also take the tablets with food.", False),
+    ("Take it at night, not in the morning.",
+     "Take it like at night, not in the morning.", False),
+    ("Take two tablets after every meal with some water.",
+     "Um, take two tablets after every meal with some water.", True),
+    ("Take two tablets after every meal with some water.",
+     "Okay, uh, take two tablets after every meal with some water", True),
+]
+
+# (text, the sentences it must split into)
+SPLIT_CASES = [
+    ("Take 2.5 mg of warfarin. Call Dr. Smith at 3 p.m. today.",
+     ["Take 2.5 mg of warfarin.", "Call Dr. Smith at 3 p.m. today."]),
+    ("Give 0.5 ml, e.g. with a syringe. Check it at 10 a.m. tomorrow.",
+     ["Give 0.5 ml, e.g. with a syringe.", "Check it at 10 a.m. tomorrow."]),
+    ("Mr. Jones takes 1.25 mg. Mrs. Jones takes 2. 5 mg.",
+     ["Mr. Jones takes 1.25 mg.", "Mrs. Jones takes 2. 5 mg."]),
+    ("Is the dose 12.5 mg? Yes! Take it now.",
+     ["Is the dose 12.5 mg?", "Yes!", "Take it now."]),
+]
+
+
+def check(threshold):
+    """(case, similarity, reused, ok) for every case"""
+    results = []
+    for stored, looked_up, allowed in CASES:
+        memory = TranslationMemory(fuzzy_threshold=threshold)
+        memory.store("xx", "yy", stored, "stored translation")
+        reused = memory.lookup("xx", "yy", looked_up) is not None
+        similarity = _jaccard(_shingles(normalize_sentence(stored)), _shingles(normalize_sentence(looked_up)))
+        results.append((looked_up, similarity, reused, reused == allowed))
+    return results
+
+
+def _streamed(text):
+    buffer = SentenceBuffer()
+    sentences = []
+    for char in text:
+        sentences.extend(buffer.feed(char))
+    return sentences + buffer.flush()
+
+
+def check_splits():
+    """(how, sentences, ok) for every split case, split whole and streamed"""
+    results = []
+    for text, expected in SPLIT_CASES:
+        sentences = [sentence for sentence, _ in split_sentences(text)]
+        results.append(("split", sentences, sentences == expected))
+        sentences = _streamed(text)
+        results.append(("stream", sentences, sentences == expected))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threshold", type=float, default=0.5,
+                        help="Fuzzy threshold to check with (below the default, so every case is a candidate)")
+    args = parser.parse_args(argv)
+
+    failures = 0
+    for looked_up, similarity, reused, ok in check(args.threshold):
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} similarity {similarity:.2f}  {'reused' if reused else 'missed'}  {looked_up}",
+              file=sys.stderr)
+    splits = check_splits()
+    for how, sentences, ok in splits:
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {how} into {len(sentences)}  {' | '.join(sentences)}", file=sys.stderr)
+    total = len(CASES) + len(splits)
+    print(f"{total - failures}/{total} cases passed", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""Check that a Groq 429 reaches the dispatcher once per attempt.
+
+Starts a local HTTP server that answers every request with 429 and
+Retry-After: 0, points the client built by resources at it through
+GROQ_BASE_URL and makes one chat completion through a Dispatcher. The
+server must see exactly one request per dispatcher attempt (max_retries + 1)
+and the dispatcher must count each of them as rate limited; more requests
+mean the SDK is retrying on its own underneath. Exits 1 on a mismatch.
+"""
+import argparse
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _RateLimited(BaseHTTPRequestHandler):
+    hits = 0
+
+    def do_POST(self):
+        type(self).hits += 1
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = b'{"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}}'
+        self.send_response(429)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Retry-After", "0")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--retries", type=int, default=2, help="Dispatcher max_retries to check with")
+    args = parser.parse_args(argv)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _RateLimited)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["GROQ_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ.setdefault("api_key", "offline-check")
+
+    from dispatcher import Dispatcher
+    from resources import _build_groq
+
+    client = _build_groq()
+    dispatcher = Dispatcher(max_retries=args.retries, base_delay=0.01)
+    try:
+        dispatcher.call("groq_chat", lambda: client.chat.completions.create(
+            model="llama3-groq-70b-8192-tool-use-preview",
+            messages=[{"role": "user", "content": "ping"}],
+        ))
+        error = None
+    except Exception as e:
+        error = type(e).__name__
+    finally:
+        server.shutdown()
+
+    attempts = args.retries + 1
+    counters = dispatcher.stats().get("groq_chat", {})
+    ok = _RateLimited.hits == attempts and counters.get("rate_limited") == attempts and error == "RateLimitError"
+    print(
+        f"{'ok  ' if ok else 'FAIL'} {_RateLimited.hits} HTTP requests for {attempts} dispatcher attempts, "
+        f"{counters.get('rate_limited', 0)} counted as rate limited, raised {error}",
+        file=sys.stderr
+    )
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,500 @@
+"""Drive the pipeline against the local fakes and report latency and throughput.
+
+Scenarios:
+    pipeline/len=<s>/c=<n>  full transcribe -> enhance -> translate -> TTS runs
+                            for recordings of <s> seconds at <n> concurrent requests
+                            (suffixed /mode=fused for the single-call enhance+translate path)
+    stream/len=<s>          transcription followed by the sentence-streamed enhance ->
+                            translate -> TTS path with every transcript enhanced in
+                            full (ENHANCE_POLICY=always); reports time to first audio
+                            next to the same runs without streaming
+    duplicates/c=<n>        <n> sessions submitting the same recording at once; identical
+                            provider calls are coalesced by the dispatcher
+    reruns/len=<s>          one processed recording followed by the Streamlit
+                            rerun pattern (cache lookups, pre-render, play clicks)
+    crypto/len=<s>          the TTS pipeline with SecureText scopes, compared with the
+                            same runs encrypting and decrypting at every stage
+    glossary/len=<s>        the TTS pipeline with the built-in glossary, compared with
+                            the same runs without one; low-confidence segments contain
+                            known mis-hearings at --mishearing-rate
+    fanout/len=<s>          one recording translated into every --targets language with
+                            TranslationPipeline.process_many, compared with one full
+                            pipeline run per target
+
+Each scenario reports throughput, p50/p95/p99 latency, error count, calls
+made to each fake service, Fernet calls and time per request and peak
+traced memory. ``--save-baseline`` stores the report; ``--compare`` checks a
+new run against a stored one and exits non-zero when p95 latency or
+throughput regress beyond ``--tolerance``.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+# The pipeline modules read these at import time; keep the run offline and in memory
+os.environ.setdefault("api_key", "offline-benchmark")
+os.environ["TRANSLATION_MEMORY_PATH"] = ""
+os.environ["RESULT_CACHE_DIR"] = ""
+# Provider rate limits are off unless --rate-limits asks for them
+os.environ.setdefault("RATE_LIMITS", "")
+
+import numpy as np
+
+import core
+from audio_processing import encode_wav
+from benchmarks.fakes import FakeServices
+from dispatcher import dispatcher, parse_limits
+from glossary import Glossary
+from pipeline import TranslationPipeline
+from result_cache import PipelineResultCache, make_cache_key
+from secure_text import secure_scope
+from telemetry import tracer, request_scope
+from translation_memory import TranslationMemory
+from tts_engine import TTSEngine
+
+
+def make_recording(seconds, seed, sample_rate=44100):
+    """Synthetic speech-like WAV: tone bursts separated by short pauses over a noise floor"""
+    rng = np.random.default_rng(seed)
+    total = int(seconds * sample_rate)
+    signal = 0.002 * rng.standard_normal(total).astype(np.float32)
+    position = int(0.3 * sample_rate)
+    while position < total - int(0.3 * sample_rate):
+        burst = min(int(rng.uniform(1.5, 3.0) * sample_rate), total - position - int(0.3 * sample_rate))
+        t = np.arange(burst) / sample_rate
+        frequency = rng.uniform(150, 350)
+        signal[position:position + burst] += 0.25 * np.sin(2 * np.pi * frequency * t) * (1 + 0.3 * np.sin(2 * np.pi * 4 * t))
+        position += burst + int(rng.uniform(0.5, 0.9) * sample_rate)
+    return encode_wav(signal, sample_rate)
+
+
+def reset_state():
+    """Fresh process-wide caches so scenarios do not warm each other up"""
+    core.translation_memory = TranslationMemory(cipher=core.security)
+    core.tts_engine = TTSEngine()
+    core.enhancement_policy.reset()
+    core.glossary.reset()
+    dispatcher.reset()
+    tracer.reset()
+
+
+def _percentiles(values):
+    if not values:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "mean_ms": 0.0}
+    ordered = np.sort(np.asarray(values)) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(ordered, 50)), 2),
+        "p95_ms": round(float(np.percentile(ordered, 95)), 2),
+        "p99_ms": round(float(np.percentile(ordered, 99)), 2),
+        "mean_ms": round(float(ordered.mean()), 2),
+    }
+
+
+def _crypto(requests):
+    """Fernet encrypt/decrypt calls and time per request, from the tracer"""
+    snapshot = tracer.snapshot()
+    stages = {name: snapshot.get(name, {"count": 0, "mean_ms": 0.0}) for name in ("encrypt", "decrypt")}
+    requests = max(requests, 1)
+    return {
+        "encrypt_calls": round(stages["encrypt"]["count"] / requests, 2),
+        "decrypt_calls": round(stages["decrypt"]["count"] / requests, 2),
+        "ms": round(sum(stage["count"] * stage["mean_ms"] for stage in stages.values()) / requests, 4),
+    }
+
+
+def _measure(fakes, run):
+    reset_state()
+    calls_before = fakes.call_counts()
+    tracemalloc.start()
+    started = time.perf_counter()
+    latencies, errors, wall = run()
+    wall = wall or time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    calls_after = fakes.call_counts()
+
+    metrics = {
+        "requests": len(latencies),
+        "errors": errors,
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 3) if wall else 0.0,
+        "peak_memory_mb": round(peak / (1024 * 1024), 2),
+        "service_calls": {name: calls_after[name] - calls_before[name] for name in calls_after},
+        "stages_p50_ms": {name: stats["p50_ms"] for name, stats in tracer.snapshot().items()},
+        "enhancement": core.enhancement_policy.stats(),
+        "dispatcher": dispatcher.stats(),
+        "wait_p50_ms": {name: stats["p50_ms"] for name, stats in tracer.snapshot().items() if name.endswith("_wait")},
+        "crypto": _crypto(len(latencies)),
+        "glossary": core.glossary.stats(),
+    }
+    metrics.update(_percentiles(latencies))
+    return metrics
+
+
+def bench_pipeline(fakes, seconds, concurrency, requests, mode="two_step"):
+    recordings = [make_recording(seconds, seed) for seed in range(requests)]
+    pipeline = TranslationPipeline(enhance=True, tts=True, mode=mode)
+
+    def run():
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(lambda audio: pipeline.process(audio, "en", "es"), recordings))
+        latencies = [result["timings"]["total"] for result in results]
+        errors = sum(1 for result in results if result["status"] != "ok")
+        return latencies, errors, None
+
+    return _measure(fakes, run)
+
+
+def bench_streaming(fakes, seconds, requests):
+    """Sequential requests through secure_stream_enhance_translate, as the app runs them
+
+    The enhancement policy is switched off (as with ENHANCE_POLICY=always) so
+    every request takes the full streamed LLM pass. The same recordings are
+    then run through the non-streamed TranslationPipeline, where the first
+    audio is only ready once the whole result is.
+    """
+    recordings = [make_recording(seconds, seed) for seed in range(requests)]
+    first_audio = []
+    pipeline = TranslationPipeline(enhance=True, tts=True)
+
+    def run():
+        latencies = []
+        errors = 0
+        for audio in recordings:
+            started = time.perf_counter()
+            first = None
+            done = None
+            with request_scope(), secure_scope():
+                status = core.new_status()
+                transcription = core.secure_transcribe_audio_bytes(audio, "en", status)
+                if transcription and not status.language_error:
+                    for event in core.secure_stream_enhance_translate(transcription, "es", "en", status.transcript_segments):
+                        if event["event"] == "audio" and event["audio"] and first is None:
+                            first = time.perf_counter() - started
+                        elif event["event"] == "done":
+                            done = event
+            total = time.perf_counter() - started
+            if first is None or done is None or not done["translation"] or done["missing"]:
+                errors += 1
+            latencies.append(total)
+            first_audio.append(first if first is not None else total)
+        return latencies, errors, None
+
+    def run_unstreamed():
+        latencies = []
+        errors = 0
+        for audio in recordings:
+            result = pipeline.process(audio, "en", "es")
+            latencies.append(result["timings"]["total"])
+            errors += 0 if result["status"] == "ok" and result.get("translation_audio") else 1
+        return latencies, errors, None
+
+    enabled = core.enhancement_policy.enabled
+    core.enhancement_policy.enabled = False
+    try:
+        metrics = _measure(fakes, run)
+        metrics["first_audio"] = _percentiles(first_audio)
+        unstreamed = _measure(fakes, run_unstreamed)
+    finally:
+        core.enhancement_policy.enabled = enabled
+    # Without streaming, audio is first available when the whole result is
+    metrics["non_streamed"] = {
+        "p50_ms": unstreamed["p50_ms"],
+        "first_audio_p50_ms": unstreamed["p50_ms"],
+        "errors": unstreamed["errors"],
+    }
+    return metrics
+
+
+def bench_duplicates(fakes, seconds, concurrency):
+    """The same recording from several sessions at once, with no result cache in front"""
+    audio = make_recording(seconds, seed=20_000)
+    pipeline = TranslationPipeline(enhance=True, tts=True)
+
+    def run():
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(lambda _: pipeline.process(audio, "en", "es"), range(concurrency)))
+        latencies = [result["timings"]["total"] for result in results]
+        errors = sum(1 for result in results if result["status"] != "ok")
+        return latencies, errors, None
+
+    return _measure(fakes, run)
+
+
+def bench_reruns(fakes, seconds, reruns):
+    """Mirror what app.main does on each rerun after a recording was processed"""
+    audio = make_recording(seconds, seed=10_000)
+    cache = PipelineResultCache()
+    pipeline = TranslationPipeline(enhance=True)
+
+    def rerun(play):
+        cache_key = make_cache_key(audio, "en", "es")
+        cached = cache.get(cache_key)
+        if cached is None:
+            result = pipeline.process(audio, "en", "es")
+            if result["status"] != "ok":
+                return False
+            cached = {"transcription": result["transcription"], "translation": result["translation"]}
+            cache.put(cache_key, cached)
+        with secure_scope():
+            encrypted_original = core.security.wrap(cached["transcription"])
+            encrypted_translation = core.security.wrap(cached["translation"])
+            core.secure_prerender_speech(encrypted_original, "en")
+            core.secure_prerender_speech(encrypted_translation, "es")
+            if play:
+                return core.secure_text_to_speech(encrypted_translation, "es") is not None
+            return True
+
+    def run():
+        latencies = []
+        errors = 0
+        for index in range(reruns + 1):
+            started = time.perf_counter()
+            ok = rerun(play=index % 2 == 1)
+            latencies.append(time.perf_counter() - started)
+            errors += 0 if ok else 1
+        # The first run pays for the pipeline; report the reruns on their own
+        return latencies[1:], errors, sum(latencies[1:])
+
+    return _measure(fakes, run)
+
+
+def bench_crypto(fakes, seconds, requests):
+    """Fernet work per utterance with SecureText scopes, and without them as the baseline"""
+    recordings = [make_recording(seconds, seed) for seed in range(requests)]
+    pipeline = TranslationPipeline(enhance=True, tts=True)
+
+    def runner(hold):
+        def run():
+            latencies = []
+            errors = 0
+            for audio in recordings:
+                # hold=False makes every stage encrypt its output and decrypt its input
+                with secure_scope(hold=hold):
+                    result = pipeline.process(audio, "en", "es")
+                latencies.append(result["timings"]["total"])
+                errors += 0 if result["status"] == "ok" else 1
+            return latencies, errors, None
+        return run
+
+    metrics = _measure(fakes, runner(hold=True))
+    metrics["unscoped_crypto"] = _measure(fakes, runner(hold=False))["crypto"]
+    return metrics
+
+
+def bench_glossary(fakes, seconds, requests):
+    """LLM calls and tokens per utterance with the glossary pre-pass, and without any glossary"""
+    recordings = [make_recording(seconds, seed) for seed in range(requests)]
+    pipeline = TranslationPipeline(enhance=True, tts=True)
+
+    def run():
+        latencies = []
+        errors = 0
+        for audio in recordings:
+            result = pipeline.process(audio, "en", "es")
+            latencies.append(result["timings"]["total"])
+            errors += 0 if result["status"] == "ok" else 1
+        return latencies, errors, None
+
+    metrics = _measure(fakes, run)
+    glossary = core.glossary
+    core.glossary = Glossary({})
+    try:
+        without = _measure(fakes, run)
+    finally:
+        core.glossary = glossary
+    metrics["without_glossary"] = {
+        "p50_ms": without["p50_ms"],
+        "llm_calls": without["enhancement"]["llm_calls"],
+        "tokens_sent": without["enhancement"]["tokens_sent"],
+    }
+    return metrics
+
+
+def bench_fan_out(fakes, seconds, requests, targets):
+    """Several target languages per recording: one fan-out run versus one pipeline run per target"""
+    recordings = [make_recording(seconds, seed) for seed in range(requests)]
+    pipeline = TranslationPipeline(enhance=True, tts=True)
+
+    def fan_out():
+        latencies = []
+        errors = 0
+        for audio in recordings:
+            result = pipeline.process_many(audio, "en", targets)
+            latencies.append(result["timings"]["total"])
+            errors += 0 if result["status"] == "ok" else 1
+        return latencies, errors, None
+
+    def per_target():
+        latencies = []
+        errors = 0
+        for audio in recordings:
+            started = time.perf_counter()
+            results = [pipeline.process(audio, "en", target) for target in targets]
+            latencies.append(time.perf_counter() - started)
+            errors += sum(1 for result in results if result["status"] != "ok")
+        return latencies, errors, None
+
+    metrics = _measure(fakes, fan_out)
+    sequential = _measure(fakes, per_target)
+    metrics["per_target"] = {
+        "p50_ms": sequential["p50_ms"], "p95_ms": sequential["p95_ms"],
+        "service_calls": sequential["service_calls"],
+    }
+    return metrics
+
+
+def compare(report, baseline, tolerance):
+    """Return human-readable regressions of report against baseline"""
+    regressions = []
+    for name, metrics in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        if previous["p95_ms"] and metrics["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']} -> {metrics['p95_ms']} ms")
+        if previous["throughput_rps"] and metrics["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {previous['throughput_rps']} -> {metrics['throughput_rps']} req/s")
+    return regressions
+
+
+def _int_list(value):
+    return [int(item) for item in value.split(",") if item]
+
+
+def _float_list(value):
+    return [float(item) for item in value.split(",") if item]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lengths", type=_float_list, default=[3.0, 15.0, 60.0], help="Recording lengths in seconds")
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 4, 8], help="Concurrent request levels")
+    parser.add_argument("--modes", type=lambda value: [item for item in value.split(",") if item],
+                        default=["two_step", "fused"], help="Enhance/translate modes to run: two_step, fused")
+    parser.add_argument("--requests", type=int, default=8, help="Requests per pipeline scenario")
+    parser.add_argument("--reruns", type=int, default=20, help="Reruns per rerun scenario")
+    parser.add_argument("--targets", type=lambda value: [item for item in value.split(",") if item],
+                        default=["es", "fr", "de", "ja"], help="Target languages of the fanout scenarios")
+    parser.add_argument("--rate-limits", default=os.environ["RATE_LIMITS"],
+                        help='Per-model limits, e.g. "whisper-large-v3=20,llama3-groq-70b-8192-tool-use-preview=30/6000"')
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every fake latency by this factor")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Failure probability of each fake call")
+    parser.add_argument("--low-confidence-rate", type=float, default=0.2,
+                        help="Share of fake Whisper segments reported as low-confidence")
+    parser.add_argument("--mishearing-rate", type=float, default=0.5,
+                        help="Share of low-confidence fake segments that contain a known mis-hearing")
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--save-baseline", help="Store the report as a baseline at this path")
+    parser.add_argument("--compare", help="Compare against a stored baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression")
+    args = parser.parse_args(argv)
+
+    dispatcher.configure(parse_limits(args.rate_limits))
+    fakes = FakeServices(
+        scale=args.scale, error_rate=args.error_rate, low_confidence_rate=args.low_confidence_rate,
+        mishearing_rate=args.mishearing_rate
+    )
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scale": args.scale,
+            "error_rate": args.error_rate,
+            "low_confidence_rate": args.low_confidence_rate,
+            "mishearing_rate": args.mishearing_rate,
+            "rate_limits": args.rate_limits,
+            "targets": args.targets,
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "scenarios": {},
+    }
+
+    with fakes.installed():
+        for seconds in args.lengths:
+            for concurrency in args.concurrency:
+                for mode in args.modes:
+                    name = f"pipeline/len={seconds:g}/c={concurrency}"
+                    if mode != "two_step":
+                        name += f"/mode={mode}"
+                    report["scenarios"][name] = bench_pipeline(
+                        fakes, seconds, concurrency, max(args.requests, concurrency), mode
+                    )
+                    print(_format_row(name, report["scenarios"][name]), file=sys.stderr)
+            name = f"stream/len={seconds:g}"
+            report["scenarios"][name] = bench_streaming(fakes, seconds, args.requests)
+            print(_format_row(name, report["scenarios"][name]), file=sys.stderr)
+            name = f"reruns/len={seconds:g}"
+            report["scenarios"][name] = bench_reruns(fakes, seconds, args.reruns)
+            print(_format_row(name, report["scenarios"][name]), file=sys.stderr)
+            name = f"crypto/len={seconds:g}"
+            report["scenarios"][name] = bench_crypto(fakes, seconds, args.requests)
+            print(_format_row(name, report["scenarios"][name]), file=sys.stderr)
+            name = f"glossary/len={seconds:g}"
+            report["scenarios"][name] = bench_glossary(fakes, seconds, args.requests)
+            print(_format_row(name, report["scenarios"][name]), file=sys.stderr)
+            name = f"fanout/len={seconds:g}"
+            report["scenarios"][name] = bench_fan_out(fakes, seconds, args.requests, args.targets)
+            print(_format_row(name, report["scenarios"][name]), file=sys.stderr)
+
+        for concurrency in args.concurrency:
+            name = f"duplicates/c={concurrency}"
+            report["scenarios"][name] = bench_duplicates(fakes, args.lengths[0], concurrency)
+            print(_format_row(name, report["scenarios"][name]), file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            f.write(output)
+    if not args.output and not args.save_baseline:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+        print("No regressions against baseline", file=sys.stderr)
+    return 0
+
+
+def _format_row(name, metrics):
+    row = (
+        f"{name:38} {metrics['throughput_rps']:8.2f} req/s  p50 {metrics['p50_ms']:8.1f}  "
+        f"p95 {metrics['p95_ms']:8.1f}  p99 {metrics['p99_ms']:8.1f} ms  "
+        f"errors {metrics['errors']}  peak {metrics['peak_memory_mb']:.1f} MB"
+    )
+    if "first_audio" in metrics:
+        row += f"  first audio p50 {metrics['first_audio']['p50_ms']:.1f} ms"
+    if "non_streamed" in metrics:
+        row += f" (non-streamed {metrics['non_streamed']['first_audio_p50_ms']:.1f} ms)"
+    if "unscoped_crypto" in metrics:
+        before, after = metrics["unscoped_crypto"], metrics["crypto"]
+        row += (
+            f"  crypto/req {before['encrypt_calls'] + before['decrypt_calls']:g} calls {before['ms']:.3f} ms"
+            f" -> {after['encrypt_calls'] + after['decrypt_calls']:g} calls {after['ms']:.3f} ms"
+        )
+    if "without_glossary" in metrics:
+        before, after = metrics["without_glossary"], metrics["enhancement"]
+        row += (
+            f"  LLM calls {before['llm_calls']} -> {after['llm_calls']}"
+            f"  tokens {before['tokens_sent']} -> {after['tokens_sent']}"
+        )
+    if "per_target" in metrics:
+        row += f"  one run per target p50 {metrics['per_target']['p50_ms']:.1f} ms"
+    return row
+
+
+if __name__ == "__main__":
+    sys.exit(main())
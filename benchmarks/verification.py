@@ -0,0 +1,257 @@
+"""Compare transcript language verification engines on accuracy and latency.
+
+Every labelled sample is verified twice: against its own language, where a
+rejection is a false rejection, and against a decoy language, where
+acceptance is a missed mismatch. Engines:
+
+    langdetect          the previous check: langdetect.detect() on every
+                        transcript, skipped for languages it has no profile for
+    engine              core.language_verifier with Whisper's language field
+                        echoing the hint (WHISPER_LANGUAGE_HINT=1)
+    engine/unhinted     the same with Whisper detecting the language itself
+                        (WHISPER_LANGUAGE_HINT=0), so its field is evidence
+
+Reports false rejections, missed mismatches (and how many of those were
+texts too short to check), mean and p95 latency per call
+and the cold cost of the first call in a fresh process. langdetect is
+seeded so its answers are repeatable.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault("api_key", "offline-benchmark")
+os.environ["TRANSLATION_MEMORY_PATH"] = ""
+
+import core
+from language_registry import WHISPER_NAMES, language_registry
+from resources import registry
+
+# Short samples (fewer than LANGUAGE_VERIFY_MIN_LETTERS letters) come last
+SAMPLES = {
+    "en": [
+        "The patient has had a headache since yesterday morning.",
+        "Please take two tablets after every meal with some water.",
+        "Yes, thanks.",
+    ],
+    "es": [
+        "El paciente tiene dolor de cabeza desde ayer por la mañana.",
+        "Tome dos pastillas después de cada comida con un poco de agua.",
+        "Sí, gracias.",
+    ],
+    "pt": [
+        "O paciente está com dor de cabeça desde ontem de manhã.",
+        "Tome dois comprimidos depois de cada refeição com um pouco de água.",
+        "Sim, obrigado.",
+    ],
+    "fr": [
+        "Le patient a mal à la tête depuis hier matin.",
+        "Prenez deux comprimés après chaque repas avec un peu d'eau.",
+        "Oui, merci.",
+    ],
+    "it": [
+        "Il paziente ha mal di testa da ieri mattina.",
+        "Prenda due compresse dopo ogni pasto con un po' d'acqua.",
+        "Sì, grazie.",
+    ],
+    "de": [
+        "Der Patient hat seit gestern Morgen Kopfschmerzen.",
+        "Nehmen Sie nach jeder Mahlzeit zwei Tabletten mit etwas Wasser.",
+        "Ja, danke.",
+    ],
+    "nl": [
+        "De patiënt heeft sinds gisterenochtend hoofdpijn.",
+        "Neem na elke maaltijd twee tabletten met wat water.",
+        "Ja, bedankt.",
+    ],
+    "sv": [
+        "Patienten har haft huvudvärk sedan i går morse.",
+        "Ta två tabletter efter varje måltid med lite vatten.",
+        "Ja, tack.",
+    ],
+    "da": [
+        "Patienten har haft hovedpine siden i går morges, og det bliver værre.",
+        "Tag to tabletter efter hvert måltid med lidt vand.",
+        "Ja, tak.",
+    ],
+    "pl": [
+        "Pacjent ma ból głowy od wczoraj rana.",
+        "Proszę brać dwie tabletki po każdym posiłku, popijając wodą.",
+        "Tak, dziękuję.",
+    ],
+    "tr": [
+        "Hastanın dün sabahtan beri baş ağrısı var.",
+        "Her yemekten sonra biraz suyla iki tablet alın.",
+        "Evet, teşekkürler.",
+    ],
+    "id": [
+        "Pasien mengalami sakit kepala sejak kemarin pagi.",
+        "Minum dua tablet setelah setiap makan dengan sedikit air.",
+        "Ya, terima kasih.",
+    ],
+    "fil": [
+        "Ang pasyente ay may sakit ng ulo mula kahapon ng umaga.",
+        "Uminom ng dalawang tableta pagkatapos ng bawat pagkain.",
+        "Oo, salamat.",
+    ],
+    "ru": [
+        "У пациента болит голова со вчерашнего утра.",
+        "Принимайте две таблетки после каждого приёма пищи, запивая водой.",
+        "Да, спасибо.",
+    ],
+    "uk": [
+        "У пацієнта болить голова з учорашнього ранку.",
+        "Приймайте дві таблетки після кожного прийому їжі, запиваючи водою.",
+        "Так, дякую.",
+    ],
+    "el": [
+        "Ο ασθενής έχει πονοκέφαλο από χθες το πρωί.",
+        "Πάρτε δύο δισκία μετά από κάθε γεύμα με λίγο νερό.",
+        "Ναι, ευχαριστώ.",
+    ],
+    "ar": [
+        "يعاني المريض من صداع منذ صباح أمس.",
+        "تناول قرصين بعد كل وجبة مع قليل من الماء.",
+        "نعم، شكرا.",
+    ],
+    "hi": [
+        "मरीज़ को कल सुबह से सिरदर्द हो रहा है।",
+        "हर भोजन के बाद थोड़े पानी के साथ दो गोलियां लें।",
+        "हाँ, धन्यवाद।",
+    ],
+    "ja": [
+        "患者は昨日の朝から頭痛を訴えています。",
+        "毎食後に水と一緒に二錠飲んでください。",
+        "はい、どうも。",
+    ],
+    "zh-CN": [
+        "病人从昨天早上开始头痛。",
+        "每顿饭后用水服用两片药。",
+        "好的，谢谢。",
+    ],
+    "ko": [
+        "환자는 어제 아침부터 두통을 호소하고 있습니다.",
+        "매 식사 후 물과 함께 두 알을 복용하세요.",
+        "네, 감사합니다.",
+    ],
+}
+
+
+def labelled_cases():
+    """(text, true code, expected code, should match) for every sample and its decoy"""
+    codes = list(SAMPLES)
+    cases = []
+    for position, code in enumerate(codes):
+        decoy = codes[(position + 1) % len(codes)]
+        for text in SAMPLES[code]:
+            cases.append((text, code, code, True))
+            cases.append((text, code, decoy, False))
+    return cases
+
+
+def _whisper_name(code):
+    return {value: name for name, value in WHISPER_NAMES.items()}.get(language_registry.provider_code(code, "whisper"))
+
+
+def legacy_verify(langdetect, text, expected):
+    """The check this engine replaced; True lets the transcript through"""
+    if not language_registry.supports("langdetect", expected):
+        return True
+    try:
+        detected = language_registry.normalize(langdetect.detect(text), "langdetect")
+    except langdetect.LangDetectException:
+        return True
+    return language_registry.same_language(detected, expected)
+
+
+def engine_verify(text, expected, whisper_language, hinted):
+    result = core.language_verifier.verify(text, expected, whisper_language=whisper_language, hinted=hinted)
+    return result["verdict"] != "mismatch"
+
+
+def _percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+def evaluate(verify, cases, rounds):
+    """Accuracy over cases and per-call latency over rounds of them"""
+    false_rejections = missed_mismatches = short_misses = 0
+    latencies = []
+    for round_index in range(rounds):
+        for case in cases:
+            text, _, _, should_match = case
+            started = time.perf_counter()
+            accepted = verify(case)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if round_index == 0:
+                if should_match and not accepted:
+                    false_rejections += 1
+                elif not should_match and accepted:
+                    missed_mismatches += 1
+                    short_misses += sum(char.isalpha() for char in text) < core.language_verifier.min_letters
+    matching = sum(1 for case in cases if case[3])
+    return {
+        "false_rejections": false_rejections,
+        "false_rejection_rate": round(false_rejections / matching, 3),
+        "missed_mismatches": missed_mismatches,
+        "missed_mismatch_rate": round(missed_mismatches / (len(cases) - matching), 3),
+        "missed_short_mismatches": short_misses,
+        "mean_ms": round(sum(latencies) / len(latencies), 4),
+        "p95_ms": round(_percentile(latencies, 0.95), 4),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=5, help="Times to verify every case for latency")
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args(argv)
+
+    cases = labelled_cases()
+
+    # Cold costs first, while neither engine has loaded its profiles
+    import langdetect
+    from langdetect import DetectorFactory
+
+    DetectorFactory.seed = 0
+    started = time.perf_counter()
+    legacy_verify(langdetect, cases[0][0], cases[0][2])
+    legacy_cold = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    registry.get("language_model")
+    engine_verify(cases[0][0], cases[0][2], None, True)
+    engine_cold = (time.perf_counter() - started) * 1000
+
+    engines = {
+        "langdetect": (lambda case: legacy_verify(langdetect, case[0], case[2]), legacy_cold),
+        "engine": (lambda case: engine_verify(case[0], case[2], _whisper_name(case[2]), True), engine_cold),
+        "engine/unhinted": (lambda case: engine_verify(case[0], case[2], _whisper_name(case[1]), False), engine_cold),
+    }
+    report = {"meta": {"cases": len(cases), "rounds": args.rounds}, "engines": {}}
+    for name, (verify, cold) in engines.items():
+        metrics = evaluate(verify, cases, args.rounds)
+        metrics["cold_ms"] = round(cold, 1)
+        report["engines"][name] = metrics
+        print(
+            f"{name:16} false rejections {metrics['false_rejections']:3} ({metrics['false_rejection_rate']:.1%})  "
+            f"missed mismatches {metrics['missed_mismatches']:3} ({metrics['missed_mismatch_rate']:.1%}, "
+            f"{metrics['missed_short_mismatches']} short)  "
+            f"mean {metrics['mean_ms']:7.3f} ms  p95 {metrics['p95_ms']:7.3f} ms  cold {metrics['cold_ms']:7.1f} ms",
+            file=sys.stderr
+        )
+    report["engines"]["engine"]["verdicts"] = core.language_verifier.stats()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
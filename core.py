@@ -0,0 +1,822 @@
+import os
+import json
+import wave
+from dotenv import load_dotenv
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from cryptography.fernet import Fernet
+from types import SimpleNamespace
+from resources import registry
+from translation_memory import TranslationMemory, SentenceBuffer, split_sentences, join_sentences
+from tts_engine import TTSEngine
+from enhancement_policy import EnhancementPolicy, estimate_tokens
+from dispatcher import dispatcher, request_key
+from audio_processing import prepare_speech, encode_audio, plan_windows
+from telemetry import tracer, bind_context
+from secure_text import SecureText
+from language_registry import language_registry
+from language_verification import LanguageVerifier, ScriptCheck, WhisperCheck, NgramCheck
+from glossary import Glossary
+
+# Load environment variables
+load_dotenv()
+
+# Basic security setup
+class BasicSecurity:
+    def __init__(self):
+        # Generate or load encryption key
+        self.encryption_key = os.getenv("ENCRYPTION_KEY") or Fernet.generate_key()
+        self.cipher_suite = Fernet(self.encryption_key)
+
+    def encrypt_text(self, text):
+        """Encrypt sensitive text data"""
+        if isinstance(text, str):
+            with tracer.stage("encrypt", bytes_in=len(text), log=False) as span:
+                encrypted = self.cipher_suite.encrypt(text.encode()).decode()
+                span["bytes_out"] = len(encrypted)
+            return encrypted
+        return text
+
+    def decrypt_text(self, encrypted_text):
+        """Decrypt sensitive text data"""
+        if isinstance(encrypted_text, SecureText):
+            return encrypted_text.reveal()
+        if isinstance(encrypted_text, str):
+            with tracer.stage("decrypt", bytes_in=len(encrypted_text), log=False) as span:
+                try:
+                    decrypted = self.cipher_suite.decrypt(encrypted_text.encode()).decode()
+                except:
+                    span["outcome"] = "invalid"
+                    return None
+                span["bytes_out"] = len(decrypted)
+            return decrypted
+        return encrypted_text
+
+    def wrap(self, text):
+        """SecureText for plaintext produced by a pipeline stage"""
+        return SecureText(self, plaintext=text) if text is not None else None
+
+    def open(self, value):
+        """SecureText for a stage input (a SecureText or a Fernet token string)"""
+        return SecureText.coerce(self, value)
+
+# Initialize security once per process
+registry.register("security", BasicSecurity)
+security = registry.get("security")
+
+def get_client():
+    """Shared Groq client, built on first use"""
+    return registry.get("groq")
+
+# Upload format for Whisper: flac, opus or wav
+AUDIO_UPLOAD_FORMAT = os.getenv("AUDIO_UPLOAD_FORMAT", "flac")
+
+# Recordings longer than this are transcribed as parallel overlapping windows
+LONG_AUDIO_SECONDS = float(os.getenv("LONG_AUDIO_SECONDS", "45"))
+LONG_AUDIO_CHUNK_SECONDS = float(os.getenv("LONG_AUDIO_CHUNK_SECONDS", "20"))
+LONG_AUDIO_OVERLAP_SECONDS = 1.0
+_transcription_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("LONG_AUDIO_WORKERS", "4")),
+    thread_name_prefix="whisper-window"
+)
+
+# Sentences of a streamed enhancement are translated and synthesized here
+_sentence_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("SENTENCE_WORKERS", "4")),
+    thread_name_prefix="sentence"
+)
+
+# Target languages of a multi-target request are translated and synthesized here
+_fan_out_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("FAN_OUT_WORKERS", "4")),
+    thread_name_prefix="fan-out"
+)
+
+# Sentence-level translation memory; persisted only when the key is stable
+translation_memory = TranslationMemory(
+    path=os.getenv("TRANSLATION_MEMORY_PATH") if os.getenv("ENCRYPTION_KEY") else None,
+    cipher=security,
+    fuzzy_threshold=float(os.getenv("TRANSLATION_MEMORY_THRESHOLD", "0.9"))
+)
+
+# In-memory speech synthesis shared by every session in the process
+tts_engine = TTSEngine(
+    max_entries=int(os.getenv("TTS_CACHE_MAX_ENTRIES", "128")),
+    max_bytes=int(float(os.getenv("TTS_CACHE_MAX_MB", "32")) * 1024 * 1024)
+)
+
+# Skip or narrow the LLM pass when Whisper is already confident;
+# ENHANCE_POLICY=always sends every transcript in full
+enhancement_policy = EnhancementPolicy(
+    enabled=os.getenv("ENHANCE_POLICY", "confidence") != "always",
+    min_avg_logprob=float(os.getenv("ENHANCE_MIN_AVG_LOGPROB", "-0.5")),
+    max_no_speech_prob=float(os.getenv("ENHANCE_MAX_NO_SPEECH_PROB", "0.6")),
+    max_compression_ratio=float(os.getenv("ENHANCE_MAX_COMPRESSION_RATIO", "2.4"))
+)
+
+# Known mis-hearings fixed before the LLM and terms kept out of machine translation;
+# GLOSSARY_PATH names a JSON glossary that replaces the built-in one
+glossary = Glossary.load(
+    os.getenv("GLOSSARY_PATH"),
+    protect_translations=os.getenv("GLOSSARY_PROTECT", "1") == "1"
+)
+
+# Script first, then Whisper's reported language, then the n-gram model;
+# transcripts with fewer letters than LANGUAGE_VERIFY_MIN_LETTERS skip the model
+language_verifier = LanguageVerifier(
+    [ScriptCheck(), WhisperCheck(), NgramCheck(lambda: registry.get("language_model"))],
+    min_letters=int(os.getenv("LANGUAGE_VERIFY_MIN_LETTERS", "12")),
+    namer=lambda text, candidates: registry.get("language_model").best(text, candidates)
+)
+
+# With the hint Whisper transcribes as the selected language and echoes it back;
+# WHISPER_LANGUAGE_HINT=0 lets it detect, which makes its language field evidence
+WHISPER_LANGUAGE_HINT = os.getenv("WHISPER_LANGUAGE_HINT", "1") == "1"
+
+WHISPER_MODEL = "whisper-large-v3"
+ENHANCE_MODEL = "llama3-groq-70b-8192-tool-use-preview"
+
+# "two_step": LLM terminology pass, then Google Translate;
+# "fused": one chat completion corrects and translates
+PIPELINE_MODE = os.getenv("PIPELINE_MODE", "two_step")
+
+ENHANCE_SYSTEM_PROMPT = "You are a translation and transcription expert. Correct and enhance any terminology in the following text while preserving the original meaning. just translate what input you receive."
+ENHANCE_EXCERPTS_NOTE = " The input is a list of separate excerpts, one per line; return exactly one corrected line per excerpt, in the same order."
+ENHANCE_TERMS_NOTE = " These terms are already correct; keep them exactly as written: {terms}."
+FUSED_SYSTEM_PROMPT = (
+    "You are a translation and transcription expert. Correct and enhance any terminology in the user's text "
+    "({source_name}) while preserving the original meaning, then translate the corrected text into "
+    "{target_name} (language code \"{target_code}\"). Reply with a JSON object with exactly two string "
+    "fields: \"corrected\", the corrected text in the original language, and \"translation\", its translation."
+)
+
+def new_status():
+    """Create a status object for callers that have no Streamlit session state"""
+    return SimpleNamespace(language_error=False, error_message="", transcript_segments=None)
+
+def _request_transcription(filename, audio_data, expected_lang_code):
+    """Send audio to Whisper and return the verbose_json response"""
+    options = {}
+    if WHISPER_LANGUAGE_HINT:
+        # Tell Whisper which language to expect
+        options["language"] = language_registry.provider_code(expected_lang_code, "whisper")
+    with tracer.stage("whisper", bytes_in=len(audio_data)) as span:
+        # Instruct Whisper to focus on the expected language
+        transcription = dispatcher.call(
+            "groq_whisper",
+            lambda: get_client().audio.transcriptions.create(
+                file=(filename, audio_data),
+                model=WHISPER_MODEL,
+                response_format="verbose_json",
+                **options
+            ),
+            key=request_key(WHISPER_MODEL, audio_data, expected_lang_code),
+            model=WHISPER_MODEL
+        )
+        span["bytes_out"] = len(transcription.text or "")
+    return transcription
+
+def _verify_language(transcribed_text, expected_lang_code, status, whisper_language=None):
+    """Check that the transcript is in the expected language; False on mismatch"""
+    try:
+        with tracer.stage("verify_language", bytes_in=len(transcribed_text)) as span:
+            result = language_verifier.verify(
+                transcribed_text, expected_lang_code,
+                whisper_language=whisper_language, hinted=WHISPER_LANGUAGE_HINT
+            )
+            span["outcome"] = f"{result['method']}/{result['verdict']}"
+    except Exception as e:
+        # If language verification fails, proceed with caution but don't block
+        logging.warning(f"Language verification failed, proceeding with transcription: {str(e)}")
+        return True
+
+    if result["verdict"] == "mismatch":
+        detected = result["detected"]
+        status.language_error = True
+        status.error_message = f"Language mismatch detected. You selected {language_registry.name(expected_lang_code)} but spoke in {language_registry.name(detected) if detected else 'another language'}."
+        return False
+
+    # Reset error state if no error
+    status.language_error = False
+    status.error_message = ""
+    return True
+
+def _transcribe(filename, audio_data, expected_lang_code, status):
+    """Transcribe one upload, verify its language and return the encrypted text"""
+    transcription = _request_transcription(filename, audio_data, expected_lang_code)
+    status.transcript_segments = _segment_signals(getattr(transcription, "segments", None) or [])
+
+    # Get the transcribed text
+    transcribed_text = transcription.text
+    if not _verify_language(transcribed_text, expected_lang_code, status, getattr(transcription, "language", None)):
+        return None
+
+    # Encrypted only if it has to leave the current secure scope
+    return security.wrap(transcribed_text)
+
+def _segment_value(segment, name):
+    """Read a field from a verbose_json segment (dict or object)"""
+    if isinstance(segment, dict):
+        return segment.get(name)
+    return getattr(segment, name, None)
+
+def _segment_signals(segments):
+    """Keep the text and confidence signals of verbose_json segments"""
+    return [
+        {name: _segment_value(segment, name) for name in ("text", "avg_logprob", "no_speech_prob", "compression_ratio")}
+        for segment in segments
+    ]
+
+def _stitch_windows(windows, responses, sample_rate):
+    """Join window transcripts, keeping each segment only in the window that owns it
+
+    A segment belongs to the window whose core range contains its midpoint,
+    so speech heard twice in an overlap is kept exactly once. Returns the
+    text and the kept segments.
+    """
+    pieces = []
+    kept = []
+    for window, response in zip(windows, responses):
+        offset = window["start"] / sample_rate
+        core_start = window["core_start"] / sample_rate
+        core_end = window["core_end"] / sample_rate
+        segments = getattr(response, "segments", None)
+        if not segments:
+            pieces.append((response.text or "").strip())
+            continue
+        for segment in segments:
+            midpoint = offset + (_segment_value(segment, "start") + _segment_value(segment, "end")) / 2
+            if core_start <= midpoint < core_end:
+                pieces.append((_segment_value(segment, "text") or "").strip())
+                kept.append(segment)
+    return " ".join(piece for piece in pieces if piece), kept
+
+def _transcribe_long(samples, sample_rate, expected_lang_code, status):
+    """Transcribe a long recording as concurrent overlapping windows"""
+    windows = plan_windows(
+        samples, sample_rate,
+        chunk_s=LONG_AUDIO_CHUNK_SECONDS, overlap_s=LONG_AUDIO_OVERLAP_SECONDS
+    )
+
+    def transcribe_window(window):
+        data, extension = encode_audio(samples[window["start"]:window["end"]], sample_rate, AUDIO_UPLOAD_FORMAT)
+        return _request_transcription(f"chunk.{extension}", data, expected_lang_code)
+
+    responses = list(_transcription_pool.map(bind_context(transcribe_window), windows))
+    logging.info(f"Long audio: transcribed {len(samples) / sample_rate:.1f}s in {len(windows)} windows")
+
+    transcribed_text, segments = _stitch_windows(windows, responses, sample_rate)
+    # Windows without segments leave no signals to judge the whole text by
+    if all(getattr(response, "segments", None) for response in responses):
+        status.transcript_segments = _segment_signals(segments)
+    # The language most windows reported speaks for the whole recording
+    languages = Counter(getattr(response, "language", None) for response in responses if getattr(response, "language", None))
+    whisper_language = languages.most_common(1)[0][0] if languages else None
+    if not _verify_language(transcribed_text, expected_lang_code, status, whisper_language):
+        return None
+    return security.wrap(transcribed_text)
+
+def secure_transcribe_audio_bytes(audio_bytes, expected_lang_code, status=None):
+    """Preprocess an in-memory recording and transcribe it without a temp file
+
+    The recording is trimmed, downmixed, resampled to 16 kHz and compressed
+    before upload. Recordings without speech are rejected locally, and
+    recordings longer than LONG_AUDIO_SECONDS are transcribed as concurrent
+    overlapping windows. Whisper's per-segment confidence signals are left in
+    ``status.transcript_segments`` for ``secure_enhance_medical_terms``.
+    """
+    if status is None:
+        status = new_status()
+    status.transcript_segments = None
+    if not language_registry.supports("whisper", expected_lang_code):
+        # Fail before the upload rather than after a rejected request
+        status.language_error = True
+        status.error_message = f"Speech recognition is not available for {language_registry.name(expected_lang_code)}. Please choose another source language."
+        return None
+    try:
+        try:
+            with tracer.stage("preprocess", bytes_in=len(audio_bytes)) as span:
+                prepared = prepare_speech(audio_bytes)
+                span["bytes_out"] = int(prepared["samples"].nbytes)
+                if not prepared["has_speech"]:
+                    span["outcome"] = "no_speech"
+        except (wave.Error, ValueError, EOFError) as e:
+            # Not a PCM WAV we can decode: upload it unchanged
+            logging.warning(f"Audio preprocessing skipped: {str(e)}")
+            return _transcribe("audio.wav", audio_bytes, expected_lang_code, status)
+
+        if not prepared["has_speech"]:
+            status.language_error = True
+            status.error_message = "No speech detected in the recording. Please try again."
+            return None
+
+        if prepared["duration"] > LONG_AUDIO_SECONDS:
+            return _transcribe_long(prepared["samples"], prepared["sample_rate"], expected_lang_code, status)
+
+        with tracer.stage("encode", bytes_in=int(prepared["samples"].nbytes)) as span:
+            audio_data, extension = encode_audio(prepared["samples"], prepared["sample_rate"], AUDIO_UPLOAD_FORMAT)
+            span["bytes_out"] = len(audio_data)
+        saved = prepared["original_bytes"] - len(audio_data)
+        logging.info(
+            f"Audio preprocessing: {prepared['original_bytes']} -> {len(audio_data)} bytes "
+            f"({saved} saved, {prepared['duration']:.1f}s of speech)"
+        )
+        return _transcribe(f"audio.{extension}", audio_data, expected_lang_code, status)
+    except Exception as e:
+        logging.error(f"Transcription error: {str(e)}")
+        status.language_error = True
+        status.error_message = f"Error during transcription: {str(e)}"
+        return None
+
+def _remote_translate(sentences, target_lang):
+    """Translate a list of sentences with as few Google Translate calls as possible"""
+    with tracer.stage("translate", bytes_in=sum(len(sentence) for sentence in sentences)) as span:
+        translator = registry.get("translator")(
+            source='auto', target=language_registry.provider_code(target_lang, "google_translate")
+        )
+
+        def translate(text):
+            return dispatcher.call(
+                "google_translate", lambda: translator.translate(text), key=request_key(target_lang, text)
+            )
+
+        if len(sentences) == 1:
+            translations = [translate(sentences[0])]
+        else:
+            # One request for all sentences; fall back to one per sentence if
+            # the line structure does not survive the round trip
+            joined = translate("\n".join(sentences))
+            translations = [line.strip() for line in joined.split("\n")] if joined else []
+            if len(translations) != len(sentences):
+                translations = [translate(sentence) for sentence in sentences]
+        span["bytes_out"] = sum(len(translation or "") for translation in translations)
+    return translations
+
+def secure_translate_text(encrypted_text, target_lang, source_lang='auto'):
+    """Translate text with encryption, reusing the translation memory"""
+    try:
+        # Decrypted at most once per secure scope
+        decrypted_text = security.open(encrypted_text).reveal() if encrypted_text else None
+        if not decrypted_text:
+            return None
+        if not language_registry.supports("google_translate", target_lang):
+            logging.warning(f"Google Translate does not support {target_lang}")
+            return None
+
+        def remote_translate(sentences):
+            return _remote_translate(sentences, target_lang)
+
+        # Glossary terms travel as placeholders so the translator cannot alter them
+        masked_text, placeholders = glossary.protect(decrypted_text, source_lang, target_lang)
+        translation = translation_memory.translate(masked_text, source_lang, target_lang, remote_translate)
+        if placeholders:
+            restored = glossary.restore(translation, placeholders)
+            if restored is None:
+                logging.warning("Translation lost a protected term placeholder; translating without protection")
+                restored = translation_memory.translate(decrypted_text, source_lang, target_lang, remote_translate)
+            translation = restored
+
+        return security.wrap(translation)
+    except Exception as e:
+        logging.error(f"Translation error: {str(e)}")
+        return None
+
+def _chat_completion(system_prompt, text, max_tokens, coalesce=True, **kwargs):
+    """Chat completion through the dispatcher (rate limits, 429 retries, single flight)"""
+    messages = [{
+        "role": "system",
+        "content": system_prompt
+    }, {
+        "role": "user",
+        "content": text
+    }]
+    return dispatcher.call(
+        "groq_chat",
+        lambda: get_client().chat.completions.create(
+            model=ENHANCE_MODEL,
+            messages=messages,
+            temperature=0.3,
+            max_tokens=max_tokens,
+            **kwargs
+        ),
+        key=request_key(ENHANCE_MODEL, messages, max_tokens, sorted(kwargs.items())) if coalesce else None,
+        model=ENHANCE_MODEL,
+        # Prompt plus a completion of about the same length as the text
+        tokens=estimate_tokens(system_prompt + text) + estimate_tokens(text)
+    )
+
+def _terms_note(terms):
+    return ENHANCE_TERMS_NOTE.format(terms=", ".join(terms)) if terms else ""
+
+def _request_enhancement(text, excerpts=False, terms=()):
+    """Send text to the LLM terminology pass and return the corrected text"""
+    with tracer.stage("enhance", bytes_in=len(text)) as span:
+        completion = _chat_completion(
+            ENHANCE_SYSTEM_PROMPT + (ENHANCE_EXCERPTS_NOTE if excerpts else "") + _terms_note(terms),
+            text, max_tokens=1024
+        )
+        enhanced_text = completion.choices[0].message.content
+        span["bytes_out"] = len(enhanced_text or "")
+    return enhanced_text
+
+def _rejoin_segments(texts, lang):
+    """Join segment texts and correct glossary terms that span a segment boundary ("cat" | "scan")"""
+    text = " ".join(text for text in texts if text)
+    return glossary.correct(text, lang, record=False)[0]
+
+def _enhance_segments(segments, low_indices, terms=(), lang=None):
+    """Enhance only the low-confidence segments and rebuild the transcript
+
+    Consecutive low-confidence segments are sent together as one excerpt and
+    all excerpts go out in a single request, one per line. Returns the new
+    text and the text that was sent.
+    """
+    texts = [(_segment_value(segment, "text") or "").strip() for segment in segments]
+    runs = []
+    for index in low_indices:
+        if runs and runs[-1][-1] == index - 1:
+            runs[-1].append(index)
+        else:
+            runs.append([index])
+    excerpts = [" ".join(texts[i] for i in run) for run in runs]
+    sent_text = "\n".join(excerpts)
+
+    enhanced = _request_enhancement(sent_text, excerpts=len(excerpts) > 1, terms=terms)
+    if len(excerpts) == 1:
+        lines = [enhanced.strip()] if enhanced else []
+    else:
+        lines = [line.strip() for line in (enhanced or "").split("\n") if line.strip()]
+    if len(lines) != len(excerpts):
+        # The line structure did not survive; keep the raw transcript
+        logging.warning("Partial enhancement returned a different number of excerpts; keeping the transcript")
+        return _rejoin_segments(texts, lang), sent_text
+
+    for run, line in zip(runs, lines):
+        texts[run[0]] = line
+        for i in run[1:]:
+            texts[i] = ""
+    return _rejoin_segments(texts, lang), sent_text
+
+def _policy_payload(text, segments, decision):
+    """What the enhancement policy's decision sends to the LLM, or None for a skip"""
+    if decision["action"] == "skip":
+        return None
+    if decision["action"] == "partial":
+        return "\n".join((_segment_value(segments[i], "text") or "").strip() for i in decision["segments"])
+    return text
+
+def _glossary_pass(text, segments, lang):
+    """Apply the glossary before the enhancement policy decides
+
+    Returns the corrected text and segments, the policy decision and the
+    protected terms in the text, which go to the LLM as context. A
+    low-confidence segment in which the glossary fixed a known mis-hearing
+    counts as resolved: the mis-hearing is taken to be why Whisper was unsure.
+    """
+    with tracer.stage("glossary", bytes_in=len(text)) as span:
+        corrected_text, corrections = glossary.correct(text, lang)
+        resolved = []
+        if segments:
+            segments = _segment_signals(segments)
+            for index, segment in enumerate(segments):
+                segment["text"], fixed = glossary.correct(segment["text"] or "", lang, record=False)
+                if fixed and enhancement_policy.is_low_confidence(segment):
+                    resolved.append(index)
+        decision = enhancement_policy.decide(corrected_text, segments, resolved)
+        baseline = enhancement_policy.decide(corrected_text, segments) if resolved else decision
+        glossary.record_savings(
+            _policy_payload(corrected_text, segments, baseline),
+            _policy_payload(corrected_text, segments, decision),
+            resolved=len(resolved)
+        )
+        terms = glossary.terms_in(corrected_text, lang)
+        span["outcome"] = f"{corrections} corrections"
+        span["bytes_out"] = len(corrected_text)
+    return corrected_text, segments, decision, terms
+
+def secure_enhance_medical_terms(encrypted_text, segments=None, lang=None):
+    """Enhance medical terms with encryption
+
+    With Whisper ``segments`` (``status.transcript_segments`` after
+    transcription) the enhancement policy may skip the LLM call for confident
+    transcripts or send only the low-confidence segments. The glossary of
+    the source language ``lang`` first fixes known mis-hearings, which can
+    settle low-confidence segments without the LLM.
+    """
+    encrypted_text = security.open(encrypted_text)
+    try:
+        # Decrypted at most once per secure scope
+        decrypted_text = encrypted_text.reveal() if encrypted_text else None
+        if not decrypted_text:
+            return None
+
+        glossary_result = _glossary_pass(decrypted_text, segments, lang)
+    except Exception as e:
+        logging.error(f"Medical term enhancement error: {str(e)}")
+        return encrypted_text
+    return _enhance_decided(encrypted_text, decrypted_text, *glossary_result, lang=lang)
+
+def _enhance_decided(encrypted_text, decrypted_text, corrected_text, segments, decision, terms, lang=None):
+    """Run the LLM pass the policy decided on after the glossary pass"""
+    try:
+        if decision["action"] == "skip":
+            enhancement_policy.record("skip", corrected_text, calls=0)
+            return encrypted_text if corrected_text == decrypted_text else security.wrap(corrected_text)
+        if decision["action"] == "partial":
+            enhanced_text, sent_text = _enhance_segments(segments, decision["segments"], terms, lang)
+            enhancement_policy.record("partial", corrected_text, sent_text)
+        else:
+            enhanced_text = _request_enhancement(corrected_text, terms=terms)
+            enhancement_policy.record("full", corrected_text, corrected_text)
+
+        return security.wrap(enhanced_text)
+    except Exception as e:
+        logging.error(f"Medical term enhancement error: {str(e)}")
+        return encrypted_text if corrected_text == decrypted_text else security.wrap(corrected_text)
+
+def _parse_fused_response(content):
+    """Return (corrected, translation) from a fused JSON reply, or None if it is malformed"""
+    try:
+        data = json.loads(content)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(data, dict):
+        return None
+    corrected = data.get("corrected")
+    translation = data.get("translation")
+    if not isinstance(corrected, str) or not isinstance(translation, str):
+        return None
+    if not corrected.strip() or not translation.strip():
+        return None
+    return corrected.strip(), translation.strip()
+
+def _request_fused(text, target_lang, source_lang, terms=()):
+    """Correct and translate text in one chat completion; None if the reply is unusable"""
+    system_prompt = FUSED_SYSTEM_PROMPT.format(
+        source_name="language detected automatically" if source_lang == 'auto' else language_registry.name(source_lang),
+        target_name=language_registry.name(target_lang),
+        target_code=target_lang
+    ) + _terms_note(terms)
+    with tracer.stage("enhance_translate", bytes_in=len(text)) as span:
+        completion = _chat_completion(
+            system_prompt, text, max_tokens=2048, response_format={"type": "json_object"}
+        )
+        parsed = _parse_fused_response(completion.choices[0].message.content)
+        if parsed is None:
+            span["outcome"] = "unparsed"
+        else:
+            span["bytes_out"] = len(parsed[0]) + len(parsed[1])
+    return parsed
+
+def secure_enhance_and_translate(encrypted_text, target_lang, source_lang='auto', segments=None, mode=None):
+    """Enhance terminology and translate; returns (enhanced text, translation) as SecureText
+
+    In ``fused`` mode (``mode`` or PIPELINE_MODE) one JSON chat completion
+    does both. If that call fails or its reply cannot be parsed, or the
+    enhancement policy would skip the LLM anyway, the two-step path is used.
+    Targets Google Translate does not support are always sent to the LLM.
+    """
+    encrypted_text = security.open(encrypted_text)
+    translatable = language_registry.supports("google_translate", target_lang)
+    if (mode or PIPELINE_MODE) == "fused" or not translatable:
+        decrypted_text = encrypted_text.reveal() if encrypted_text else None
+        if not decrypted_text:
+            return None, None
+        glossary_result = _glossary_pass(decrypted_text, segments, source_lang)
+        corrected_text, _, decision, terms = glossary_result
+        if decision["action"] != "skip" or not translatable:
+            try:
+                parsed = _request_fused(corrected_text, target_lang, source_lang, terms)
+            except Exception as e:
+                logging.error(f"Fused enhance-and-translate error: {str(e)}")
+                parsed = None
+            if parsed is not None:
+                # Counted under the policy's decision; the fused call itself
+                # always carries the whole text, which is what was sent
+                enhancement_policy.record(decision["action"], corrected_text, corrected_text)
+                return security.wrap(parsed[0]), security.wrap(parsed[1])
+            logging.warning("Fused enhance-and-translate failed; falling back to two steps")
+        # Two steps from here, reusing the glossary pass
+        enhanced_text = _enhance_decided(encrypted_text, decrypted_text, *glossary_result, lang=source_lang)
+        return enhanced_text, secure_translate_text(enhanced_text, target_lang, source_lang)
+
+    enhanced_text = secure_enhance_medical_terms(encrypted_text, segments, source_lang)
+    return enhanced_text, secure_translate_text(enhanced_text, target_lang, source_lang)
+
+def _stream_enhancement(text, terms=()):
+    """Yield the terminology pass's text deltas as the LLM generates them"""
+    with tracer.stage("enhance_stream", bytes_in=len(text)) as span:
+        # A stream can only be read once, so it is never shared between callers
+        stream = _chat_completion(
+            ENHANCE_SYSTEM_PROMPT + _terms_note(terms), text, max_tokens=1024, coalesce=False, stream=True
+        )
+        produced = 0
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                produced += len(delta)
+                yield delta
+        span["bytes_out"] = produced
+
+def _enhanced_sentences(text, segments, lang=None):
+    """Yield corrected sentences as they form, and None after each streamed delta"""
+    text, segments, decision, terms = _glossary_pass(text, segments, lang)
+    if decision["action"] == "skip":
+        enhancement_policy.record("skip", text, calls=0)
+        yield from (sentence for sentence, _ in split_sentences(text))
+        return
+    if decision["action"] == "partial":
+        try:
+            enhanced_text, sent_text = _enhance_segments(segments, decision["segments"], terms, lang)
+            enhancement_policy.record("partial", text, sent_text)
+        except Exception as e:
+            logging.error(f"Medical term enhancement error: {str(e)}")
+            enhanced_text = text
+        yield from (sentence for sentence, _ in split_sentences(enhanced_text))
+        return
+
+    enhancement_policy.record("full", text, text)
+    buffer = SentenceBuffer()
+    emitted = 0
+    try:
+        for delta in _stream_enhancement(text, terms):
+            for sentence in buffer.feed(delta):
+                emitted += 1
+                yield sentence
+            yield None
+    except Exception as e:
+        logging.error(f"Medical term enhancement error: {str(e)}")
+        if not emitted:
+            # Nothing usable arrived: carry on with the transcript as is
+            yield from (sentence for sentence, _ in split_sentences(text))
+            return
+    yield from buffer.flush()
+
+def secure_stream_enhance_translate(encrypted_text, target_lang, source_lang='auto', segments=None):
+    """Enhance, translate and synthesize sentence by sentence while the LLM streams
+
+    Yields event dicts (texts as SecureText) as soon as each piece is ready, in
+    sentence order for each kind:
+
+    - ``{"event": "sentence", "index", "text"}``: a corrected source sentence
+    - ``{"event": "translation", "index", "text"}``: its translation
+    - ``{"event": "audio", "index", "audio"}``: MP3 bytes of the translation (None on failure)
+    - ``{"event": "done", "original", "translation", "missing"}``: the joined
+      texts; ``missing`` lists the sentences whose translation failed, which
+      stay in the source language in the joined translation
+
+    Every sentence is translated and handed to TTS on a worker pool as soon
+    as it is complete, so the first audio is ready after roughly one
+    sentence's worth of work instead of the whole utterance.
+    """
+    decrypted_text = security.open(encrypted_text).reveal() if encrypted_text else None
+    if not decrypted_text:
+        return
+
+    tts_lang = language_registry.provider_code(target_lang, "gtts")
+
+    def process(sentence):
+        translation = secure_translate_text(security.wrap(sentence), target_lang, source_lang)
+        translated_text = translation.reveal() if translation else None
+        audio = tts_engine.prerender(translated_text, tts_lang) if translated_text and tts_lang else None
+        return translation, translated_text, audio
+
+    jobs = []
+    originals = []
+    translations = []
+    audio_futures = []
+    clips = []
+
+    def drain(block):
+        while len(translations) < len(jobs) and (block or jobs[len(translations)].done()):
+            index = len(translations)
+            try:
+                translation, translated_text, audio = jobs[index].result()
+            except Exception as e:
+                logging.error(f"Sentence translation error: {str(e)}")
+                translation, translated_text, audio = None, None, None
+            translations.append(translated_text)
+            audio_futures.append(audio)
+            yield {"event": "translation", "index": index, "text": translation}
+        while len(clips) < len(audio_futures):
+            index = len(clips)
+            future = audio_futures[index]
+            if future is not None and not block and not future.done():
+                break
+            try:
+                audio = future.result() if future is not None else None
+            except Exception as e:
+                logging.error(f"Sentence text-to-speech error: {str(e)}")
+                audio = None
+            clips.append(audio)
+            yield {"event": "audio", "index": index, "audio": audio}
+
+    for sentence in _enhanced_sentences(decrypted_text, segments, source_lang):
+        if sentence is not None:
+            index = len(jobs)
+            originals.append(sentence)
+            jobs.append(_sentence_pool.submit(bind_context(process), sentence))
+            yield {"event": "sentence", "index": index, "text": security.wrap(sentence)}
+        yield from drain(block=False)
+    yield from drain(block=True)
+
+    original_text = join_sentences(originals, source_lang)
+    # A failed sentence keeps its source text, as TranslationMemory.translate
+    # does, rather than vanishing from a translation reported as complete
+    missing = [index for index, translation in enumerate(translations) if translation is None]
+    translated_text = join_sentences(
+        [translation if translation is not None else original for original, translation in zip(originals, translations)],
+        target_lang
+    )
+    if clips and all(clips):
+        # MP3 frames concatenate cleanly, so the full clip needs no new render
+        tts_engine.put(translated_text, tts_lang, b"".join(clips))
+    yield {
+        "event": "done",
+        "original": security.wrap(original_text),
+        "translation": security.wrap(translated_text) if translated_text and len(missing) < len(originals) else None,
+        "missing": missing
+    }
+
+def secure_fan_out(encrypted_text, target_langs, source_lang='auto', segments=None, enhance=True):
+    """Enhance once, then translate and synthesize into every target concurrently
+
+    Yields event dicts (texts as SecureText):
+
+    - ``{"event": "original", "text"}``: the enhanced source text, first
+    - ``{"event": "translation", "target", "text", "audio"}``: one target's
+      translation and MP3 bytes (None if unavailable), as each target finishes
+    - ``{"event": "done", "original", "translations"}``: translations by target
+
+    Each target costs one Google Translate request for all of its sentences
+    (see ``_remote_translate``); targets run side by side on the fan-out pool.
+    ``enhance=False`` translates the text as it is.
+    """
+    if enhance:
+        enhanced_text = secure_enhance_medical_terms(encrypted_text, segments, source_lang)
+    else:
+        enhanced_text = security.open(encrypted_text)
+    yield {"event": "original", "text": enhanced_text}
+    if enhanced_text is None:
+        return
+
+    def process(target_lang):
+        translation = secure_translate_text(enhanced_text, target_lang, source_lang)
+        translated_text = translation.reveal() if translation else None
+        tts_lang = language_registry.provider_code(target_lang, "gtts")
+        audio = None
+        if translated_text and tts_lang:
+            try:
+                audio = tts_engine.synthesize(translated_text, tts_lang)
+            except Exception as e:
+                logging.error(f"Text-to-speech error: {str(e)}")
+        return translation, audio
+
+    futures = {
+        _fan_out_pool.submit(bind_context(process), target_lang): target_lang
+        for target_lang in dict.fromkeys(target_langs)
+    }
+    translations = {}
+    for future in as_completed(futures):
+        target_lang = futures[future]
+        try:
+            translation, audio = future.result()
+        except Exception as e:
+            logging.error(f"Translation error for {target_lang}: {str(e)}")
+            translation, audio = None, None
+        translations[target_lang] = translation
+        yield {"event": "translation", "target": target_lang, "text": translation, "audio": audio}
+    yield {"event": "done", "original": enhanced_text, "translations": translations}
+
+def secure_text_to_speech(encrypted_text, lang_code):
+    """Convert text to speech and return the MP3 bytes"""
+    try:
+        # gTTS has no voice for many languages; skip them without a request
+        tts_lang = language_registry.provider_code(lang_code, "gtts")
+        if tts_lang is None:
+            return None
+
+        # Decrypt for TTS
+        decrypted_text = security.decrypt_text(encrypted_text)
+        if not decrypted_text:
+            return None
+
+        return tts_engine.synthesize(decrypted_text, tts_lang)
+    except Exception as e:
+        logging.error(f"Text-to-speech error: {str(e)}")
+        return None
+
+def secure_prerender_speech(encrypted_text, lang_code):
+    """Start synthesizing speech in the background so playback is instant"""
+    tts_lang = language_registry.provider_code(lang_code, "gtts")
+    if tts_lang is None:
+        return
+    decrypted_text = security.decrypt_text(encrypted_text)
+    if decrypted_text:
+        tts_engine.prerender(decrypted_text, tts_lang)
+
+# Global language dictionary (display name -> code)
+languages = language_registry.languages
@@ -0,0 +1,227 @@
+import hashlib
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+from telemetry import tracer
+
+
+def request_key(*parts):
+    """Stable hash of a request's payload, used to coalesce identical calls"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, bytes):
+            part = repr(part).encode()
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def parse_limits(spec):
+    """Parse "model=rpm/tpm,..." into {model: (rpm, tpm)}; 0 or a missing tpm means unlimited"""
+    limits = {}
+    for item in (spec or "").split(","):
+        if "=" not in item:
+            continue
+        model, values = item.split("=", 1)
+        rpm, _, tpm = values.partition("/")
+        limits[model.strip()] = (int(rpm or 0), int(tpm or 0))
+    return limits
+
+
+def is_rate_limited(error):
+    """True if an exception from any provider client signals HTTP 429"""
+    if getattr(error, "status_code", None) == 429:
+        return True
+    for name in ("response", "rsp"):
+        response = getattr(error, name, None)
+        if getattr(response, "status_code", None) == 429:
+            return True
+    return type(error).__name__ in ("RateLimitError", "TooManyRequests")
+
+
+def _retry_after(error):
+    # A requests.Response for a 429 is falsy (bool() is .ok), so test for None
+    response = getattr(error, "response", None)
+    if response is None:
+        response = getattr(error, "rsp", None)
+    headers = getattr(response, "headers", None)
+    if headers is None:
+        return None
+    try:
+        return max(0.0, float(headers.get("retry-after")))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Token bucket refilled at ``per_minute`` tokens per minute.
+
+    ``acquire`` reserves tokens up front and sleeps off any deficit, so
+    callers are served in arrival order without polling.
+    """
+
+    def __init__(self, per_minute, capacity=None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount=1):
+        """Take amount tokens, blocking until they are available; returns seconds waited"""
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            deficit = -self._tokens
+        if deficit <= 0:
+            return 0.0
+        delay = deficit / self.rate
+        time.sleep(delay)
+        return delay
+
+
+class Dispatcher:
+    """Process-wide gate in front of every provider call.
+
+    Identical requests in flight at the same time share one call (single
+    flight). Calls to a model with configured limits first take one request
+    and their estimated tokens from that model's per-minute buckets. Calls
+    that fail with HTTP 429 are retried with full-jitter exponential backoff,
+    honouring Retry-After. For each service the time spent waiting (buckets
+    and backoff) is recorded as stage ``<service>_wait`` and the time spent in
+    the provider as ``<service>_service``.
+    """
+
+    def __init__(self, limits=None, max_retries=4, base_delay=0.5, max_delay=8.0, seed=None):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._random = random.Random(seed)
+        self._buckets = {}
+        self._in_flight = {}
+        self._counters = {}
+        self._lock = threading.RLock()
+        self.configure(limits or {})
+
+    def configure(self, limits):
+        """Replace the per-model limits: {model: (requests per minute, tokens per minute)}"""
+        buckets = {}
+        for model, (rpm, tpm) in limits.items():
+            buckets[model] = (TokenBucket(rpm) if rpm else None, TokenBucket(tpm) if tpm else None)
+        with self._lock:
+            self._buckets = buckets
+
+    def call(self, service, fn, key=None, model=None, tokens=0):
+        """Run fn() for service and return its result
+
+        With a ``key``, concurrent callers with the same key wait for the
+        first caller's result (or exception) instead of calling again.
+        """
+        future = None
+        if key is not None:
+            with self._lock:
+                future = self._in_flight.get((service, key))
+                if future is not None:
+                    self._count(service, "coalesced")
+                    shared = future
+                else:
+                    future = self._in_flight[(service, key)] = Future()
+                    shared = None
+            if shared is not None:
+                return shared.result()
+
+        try:
+            result = self._execute(service, fn, model, tokens)
+        except BaseException as e:
+            if future is not None:
+                with self._lock:
+                    self._in_flight.pop((service, key), None)
+                future.set_exception(e)
+            raise
+        if future is not None:
+            with self._lock:
+                self._in_flight.pop((service, key), None)
+            future.set_result(result)
+        return result
+
+    def stats(self):
+        """Per-service call, coalescing and retry counters"""
+        with self._lock:
+            return {service: dict(counters) for service, counters in sorted(self._counters.items())}
+
+    def reset(self):
+        """Zero every counter"""
+        with self._lock:
+            self._counters.clear()
+
+    def _execute(self, service, fn, model, tokens):
+        self._count(service, "calls")
+        waited = 0.0
+        busy = 0.0
+        outcome = "ok"
+        try:
+            for attempt in range(self.max_retries + 1):
+                waited += self._throttle(model, tokens)
+                started = time.perf_counter()
+                try:
+                    return fn()
+                except Exception as e:
+                    if not is_rate_limited(e):
+                        outcome = "error"
+                        raise
+                    self._count(service, "rate_limited")
+                    if attempt == self.max_retries:
+                        outcome = "rate_limited"
+                        raise
+                    delay = _retry_after(e)
+                    if delay is None:
+                        delay = self._random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                    # A large Retry-After must not stall a job worker
+                    delay = min(delay, self.max_delay)
+                    self._count(service, "retries")
+                    logging.warning(f"{service} rate limited, retrying in {delay:.2f}s (attempt {attempt + 1})")
+                finally:
+                    busy += time.perf_counter() - started
+                time.sleep(delay)
+                waited += delay
+        finally:
+            if outcome != "ok":
+                self._count(service, "failures")
+            tracer.record(f"{service}_wait", waited)
+            tracer.record(f"{service}_service", busy, outcome=outcome)
+
+    def _throttle(self, model, tokens):
+        requests_bucket, tokens_bucket = self._buckets.get(model, (None, None))
+        waited = 0.0
+        if requests_bucket is not None:
+            waited += requests_bucket.acquire(1)
+        if tokens_bucket is not None and tokens:
+            waited += tokens_bucket.acquire(tokens)
+        return waited
+
+    def _count(self, service, name):
+        with self._lock:
+            counters = self._counters.setdefault(
+                service, {"calls": 0, "coalesced": 0, "retries": 0, "rate_limited": 0, "failures": 0}
+            )
+            counters[name] += 1
+
+
+# Requests and tokens per minute per model, e.g. "whisper-large-v3=20,llama3-groq-70b-8192-tool-use-preview=30/6000"
+RATE_LIMITS = os.getenv(
+    "RATE_LIMITS",
+    "whisper-large-v3=20,llama3-groq-70b-8192-tool-use-preview=30/6000"
+)
+
+# Process-wide dispatcher used by every provider call
+dispatcher = Dispatcher(
+    limits=parse_limits(RATE_LIMITS),
+    max_retries=int(os.getenv("RATE_LIMIT_RETRIES", "4"))
+)
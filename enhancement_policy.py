@@ -0,0 +1,124 @@
+import threading
+
+# Rough size of the enhancement system prompt and chat framing, in tokens
+PROMPT_OVERHEAD_TOKENS = 40
+
+
+def estimate_tokens(text):
+    """Cheap token estimate (about four characters per token)"""
+    return max(1, len(text or "") // 4)
+
+
+def _value(segment, name):
+    if isinstance(segment, dict):
+        return segment.get(name)
+    return getattr(segment, name, None)
+
+
+class EnhancementPolicy:
+    """Decides whether a transcript needs the LLM terminology pass.
+
+    Whisper's verbose_json segments carry ``avg_logprob``, ``no_speech_prob``
+    and ``compression_ratio``. A segment is low-confidence when its log
+    probability is below ``min_avg_logprob``, or when its no-speech
+    probability or compression ratio (a repetition/hallucination signal) is
+    above the matching maximum. ``decide`` returns one of:
+
+    - ``skip``: every segment is confident, the transcript is used as is
+    - ``partial``: only the low-confidence segments are sent to the LLM
+    - ``full``: the whole transcript is sent, as before
+
+    Short transcripts and transcripts that are mostly low-confidence are sent
+    in full, where the context helps and a partial request saves little.
+    Counters track how many LLM calls and prompt tokens were avoided.
+    """
+
+    def __init__(self, enabled=True, min_avg_logprob=-0.5, max_no_speech_prob=0.6,
+                 max_compression_ratio=2.4, short_words=6, partial_max_share=0.5):
+        self.enabled = enabled
+        self.min_avg_logprob = min_avg_logprob
+        self.max_no_speech_prob = max_no_speech_prob
+        self.max_compression_ratio = max_compression_ratio
+        self.short_words = short_words
+        self.partial_max_share = partial_max_share
+        self._lock = threading.Lock()
+        self.transcripts = 0
+        self.decisions = {"skip": 0, "partial": 0, "full": 0}
+        self.llm_calls = 0
+        self.tokens_sent = 0
+        self.tokens_avoided = 0
+
+    def is_low_confidence(self, segment):
+        """True if any Whisper signal of the segment is missing or out of bounds"""
+        avg_logprob = _value(segment, "avg_logprob")
+        no_speech_prob = _value(segment, "no_speech_prob")
+        compression_ratio = _value(segment, "compression_ratio")
+        if avg_logprob is None:
+            return True
+        return (
+            avg_logprob < self.min_avg_logprob
+            or (no_speech_prob or 0.0) > self.max_no_speech_prob
+            or (compression_ratio or 0.0) > self.max_compression_ratio
+        )
+
+    def decide(self, text, segments, resolved=()):
+        """Return {"action", "reason", "segments"} for a transcript and its segments
+
+        ``segments`` in the result lists the indices of the segments to send
+        when the action is ``partial``. Segments whose indices are in
+        ``resolved`` (fixed by the glossary) count as confident.
+        """
+        if not self.enabled:
+            return {"action": "full", "reason": "policy_disabled", "segments": []}
+        if not segments:
+            return {"action": "full", "reason": "no_signals", "segments": []}
+
+        low = [i for i, segment in enumerate(segments) if i not in resolved and self.is_low_confidence(segment)]
+        if not low:
+            return {"action": "skip", "reason": "confident", "segments": []}
+
+        total_words = len(text.split())
+        if total_words <= self.short_words:
+            return {"action": "full", "reason": "short", "segments": []}
+        low_words = sum(len((_value(segments[i], "text") or "").split()) for i in low)
+        if low_words / max(total_words, 1) > self.partial_max_share:
+            return {"action": "full", "reason": "mostly_low_confidence", "segments": []}
+        return {"action": "partial", "reason": "low_confidence_segments", "segments": low}
+
+    def record(self, action, full_text, sent_text=None, calls=1):
+        """Count one decision; sent_text is what actually went to the LLM"""
+        full_tokens = estimate_tokens(full_text) + PROMPT_OVERHEAD_TOKENS
+        sent_tokens = estimate_tokens(sent_text) + PROMPT_OVERHEAD_TOKENS if sent_text else 0
+        with self._lock:
+            self.transcripts += 1
+            self.decisions[action] += 1
+            self.llm_calls += calls
+            self.tokens_sent += sent_tokens
+            self.tokens_avoided += max(0, full_tokens - sent_tokens)
+
+    def stats(self):
+        """Return decision counters and the share of calls and tokens avoided"""
+        with self._lock:
+            calls_avoided = max(0, self.transcripts - self.llm_calls)
+            baseline_tokens = self.tokens_sent + self.tokens_avoided
+            return {
+                "transcripts": self.transcripts,
+                "skipped": self.decisions["skip"],
+                "partial": self.decisions["partial"],
+                "full": self.decisions["full"],
+                "llm_calls": self.llm_calls,
+                "calls_avoided": calls_avoided,
+                "calls_avoided_share": calls_avoided / self.transcripts if self.transcripts else 0.0,
+                "tokens_sent": self.tokens_sent,
+                "tokens_avoided": self.tokens_avoided,
+                "tokens_avoided_share": self.tokens_avoided / baseline_tokens if baseline_tokens else 0.0,
+            }
+
+    def reset(self):
+        """Zero every counter"""
+        with self._lock:
+            self.transcripts = 0
+            self.decisions = {"skip": 0, "partial": 0, "full": 0}
+            self.llm_calls = 0
+            self.tokens_sent = 0
+            self.tokens_avoided = 0
@@ -0,0 +1,302 @@
+import json
+import logging
+import re
+import threading
+
+from enhancement_policy import estimate_tokens
+from translation_memory import _UNSPACED_LANGS
+
+# Known mis-hearings and terms that must survive enhancement and translation.
+# "*" applies to every source language. A deployment replaces this with the
+# JSON file named by GLOSSARY_PATH, in the same shape.
+DEFAULT_GLOSSARY = {
+    "en": {
+        "corrections": {
+            "high per tension": "hypertension",
+            "hyper tension": "hypertension",
+            # "a fib" alone is everyday speech ("tell a fib"), so only in a medical phrase
+            "diagnosed with a fib": "diagnosed with AFib",
+            "history of a fib": "history of AFib",
+            "a-fib": "AFib",
+            "met foreman": "metformin",
+            "met forming": "metformin",
+            "lisa no pril": "lisinopril",
+            "ibu profen": "ibuprofen",
+            "acid a minophen": "acetaminophen",
+            "die a beaties": "diabetes",
+            "new monia": "pneumonia",
+            "c o p d": "COPD",
+            "e k g": "EKG",
+            "m r i": "MRI",
+            "cat scan": "CT scan",
+        },
+        "protected": [
+            "hypertension", "AFib", "metformin", "lisinopril", "ibuprofen", "acetaminophen",
+            "COPD", "EKG", "MRI", "CT scan", "insulin", "warfarin", "atorvastatin",
+        ],
+    },
+    "*": {
+        "protected": ["mg", "ml", "mmHg"],
+    },
+}
+
+# Placeholder a protected term is swapped for while the text is translated
+_PLACEHOLDER = "[T{}]"
+_PLACEHOLDER_RE = re.compile(r"\[\s*[Tt]\s*(\d+)\s*\]")
+
+
+def _fold(text):
+    """Lowercase without changing the length, so match offsets stay valid"""
+    return "".join(char if len(char.lower()) != 1 else char.lower() for char in text)
+
+
+class Automaton:
+    """Aho-Corasick automaton over a fixed set of patterns.
+
+    ``find`` scans a text once, whatever the number of patterns, and
+    returns leftmost-longest, non-overlapping matches. With
+    ``word_boundaries`` a match must not start or end inside a word.
+    """
+
+    def __init__(self, patterns, word_boundaries=True):
+        self.patterns = list(patterns)
+        self.word_boundaries = word_boundaries
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for char in _fold(pattern):
+                following = self._goto[state].get(char)
+                if following is None:
+                    following = len(self._goto)
+                    self._goto[state][char] = following
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = following
+            self._out[state].append(index)
+
+        # Breadth-first, so every failure link points to a finished state
+        queue = list(self._goto[0].values())
+        while queue:
+            state = queue.pop(0)
+            for char, following in self._goto[state].items():
+                queue.append(following)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                link = self._goto[fallback].get(char, 0)
+                self._fail[following] = link if link != following else 0
+                self._out[following] = self._out[following] + self._out[self._fail[following]]
+
+    def find(self, text):
+        """Return (start, end, pattern index) for each match, in text order"""
+        folded = _fold(text)
+        matches = []
+        state = 0
+        for position, char in enumerate(folded):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for index in self._out[state]:
+                start = position + 1 - len(self.patterns[index])
+                if self._bounded(text, start, position + 1):
+                    matches.append((start, position + 1, index))
+
+        matches.sort(key=lambda match: (match[0], match[0] - match[1]))
+        chosen = []
+        covered = 0
+        for match in matches:
+            if match[0] >= covered:
+                chosen.append(match)
+                covered = match[1]
+        return chosen
+
+    def _bounded(self, text, start, end):
+        if not self.word_boundaries:
+            return True
+        before = text[start - 1] if start > 0 else " "
+        after = text[end] if end < len(text) else " "
+        return not (before.isalnum() and text[start].isalnum()) and not (after.isalnum() and text[end - 1].isalnum())
+
+
+class Glossary:
+    """Per-language terminology applied before and around the LLM and translator.
+
+    Each language has ``corrections`` (known mis-hearing -> correct term) and
+    ``protected`` terms; every correction target is protected too. Terms
+    under "*" apply to every language. ``protected`` may also be a mapping
+    of term -> {target code: rendering} for terms with a fixed translation.
+    The term lists are compiled into one Aho-Corasick automaton per source
+    language on first use, so ``correct`` and ``protect`` run in time linear
+    in the text. Counters record the corrections applied and the LLM calls
+    and tokens the pre-pass saved.
+    """
+
+    def __init__(self, entries=None, protect_translations=True):
+        self.entries = DEFAULT_GLOSSARY if entries is None else entries
+        self.protect_translations = protect_translations
+        self._compiled = {}
+        self._lock = threading.Lock()
+        self.reset()
+
+    @classmethod
+    def load(cls, path=None, protect_translations=True):
+        """Glossary from a JSON file, or the built-in one if path is empty or unreadable"""
+        if path:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    return cls(json.load(f), protect_translations)
+            except (OSError, ValueError) as e:
+                logging.error(f"Glossary load error: {str(e)}")
+        return cls(protect_translations=protect_translations)
+
+    def _language(self, lang):
+        lang = lang if lang and lang != "auto" else "*"
+        compiled = self._compiled.get(lang)
+        if compiled is not None:
+            return compiled
+        with self._lock:
+            compiled = self._compiled.get(lang)
+            if compiled is None:
+                compiled = self._compile(lang)
+                self._compiled[lang] = compiled
+            return compiled
+
+    def _compile(self, lang):
+        sections = [self.entries.get("*", {})]
+        if lang != "*":
+            sections.append(self.entries.get(lang, {}))
+        corrections = {}
+        renderings = {}
+        for section in sections:
+            corrections.update(section.get("corrections", {}))
+            protected = section.get("protected", [])
+            if isinstance(protected, dict):
+                renderings.update(protected)
+            else:
+                renderings.update({term: {} for term in protected})
+        for target in corrections.values():
+            renderings.setdefault(target, {})
+
+        # Words of unspaced languages have no boundaries to respect
+        word_boundaries = lang not in _UNSPACED_LANGS
+        correction_patterns = list(corrections)
+        protected_patterns = list(renderings)
+        return {
+            "corrections": Automaton(correction_patterns, word_boundaries) if correction_patterns else None,
+            "replacements": [corrections[pattern] for pattern in correction_patterns],
+            "protected": Automaton(protected_patterns, word_boundaries) if protected_patterns else None,
+            "renderings": [renderings[pattern] for pattern in protected_patterns],
+        }
+
+    def correct(self, text, lang, record=True):
+        """Apply the known corrections for the source language; returns (text, corrections made)"""
+        compiled = self._language(lang)
+        if not text or compiled["corrections"] is None:
+            return text, 0
+        matches = compiled["corrections"].find(text)
+        if not matches:
+            return text, 0
+        pieces = []
+        last = 0
+        for start, end, index in matches:
+            replacement = compiled["replacements"][index]
+            if text[start].isupper() and replacement[:1].islower():
+                # Keep a capital at the start of a sentence
+                replacement = replacement[0].upper() + replacement[1:]
+            pieces.append(text[last:start])
+            pieces.append(replacement)
+            last = end
+        pieces.append(text[last:])
+        if record:
+            with self._lock:
+                self.corrections += len(matches)
+        return "".join(pieces), len(matches)
+
+    def terms_in(self, text, lang):
+        """Protected terms that occur in text, in order of first appearance"""
+        compiled = self._language(lang)
+        if not text or compiled["protected"] is None:
+            return []
+        return list(dict.fromkeys(text[start:end] for start, end, _ in compiled["protected"].find(text)))
+
+    def protect(self, text, source_lang, target_lang):
+        """Swap protected terms for placeholders; returns (masked text, placeholder -> rendering)
+
+        Renderings are the glossary's fixed translation for target_lang, or
+        the term as written.
+        """
+        compiled = self._language(source_lang)
+        if not self.protect_translations or not text or compiled["protected"] is None:
+            return text, {}
+        matches = compiled["protected"].find(text)
+        if not matches:
+            return text, {}
+        numbers = {}
+        restore = {}
+        pieces = []
+        last = 0
+        for start, end, index in matches:
+            term = text[start:end]
+            if term not in numbers:
+                numbers[term] = len(numbers)
+                restore[str(numbers[term])] = compiled["renderings"][index].get(target_lang, term)
+            pieces.append(text[last:start])
+            pieces.append(_PLACEHOLDER.format(numbers[term]))
+            last = end
+        pieces.append(text[last:])
+        with self._lock:
+            self.protected_terms += len(matches)
+        return "".join(pieces), restore
+
+    def restore(self, translation, restore):
+        """Put protected terms back; None if the translation lost or invented a placeholder"""
+        if not restore:
+            return translation
+        if translation is None or set(_PLACEHOLDER_RE.findall(translation)) != set(restore):
+            with self._lock:
+                self.protection_fallbacks += 1
+            return None
+        return _PLACEHOLDER_RE.sub(lambda match: restore[match.group(1)], translation)
+
+    def record_savings(self, baseline_text, sent_text, resolved=0):
+        """Count what resolving spans with the glossary kept from the LLM
+
+        ``baseline_text`` is what the enhancement policy would have sent
+        without the glossary and ``sent_text`` what it sends with it (None
+        when the LLM call is skipped); ``resolved`` is the number of
+        low-confidence segments the glossary settled.
+        """
+        with self._lock:
+            self.transcripts += 1
+            self.segments_resolved += resolved
+            if baseline_text and not sent_text:
+                self.calls_saved += 1
+            if baseline_text:
+                self.tokens_saved += max(0, estimate_tokens(baseline_text) - (estimate_tokens(sent_text) if sent_text else 0))
+
+    def stats(self):
+        """Return correction, protection and savings counters"""
+        with self._lock:
+            return {
+                "transcripts": self.transcripts,
+                "corrections": self.corrections,
+                "segments_resolved": self.segments_resolved,
+                "calls_saved": self.calls_saved,
+                "tokens_saved": self.tokens_saved,
+                "protected_terms": self.protected_terms,
+                "protection_fallbacks": self.protection_fallbacks,
+            }
+
+    def reset(self):
+        """Zero every counter"""
+        with self._lock:
+            self.transcripts = 0
+            self.corrections = 0
+            self.segments_resolved = 0
+            self.calls_saved = 0
+            self.tokens_saved = 0
+            self.protected_terms = 0
+            self.protection_fallbacks = 0
@@ -0,0 +1,182 @@
+import csv
+import io
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+HISTORY_COLUMNS = ("timestamp", "source_language", "target_language", "original_text", "translated_text")
+CSV_HEADER = ["Timestamp", "Source Language", "Target Language", "Original Text", "Translated Text"]
+
+
+def _format_timestamp(created):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(created))
+
+
+class HistoryStore:
+    """Append-only conversation history in SQLite, encrypted with ``cipher``.
+
+    Each row holds one translation of one session. The original and
+    translated texts are stored encrypted; the session, the language pair and
+    the creation time stay in the clear so they can be indexed. Pages and
+    exports read rows in batches and decrypt only what they return, so the
+    cost of rendering or exporting does not depend on how long the history
+    has grown. ``path`` defaults to an in-memory database.
+    """
+
+    def __init__(self, path=None, cipher=None, batch_size=200):
+        self.path = path or ":memory:"
+        self.cipher = cipher
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS history ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, created REAL NOT NULL, "
+            "source_lang TEXT, target_lang TEXT, original_text TEXT, translated_text TEXT)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS history_session ON history (session_id, created)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS history_pair ON history (session_id, source_lang, target_lang, created)"
+        )
+        self._db.commit()
+
+    def append(self, session_id, source_lang, target_lang, original_text, translated_text):
+        """Add one translation to the session's history and return its row ID"""
+        row = (
+            session_id, time.time(), source_lang, target_lang,
+            self._encrypt(original_text), self._encrypt(translated_text)
+        )
+        with self._lock:
+            try:
+                cursor = self._db.execute(
+                    "INSERT INTO history (session_id, created, source_lang, target_lang, "
+                    "original_text, translated_text) VALUES (?, ?, ?, ?, ?, ?)", row
+                )
+                self._db.commit()
+                return cursor.lastrowid
+            except sqlite3.Error as e:
+                logging.error(f"History write error: {str(e)}")
+                return None
+
+    def count(self, session_id, pair=None):
+        """Number of entries of the session, optionally for one (source, target) pair"""
+        where, params = self._where(session_id, pair)
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*) FROM history WHERE {where}", params).fetchone()[0]
+
+    def language_pairs(self, session_id):
+        """(source, target) pairs that occur in the session's history"""
+        with self._lock:
+            return [tuple(row) for row in self._db.execute(
+                "SELECT DISTINCT source_lang, target_lang FROM history WHERE session_id = ? "
+                "ORDER BY source_lang, target_lang", (session_id,)
+            )]
+
+    def page(self, session_id, page=0, page_size=10, pair=None):
+        """Return one page of entries, newest first, as dicts with a 1-based ``number``"""
+        where, params = self._where(session_id, pair)
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT id, created, source_lang, target_lang, original_text, translated_text "
+                f"FROM history WHERE {where} ORDER BY created DESC, id DESC LIMIT ? OFFSET ?",
+                params + (page_size, page * page_size)
+            ).fetchall()
+            total = self._db.execute(f"SELECT COUNT(*) FROM history WHERE {where}", params).fetchone()[0]
+        entries = []
+        for offset, row in enumerate(rows):
+            entry = self._entry(row)
+            entry["number"] = total - page * page_size - offset
+            entries.append(entry)
+        return entries
+
+    def iter_entries(self, session_id, pair=None):
+        """Yield every entry of the session, oldest first, reading in batches"""
+        where, params = self._where(session_id, pair)
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    f"SELECT id, created, source_lang, target_lang, original_text, translated_text "
+                    f"FROM history WHERE {where} AND id > ? ORDER BY id LIMIT ?",
+                    params + (last_id, self.batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield self._entry(row)
+            last_id = rows[-1][0]
+
+    def iter_csv(self, session_id, pair=None):
+        """Yield the session's history as CSV text, one chunk per row"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_HEADER)
+        for entry in self.iter_entries(session_id, pair):
+            writer.writerow([entry[column] for column in HISTORY_COLUMNS])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    def iter_jsonl(self, session_id, pair=None):
+        """Yield the session's history as JSON Lines, one line per entry"""
+        for entry in self.iter_entries(session_id, pair):
+            yield json.dumps({column: entry[column] for column in HISTORY_COLUMNS}, ensure_ascii=False) + "\n"
+
+    def export(self, session_id, fmt="csv", pair=None):
+        """Write an export into a rewound in-memory binary buffer and return it
+
+        The rows are read in batches; the export is never written to disk.
+        """
+        chunks = self.iter_jsonl(session_id, pair) if fmt == "jsonl" else self.iter_csv(session_id, pair)
+        output = io.BytesIO()
+        for chunk in chunks:
+            output.write(chunk.encode("utf-8"))
+        output.seek(0)
+        return output
+
+    def rekey(self, session_id, new_session_id):
+        """Move every entry of the session to a new session ID, so the old one stops working"""
+        with self._lock:
+            try:
+                self._db.execute("UPDATE history SET session_id = ? WHERE session_id = ?", (new_session_id, session_id))
+                self._db.commit()
+            except sqlite3.Error as e:
+                logging.error(f"History rekey error: {str(e)}")
+
+    def clear(self, session_id):
+        """Delete every entry of the session"""
+        with self._lock:
+            try:
+                self._db.execute("DELETE FROM history WHERE session_id = ?", (session_id,))
+                self._db.commit()
+            except sqlite3.Error as e:
+                logging.error(f"History clear error: {str(e)}")
+
+    def _encrypt(self, text):
+        return self.cipher.encrypt_text(text) if self.cipher is not None else text
+
+    def _decrypt(self, text):
+        return self.cipher.decrypt_text(text) if self.cipher is not None else text
+
+    @staticmethod
+    def _where(session_id, pair):
+        if pair:
+            return "session_id = ? AND source_lang = ? AND target_lang = ?", (session_id,) + tuple(pair)
+        return "session_id = ?", (session_id,)
+
+    def _entry(self, row):
+        _, created, source_lang, target_lang, original_text, translated_text = row
+        return {
+            "timestamp": _format_timestamp(created),
+            "source_language": source_lang,
+            "target_language": target_lang,
+            # None if written under a different ENCRYPTION_KEY
+            "original_text": self._decrypt(original_text),
+            "translated_text": self._decrypt(translated_text),
+        }
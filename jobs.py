@@ -0,0 +1,190 @@
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from telemetry import bind_context, request_scope
+
+
+class Job:
+    """One unit of background work and everything the UI needs to follow it.
+
+    ``state`` moves from queued to running to done, failed or cancelled.
+    The job function can push progress through ``publish``; readers fetch
+    everything published after a given position with ``events_since``.
+    """
+
+    def __init__(self, job_id, key=None, owner=None):
+        self.id = job_id
+        self.key = key
+        self.owner = owner
+        self.state = "queued"
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+        self._events = []
+        self._lock = threading.Lock()
+
+    @property
+    def active(self):
+        return self.state in ("queued", "running")
+
+    @property
+    def cancelled(self):
+        return self.state == "cancelled"
+
+    def publish(self, event):
+        """Record a progress event for pollers"""
+        with self._lock:
+            self._events.append(event)
+
+    def events_since(self, position=0):
+        """Return the events published from position onwards"""
+        with self._lock:
+            return list(self._events[position:])
+
+
+class JobQueue:
+    """Bounded background worker pool shared by every Streamlit session.
+
+    At most ``max_workers`` jobs run at once and at most ``max_queue`` wait;
+    beyond that ``submit`` refuses new work so callers can show that the
+    service is busy. A submission whose ``key`` matches an active job joins
+    that job instead of running twice, and a new submission from the same
+    ``owner`` cancels that owner's older jobs that have not finished.
+    """
+
+    def __init__(self, max_workers=4, max_queue=16, retention_seconds=600):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retention_seconds = retention_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.rejected = 0
+        self.deduplicated = 0
+
+    def submit(self, fn, *args, key=None, owner=None):
+        """Queue fn(job, *args) and return its job, or None if the queue is full"""
+        with self._lock:
+            self._prune()
+            if key is not None:
+                for job in self._jobs.values():
+                    if job.key == key and job.active:
+                        self.deduplicated += 1
+                        return job
+
+            # Check capacity before cancelling anything, so a rejected
+            # submission leaves the owner's earlier job in place; the
+            # owner's own queued jobs are about to make room
+            superseded = [
+                job for job in self._jobs.values() if owner is not None and job.owner == owner and job.active
+            ]
+            if self._queued() - sum(1 for job in superseded if job.state == "queued") >= self.max_queue:
+                self.rejected += 1
+                logging.warning(f"Job queue full: {self._queued()} waiting, {self._running()} running")
+                return None
+
+            for job in superseded:
+                self._cancel(job)
+
+            job = Job(uuid.uuid4().hex[:12], key=key, owner=owner)
+            self._jobs[job.id] = job
+            job.future = self._executor.submit(bind_context(self._run), job, fn, args)
+            return job
+
+    def get(self, job_id):
+        """Return the job with this ID, or None once it has been pruned"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Cancel a job; a running job finishes (and counts as running) but its result is discarded"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.active:
+                self._cancel(job)
+
+    def position(self, job_id):
+        """1-based place of a queued job in line, or 0 if it is not waiting"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.state != "queued":
+                return 0
+            return 1 + sum(
+                1 for other in self._jobs.values()
+                if other.state == "queued" and other.submitted_at < job.submitted_at
+            )
+
+    def stats(self):
+        """Return queue depth, capacity and lifetime counters"""
+        with self._lock:
+            return {
+                "queued": self._queued(),
+                "running": self._running(),
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "completed": self.completed,
+                "failed": self.failed,
+                "cancelled": self.cancelled,
+                "rejected": self.rejected,
+                "deduplicated": self.deduplicated,
+            }
+
+    def _run(self, job, fn, args):
+        with self._lock:
+            if job.state != "queued":
+                return
+            job.state = "running"
+            job.started_at = time.time()
+        try:
+            with request_scope(job.id):
+                result = fn(job, *args)
+        except Exception as e:
+            logging.error(f"Job {job.id} error: {str(e)}")
+            with self._lock:
+                job.finished_at = time.time()
+                if job.state == "running":
+                    job.state = "failed"
+                    job.error = str(e)
+                    self.failed += 1
+            return
+        with self._lock:
+            job.finished_at = time.time()
+            if job.state == "running":
+                job.state = "done"
+                job.result = result
+                self.completed += 1
+
+    def _cancel(self, job):
+        # Called with the lock held. A running job keeps its worker until fn
+        # returns, so _run sets its finished_at then
+        if job.future is not None:
+            job.future.cancel()
+        if job.state == "queued":
+            job.finished_at = time.time()
+        job.state = "cancelled"
+        self.cancelled += 1
+
+    def _queued(self):
+        return sum(1 for job in self._jobs.values() if job.state == "queued")
+
+    def _running(self):
+        # Cancelled jobs still hold a worker thread until their function returns
+        return sum(
+            1 for job in self._jobs.values()
+            if job.state == "running" or (job.cancelled and job.started_at is not None and job.finished_at is None)
+        )
+
+    def _prune(self):
+        cutoff = time.time() - self.retention_seconds
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if not job.active and job.finished_at and job.finished_at < cutoff]:
+            del self._jobs[job_id]
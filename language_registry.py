@@ -0,0 +1,187 @@
+# Display name -> language code used throughout the app (Google Translate style)
+LANGUAGES = {
+    'English': 'en', 'Spanish': 'es', 'French': 'fr',
+    'German': 'de', 'Italian': 'it', 'Portuguese': 'pt',
+    'Chinese (Simplified)': 'zh-CN', 'Chinese (Traditional)': 'zh-TW',
+    'Japanese': 'ja', 'Korean': 'ko', 'Hindi': 'hi',
+    'Arabic': 'ar', 'Russian': 'ru', 'Bengali': 'bn',
+    'Indonesian': 'id', 'Turkish': 'tr', 'Vietnamese': 'vi',
+    'Dutch': 'nl', 'Greek': 'el', 'Hebrew': 'he',
+    'Swedish': 'sv', 'Norwegian': 'no', 'Danish': 'da',
+    'Polish': 'pl', 'Czech': 'cs', 'Hungarian': 'hu',
+    'Finnish': 'fi', 'Thai': 'th', 'Filipino': 'fil',
+    'Malay': 'ms', 'Urdu': 'ur', 'Tamil': 'ta',
+    'Telugu': 'te', 'Marathi': 'mr', 'Punjabi': 'pa',
+    'Gujarati': 'gu', 'Ukrainian': 'uk', 'Romanian': 'ro',
+    'Bulgarian': 'bg', 'Serbian': 'sr', 'Croatian': 'hr',
+    'Slovak': 'sk', 'Slovenian': 'sl', 'Lithuanian': 'lt',
+    'Latvian': 'lv', 'Estonian': 'et', 'Icelandic': 'is',
+    'Afrikaans': 'af', 'Albanian': 'sq', 'Amharic': 'am',
+    'Armenian': 'hy', 'Azerbaijani': 'az', 'Basque': 'eu',
+    'Belarusian': 'be', 'Bosnian': 'bs', 'Catalan': 'ca',
+    'Cebuano': 'ceb', 'Corsican': 'co', 'Esperanto': 'eo',
+    'Frisian': 'fy', 'Galician': 'gl', 'Georgian': 'ka',
+    'Haitian Creole': 'ht', 'Hausa': 'ha', 'Hawaiian': 'haw',
+    'Hmong': 'hmn', 'Igbo': 'ig',
+    'Irish': 'ga', 'Javanese': 'jw', 'Kannada': 'kn',
+    'Kazakh': 'kk', 'Khmer': 'km', 'Kinyarwanda': 'rw',
+    'Kurdish': 'ku', 'Kyrgyz': 'ky', 'Lao': 'lo',
+    'Latin': 'la', 'Luxembourgish': 'lb', 'Macedonian': 'mk',
+    'Malagasy': 'mg', 'Malayalam': 'ml', 'Maltese': 'mt',
+    'Maori': 'mi', 'Mongolian': 'mn', 'Myanmar (Burmese)': 'my',
+    'Nepali': 'ne', 'Nyanja (Chichewa)': 'ny', 'Odia (Oriya)': 'or',
+    'Pashto': 'ps', 'Persian': 'fa', 'Samoan': 'sm',
+    'Scots Gaelic': 'gd', 'Sesotho': 'st', 'Shona': 'sn',
+    'Sindhi': 'sd', 'Sinhala (Sinhalese)': 'si', 'Somali': 'so',
+    'Sundanese': 'su', 'Swahili': 'sw', 'Tagalog (Filipino)': 'tl',
+    'Tajik': 'tg', 'Tatar': 'tt', 'Turkmen': 'tk',
+    'Uyghur': 'ug', 'Uzbek': 'uz', 'Welsh': 'cy',
+    'Xhosa': 'xh', 'Yiddish': 'yi', 'Yoruba': 'yo', 'Zulu': 'zu'
+}
+
+# Codes each provider accepts, in the provider's own spelling. Snapshots of
+# Whisper large-v3's tokenizer, deep-translator's Google table, gTTS's
+# tts_langs() and langdetect's bundled profiles.
+PROVIDER_LANGUAGES = {
+    "whisper": frozenset(
+        "en zh de es ru ko fr ja pt tr pl ca nl ar sv it id hi fi vi he uk el ms cs ro da hu ta no th "
+        "ur hr bg lt la mi ml cy sk te fa lv bn sr az sl kn et mk br eu is hy ne mn bs kk sq sw gl mr "
+        "pa si km sn yo so af oc ka be tg sd gu am yi lo uz fo ht ps tk nn mt sa lb my bo tl mg as tt "
+        "haw ln ha ba jw su yue".split()
+    ),
+    "google_translate": frozenset(
+        "af ak am ar as ay az be bg bho bm bn bs ca ceb ckb co cs cy da de doi dv ee el en eo es et eu "
+        "fa fi fr fy ga gd gl gn gom gu ha haw hi hmn hr ht hu hy id ig ilo is it iw ja jw ka kk km kn "
+        "ko kri ku ky la lb lg ln lo lt lus lv mai mg mi mk ml mn mni-Mtei mr ms mt my ne nl no nso ny "
+        "om or pa pl ps pt qu ro ru rw sa sd si sk sl sm sn so sq sr st su sv sw ta te tg th ti tk tl "
+        "tr ts tt ug uk ur uz vi xh yi yo zh-CN zh-TW zu".split()
+    ),
+    "gtts": frozenset(
+        "af am ar bg bn bs ca cs cy da de el en es et eu fi fr fr-CA gl gu ha hi hr hu id is it iw ja "
+        "jw km kn ko la lt lv ml mr ms my ne nl no pa pl pt pt-PT ro ru si sk sq sr su sv sw ta te th "
+        "tl tr uk ur vi yue zh zh-CN zh-TW".split()
+    ),
+    "langdetect": frozenset(
+        "af ar bg bn ca cs cy da de el en es et fa fi fr gu he hi hr hu id it ja kn ko lt lv mk ml mr "
+        "ne nl no pa pl pt ro ru sk sl so sq sv sw ta te th tl tr uk ur vi zh-cn zh-tw".split()
+    ),
+}
+
+# App code -> provider code, where the provider spells a language differently
+PROVIDER_CODES = {
+    "whisper": {"zh-CN": "zh", "zh-TW": "zh", "fil": "tl"},
+    "google_translate": {"he": "iw", "fil": "tl"},
+    "gtts": {"he": "iw", "fil": "tl"},
+    "langdetect": {"zh-CN": "zh-cn", "zh-TW": "zh-tw", "fil": "tl"},
+}
+
+# verbose_json reports Whisper's language as a lowercase English name
+WHISPER_NAMES = {
+    "english": "en", "chinese": "zh", "german": "de", "spanish": "es", "russian": "ru", "korean": "ko",
+    "french": "fr", "japanese": "ja", "portuguese": "pt", "turkish": "tr", "polish": "pl", "catalan": "ca",
+    "dutch": "nl", "arabic": "ar", "swedish": "sv", "italian": "it", "indonesian": "id", "hindi": "hi",
+    "finnish": "fi", "vietnamese": "vi", "hebrew": "he", "ukrainian": "uk", "greek": "el", "malay": "ms",
+    "czech": "cs", "romanian": "ro", "danish": "da", "hungarian": "hu", "tamil": "ta", "norwegian": "no",
+    "thai": "th", "urdu": "ur", "croatian": "hr", "bulgarian": "bg", "lithuanian": "lt", "latin": "la",
+    "maori": "mi", "malayalam": "ml", "welsh": "cy", "slovak": "sk", "telugu": "te", "persian": "fa",
+    "latvian": "lv", "bengali": "bn", "serbian": "sr", "azerbaijani": "az", "slovenian": "sl",
+    "kannada": "kn", "estonian": "et", "macedonian": "mk", "breton": "br", "basque": "eu",
+    "icelandic": "is", "armenian": "hy", "nepali": "ne", "mongolian": "mn", "bosnian": "bs",
+    "kazakh": "kk", "albanian": "sq", "swahili": "sw", "galician": "gl", "marathi": "mr",
+    "punjabi": "pa", "sinhala": "si", "khmer": "km", "shona": "sn", "yoruba": "yo", "somali": "so",
+    "afrikaans": "af", "occitan": "oc", "georgian": "ka", "belarusian": "be", "tajik": "tg",
+    "sindhi": "sd", "gujarati": "gu", "amharic": "am", "yiddish": "yi", "lao": "lo", "uzbek": "uz",
+    "faroese": "fo", "haitian creole": "ht", "pashto": "ps", "turkmen": "tk", "nynorsk": "nn",
+    "maltese": "mt", "sanskrit": "sa", "luxembourgish": "lb", "myanmar": "my", "tibetan": "bo",
+    "tagalog": "tl", "malagasy": "mg", "assamese": "as", "tatar": "tt", "hawaiian": "haw",
+    "lingala": "ln", "hausa": "ha", "bashkir": "ba", "javanese": "jw", "sundanese": "su",
+    "cantonese": "yue",
+}
+
+PROVIDER_NAMES = {"whisper": WHISPER_NAMES}
+
+PROVIDERS = tuple(PROVIDER_LANGUAGES)
+
+
+class LanguageRegistry:
+    """Language names and codes with a per-provider capability matrix, built once.
+
+    ``languages`` maps display names to app codes in UI order. ``name`` and
+    ``code`` look languages up in either direction, ``provider_code``
+    translates an app code into the spelling a provider expects (or None if
+    the provider does not support it) and ``normalize`` maps a provider's
+    code back to the app code. ``supports`` lets the pipeline skip or
+    reroute a stage before making a remote call that would fail.
+    """
+
+    def __init__(self, languages=LANGUAGES, provider_languages=PROVIDER_LANGUAGES,
+                 provider_codes=PROVIDER_CODES, provider_names=PROVIDER_NAMES):
+        self.languages = dict(languages)
+        self._provider_names = provider_names
+        self._names = {}
+        for name, code in self.languages.items():
+            self._names.setdefault(code, name)
+
+        self._to_provider = {}
+        self._from_provider = {}
+        for provider, supported in provider_languages.items():
+            aliases = provider_codes.get(provider, {})
+            forward = {}
+            for code in self._names:
+                provider_code = aliases.get(code, code)
+                if provider_code in supported:
+                    forward[code] = provider_code
+            backward = {}
+            # An app code that is also the provider's code wins over aliases
+            for code, provider_code in sorted(forward.items(), key=lambda item: item[0] != item[1]):
+                backward.setdefault(provider_code.lower(), code)
+            self._to_provider[provider] = forward
+            self._from_provider[provider] = backward
+
+    def name(self, code):
+        """Display name for an app code (the code itself if unknown)"""
+        return self._names.get(code, code)
+
+    def code(self, name):
+        """App code for a display name, or None"""
+        return self.languages.get(name)
+
+    def provider_code(self, code, provider):
+        """The code provider expects for an app code, or None if it is not supported"""
+        return self._to_provider[provider].get(code)
+
+    def supports(self, provider, code):
+        """True if provider handles the language with this app code"""
+        return code in self._to_provider[provider]
+
+    def normalize(self, provider_code, provider):
+        """App code for a code (or language name) reported by provider (the code itself if unknown)"""
+        key = provider_code.strip().lower()
+        named = self._provider_names.get(provider, {}).get(key)
+        return self._from_provider[provider].get(named or key, named or provider_code)
+
+    def same_language(self, code, other):
+        """True if two app codes name the same language, ignoring regional variants"""
+        if code.lower() == other.lower():
+            return True
+        return self._base(code) == self._base(other)
+
+    def capabilities(self, code):
+        """{provider: supported} for one app code"""
+        return {provider: self.supports(provider, code) for provider in self._to_provider}
+
+    def matrix(self):
+        """One row per language with its code and a flag per provider"""
+        return [
+            {"language": name, "code": code, **self.capabilities(code)}
+            for name, code in self.languages.items()
+        ]
+
+    def _base(self, code):
+        # Whisper's spelling folds variants (zh-CN/zh-TW -> zh, fil -> tl)
+        provider_code = self._to_provider["whisper"].get(code, code)
+        return provider_code.split("-")[0].lower()
+
+
+# Built once per process
+language_registry = LanguageRegistry()
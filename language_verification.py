@@ -0,0 +1,306 @@
+import json
+import math
+import os
+import threading
+import unicodedata
+
+import numpy as np
+
+from language_registry import language_registry
+
+# Languages written in each script other than Latin, most common first; the
+# first one names the language when nothing better is known
+SCRIPT_LANGUAGES = {
+    "CYRILLIC": ("ru", "uk", "bg", "sr", "mk", "be", "kk", "ky", "mn", "tg", "tt"),
+    "ARABIC": ("ar", "fa", "ur", "ps", "sd", "ug"),
+    "HEBREW": ("he", "yi"),
+    "GREEK": ("el",),
+    "DEVANAGARI": ("hi", "mr", "ne"),
+    "BENGALI": ("bn",),
+    "GURMUKHI": ("pa",),
+    "GUJARATI": ("gu",),
+    "ORIYA": ("or",),
+    "TAMIL": ("ta",),
+    "TELUGU": ("te",),
+    "KANNADA": ("kn",),
+    "MALAYALAM": ("ml",),
+    "SINHALA": ("si",),
+    "THAI": ("th",),
+    "LAO": ("lo",),
+    "KHMER": ("km",),
+    "MYANMAR": ("my",),
+    "GEORGIAN": ("ka",),
+    "ARMENIAN": ("hy",),
+    "ETHIOPIC": ("am",),
+    "HANGUL": ("ko",),
+    "KANA": ("ja",),
+    "CJK": ("zh-CN", "zh-TW"),
+}
+
+# Serbian is written in both alphabets; Japanese mixes kana and kanji
+_EXTRA_SCRIPTS = {"sr": ("LATIN",), "ja": ("CJK",)}
+
+_script_cache = {}
+
+
+def _script(char):
+    script = _script_cache.get(char)
+    if script is None:
+        name = unicodedata.name(char, "")
+        script = name.split(" ", 1)[0] if name else ""
+        if script in ("HIRAGANA", "KATAKANA"):
+            script = "KANA"
+        _script_cache[char] = script
+    return script
+
+
+def script_profile(text):
+    """Count the letters of text per Unicode script"""
+    counts = {}
+    for char in text:
+        if char.isalpha():
+            script = _script(char)
+            counts[script] = counts.get(script, 0) + 1
+    return counts
+
+
+def language_scripts(code):
+    """Scripts a language is written in (Latin unless listed otherwise)"""
+    scripts = tuple(script for script, codes in SCRIPT_LANGUAGES.items() if code in codes)
+    return (scripts or ("LATIN",)) + _EXTRA_SCRIPTS.get(code, ())
+
+
+def _words(text):
+    word = []
+    for char in text:
+        if char.isalpha():
+            word.append(char)
+        elif word:
+            yield "".join(word)
+            word = []
+    if word:
+        yield "".join(word)
+
+
+def extract_ngrams(text, max_n=3):
+    """Character 1-3 grams of every word, padded with spaces as in langdetect's profiles"""
+    grams = []
+    for word in _words(text):
+        padded = f" {word} "
+        for n in range(1, max_n + 1):
+            for i in range(len(padded) - n + 1):
+                gram = padded[i:i + n]
+                if gram != " ":
+                    grams.append(gram)
+    return grams
+
+
+class NgramModel:
+    """Character n-gram language model over langdetect's bundled profiles.
+
+    All profiles are loaded once into a single matrix of log probabilities
+    (one row per n-gram, one column per language), so scoring a text is one
+    lookup per n-gram and a vector sum. Scoring is deterministic, unlike
+    langdetect's randomly sampled trials, so the same text always gets the
+    same answer.
+    """
+
+    def __init__(self, profiles, floor=1e-6, normalize=None):
+        self.codes = [language_registry.normalize(profile["name"], "langdetect") for profile in profiles]
+        self._normalize = normalize
+        index = {}
+        for profile in profiles:
+            for gram in profile["freq"]:
+                index.setdefault(gram, len(index))
+        matrix = np.full((len(index), len(profiles)), math.log(floor), dtype=np.float32)
+        for column, profile in enumerate(profiles):
+            totals = profile["n_words"]
+            for gram, count in profile["freq"].items():
+                matrix[index[gram], column] = math.log(max(count / totals[len(gram) - 1], floor))
+        self._index = index
+        self._matrix = matrix
+
+    @classmethod
+    def from_langdetect(cls):
+        """Load every profile shipped with the langdetect package"""
+        import langdetect
+        from langdetect.utils.ngram import NGram
+
+        directory = os.path.join(os.path.dirname(langdetect.__file__), "profiles")
+        profiles = []
+        for name in sorted(os.listdir(directory)):
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                profiles.append(json.load(f))
+        # Profiles were built from text with langdetect's character folding
+        # (e.g. Han characters mapped to representatives), so score it the same way
+        return cls(profiles, normalize=NGram.normalize)
+
+    def resolve(self, code):
+        """The model's code for an app code, or None if no profile covers it"""
+        if code in self.codes:
+            return code
+        for candidate in self.codes:
+            if language_registry.same_language(candidate, code):
+                return candidate
+        return None
+
+    def scores(self, text):
+        """Average log probability per n-gram for each language, or None if nothing matched"""
+        if self._normalize is not None:
+            text = "".join(map(self._normalize, text))
+        rows = [self._index[gram] for gram in extract_ngrams(text) if gram in self._index]
+        if not rows:
+            return None
+        totals = self._matrix[rows].sum(axis=0) / len(rows)
+        return dict(zip(self.codes, totals.tolist()))
+
+    def best(self, text, candidates=None):
+        """Most likely language of text, optionally among candidates only"""
+        scores = self.scores(text)
+        if not scores:
+            return None
+        if candidates:
+            scores = {code: score for code, score in scores.items() if code in candidates} or scores
+        return max(scores, key=scores.get)
+
+
+class ScriptCheck:
+    """Decides from the writing system alone when it identifies the language"""
+
+    name = "script"
+
+    def __init__(self, min_share=0.6):
+        self.min_share = min_share
+
+    def check(self, sample):
+        counts = dict(sample["scripts"])
+        letters = sum(counts.values())
+        if not letters:
+            return None
+        if counts.get("KANA", 0) >= 0.1 * letters:
+            # Kanji in text with kana is Japanese
+            counts["KANA"] += counts.pop("CJK", 0)
+        dominant = max(counts, key=counts.get)
+        if counts[dominant] / letters < self.min_share:
+            return None
+
+        expected = sample["expected"]
+        if dominant in language_scripts(expected):
+            candidates = SCRIPT_LANGUAGES.get(dominant)
+            if candidates and all(language_registry.same_language(code, expected) for code in candidates):
+                return {"verdict": "match", "detected": expected}
+            return None
+        return {"verdict": "mismatch", "detected": None, "candidates": SCRIPT_LANGUAGES.get(dominant)}
+
+
+class WhisperCheck:
+    """Uses the language Whisper reported in its verbose_json response
+
+    When the request told Whisper which language to expect, the reported
+    language echoes that hint, so it only counts as evidence of a mismatch.
+    """
+
+    name = "whisper"
+
+    def check(self, sample):
+        reported = sample.get("whisper_language")
+        if not reported:
+            return None
+        detected = language_registry.normalize(reported, "whisper")
+        if not language_registry.same_language(detected, sample["expected"]):
+            return {"verdict": "mismatch", "detected": detected}
+        if not sample.get("hinted"):
+            return {"verdict": "match", "detected": detected}
+        return None
+
+
+class NgramCheck:
+    """Falls back to the n-gram model; close scores count as a match
+
+    ``margin`` is how far (in average log probability per n-gram) the
+    expected language may trail the best one, which keeps closely related
+    languages such as Norwegian and Danish from being rejected.
+    """
+
+    name = "ngram"
+
+    def __init__(self, model_factory, margin=0.15):
+        self.model_factory = model_factory
+        self.margin = margin
+
+    def check(self, sample):
+        model = self.model_factory()
+        expected = model.resolve(sample["expected"])
+        if expected is None:
+            return {"verdict": "skipped", "detected": None}
+        scores = model.scores(sample["text"])
+        if not scores:
+            return None
+        best = max(scores, key=scores.get)
+        if language_registry.same_language(best, expected) or scores[expected] >= scores[best] - self.margin:
+            return {"verdict": "match", "detected": sample["expected"]}
+        return {"verdict": "mismatch", "detected": best}
+
+
+class LanguageVerifier:
+    """Checks that a transcript is in the expected language.
+
+    ``checks`` run in order and the first one that reaches a verdict wins:
+    the Unicode script of the text, then Whisper's own language field, then
+    the n-gram model. Checks that can misfire on little text (every check
+    after ``short_text_checks``) are skipped for transcripts with fewer than
+    ``min_letters`` letters. ``verify`` returns {"verdict", "detected",
+    "method"} where the verdict is match, mismatch or skipped; anything
+    but a mismatch lets the transcript through.
+    """
+
+    def __init__(self, checks, min_letters=12, short_text_checks=2, namer=None):
+        self.checks = list(checks)
+        self.min_letters = min_letters
+        self.short_text_checks = short_text_checks
+        self.namer = namer
+        self._lock = threading.Lock()
+        self.counts = {}
+
+    def verify(self, text, expected_code, whisper_language=None, hinted=True):
+        """Return the verdict for text against the expected app language code"""
+        sample = {
+            "text": text,
+            "expected": expected_code,
+            "scripts": script_profile(text),
+            "whisper_language": whisper_language,
+            "hinted": hinted,
+        }
+        letters = sum(sample["scripts"].values())
+        result = None
+        method = "none"
+        for position, check in enumerate(self.checks):
+            if position >= self.short_text_checks and letters < self.min_letters:
+                result, method = {"verdict": "skipped", "detected": None}, "short"
+                break
+            result = check.check(sample)
+            if result is not None:
+                method = check.name
+                break
+        if result is None:
+            result = {"verdict": "skipped", "detected": None}
+
+        if result["verdict"] == "mismatch" and not result.get("detected"):
+            candidates = result.get("candidates") or ()
+            named = self.namer(text, candidates) if self.namer is not None else None
+            result["detected"] = named or (candidates[0] if candidates else None)
+
+        with self._lock:
+            key = (method, result["verdict"])
+            self.counts[key] = self.counts.get(key, 0) + 1
+        return {"verdict": result["verdict"], "detected": result["detected"], "method": method}
+
+    def stats(self):
+        """Verdict counts per deciding check"""
+        with self._lock:
+            return {f"{method}/{verdict}": count for (method, verdict), count in sorted(self.counts.items())}
+
+    def reset(self):
+        """Zero every counter"""
+        with self._lock:
+            self.counts = {}
@@ -0,0 +1,219 @@
+import time
+
+from core import (
+    security, new_status, PIPELINE_MODE,
+    secure_transcribe_audio_bytes, secure_enhance_medical_terms, secure_enhance_and_translate,
+    secure_translate_text, secure_text_to_speech, secure_fan_out
+)
+from result_cache import make_cache_key
+from telemetry import request_scope
+from secure_text import secure_scope
+from language_registry import language_registry
+
+
+class TranslationPipeline:
+    """Headless transcribe -> enhance -> translate (-> TTS) pipeline.
+
+    Wraps the ``secure_*`` functions from ``core`` without touching Streamlit,
+    so the same code path can be driven from scripts, batch jobs or load tests.
+    ``process`` is safe to call from several threads at once. ``mode`` picks
+    the two-step or fused enhance/translate path (defaults to PIPELINE_MODE).
+    Each call is one secure scope, so texts are handed between stages
+    without being encrypted and decrypted again.
+    """
+
+    def __init__(self, enhance=True, tts=False, result_cache=None, mode=None):
+        self.enhance = enhance
+        self.mode = mode or PIPELINE_MODE
+        self.tts = tts
+        self.result_cache = result_cache
+
+    def process(self, audio_bytes, source_lang_code, target_lang_code):
+        """Run the pipeline on one recording and return a result dict"""
+        with request_scope() as request_id, secure_scope():
+            result = self._process(audio_bytes, source_lang_code, target_lang_code)
+        result["request_id"] = request_id
+        return result
+
+    def _process(self, audio_bytes, source_lang_code, target_lang_code):
+        started = time.perf_counter()
+        timings = {}
+        result = {
+            "status": "error",
+            "error": None,
+            "source_language": source_lang_code,
+            "target_language": target_lang_code,
+            "transcription": None,
+            "translation": None,
+            "cached": False,
+            "timings": timings,
+        }
+
+        cache_key = None
+        cached = None
+        if self.result_cache is not None:
+            cache_key = make_cache_key(audio_bytes, source_lang_code, target_lang_code)
+            cached = self.result_cache.get(cache_key)
+
+        if cached:
+            result["transcription"] = cached["transcription"]
+            result["translation"] = cached["translation"]
+            result["cached"] = True
+        else:
+            status = new_status()
+            stage_start = time.perf_counter()
+            transcription = secure_transcribe_audio_bytes(audio_bytes, source_lang_code, status)
+            timings["transcribe"] = time.perf_counter() - stage_start
+            if not transcription or status.language_error:
+                result["error"] = status.error_message or "Failed to transcribe audio"
+                timings["total"] = time.perf_counter() - started
+                return result
+
+            # Targets Google Translate cannot handle go to the LLM in one call
+            fused = self.mode == "fused" or not language_registry.supports("google_translate", target_lang_code)
+            if self.enhance and fused:
+                stage_start = time.perf_counter()
+                enhanced_text, translation = secure_enhance_and_translate(
+                    transcription, target_lang_code, source_lang_code, status.transcript_segments, self.mode
+                )
+                timings["enhance_translate"] = time.perf_counter() - stage_start
+            else:
+                enhanced_text = transcription
+                if self.enhance:
+                    stage_start = time.perf_counter()
+                    enhanced_text = secure_enhance_medical_terms(
+                        transcription, status.transcript_segments, source_lang_code
+                    )
+                    timings["enhance"] = time.perf_counter() - stage_start
+
+                stage_start = time.perf_counter()
+                translation = secure_translate_text(enhanced_text, target_lang_code, source_lang_code)
+                timings["translate"] = time.perf_counter() - stage_start
+
+            result["transcription"] = security.decrypt_text(enhanced_text)
+            result["translation"] = security.decrypt_text(translation)
+            if not result["translation"]:
+                result["error"] = "Failed to translate text"
+                timings["total"] = time.perf_counter() - started
+                return result
+
+            if cache_key is not None:
+                self.result_cache.put(cache_key, {
+                    "transcription": result["transcription"],
+                    "translation": result["translation"]
+                })
+
+        if self.tts:
+            stage_start = time.perf_counter()
+            result["original_audio"] = self._synthesize(result["transcription"], source_lang_code)
+            result["translation_audio"] = self._synthesize(result["translation"], target_lang_code)
+            timings["tts"] = time.perf_counter() - stage_start
+
+        result["status"] = "ok"
+        timings["total"] = time.perf_counter() - started
+        return result
+
+    def process_many(self, audio_bytes, source_lang_code, target_lang_codes):
+        """Transcribe and enhance once, then translate into every target concurrently
+
+        Returns a result dict whose ``translations`` (and, with TTS,
+        ``translation_audio``) map each target code to its text (or MP3
+        bytes). Targets already in the result cache are not translated again.
+        """
+        with request_scope() as request_id, secure_scope():
+            result = self._process_many(audio_bytes, source_lang_code, list(dict.fromkeys(target_lang_codes)))
+        result["request_id"] = request_id
+        return result
+
+    def _process_many(self, audio_bytes, source_lang_code, target_lang_codes):
+        started = time.perf_counter()
+        timings = {}
+        result = {
+            "status": "error",
+            "error": None,
+            "source_language": source_lang_code,
+            "target_languages": target_lang_codes,
+            "transcription": None,
+            "translations": {},
+            "cached": [],
+            "timings": timings,
+        }
+        if self.tts:
+            result["translation_audio"] = {}
+
+        cache_keys = {}
+        missing = list(target_lang_codes)
+        if self.result_cache is not None:
+            missing = []
+            for target_lang_code in target_lang_codes:
+                cache_keys[target_lang_code] = make_cache_key(audio_bytes, source_lang_code, target_lang_code)
+                cached = self.result_cache.get(cache_keys[target_lang_code])
+                if cached:
+                    result["transcription"] = cached["transcription"]
+                    result["translations"][target_lang_code] = cached["translation"]
+                    result["cached"].append(target_lang_code)
+                else:
+                    missing.append(target_lang_code)
+
+        if missing:
+            status = new_status()
+            stage_start = time.perf_counter()
+            transcription = secure_transcribe_audio_bytes(audio_bytes, source_lang_code, status)
+            timings["transcribe"] = time.perf_counter() - stage_start
+            if not transcription or status.language_error:
+                result["error"] = status.error_message or "Failed to transcribe audio"
+                timings["total"] = time.perf_counter() - started
+                return result
+
+            stage_start = time.perf_counter()
+            for event in secure_fan_out(
+                transcription, missing, source_lang_code, status.transcript_segments, enhance=self.enhance
+            ):
+                if event["event"] == "original":
+                    result["transcription"] = security.decrypt_text(event["text"])
+                    timings["enhance"] = time.perf_counter() - stage_start
+                elif event["event"] == "translation":
+                    target_lang_code = event["target"]
+                    result["translations"][target_lang_code] = security.decrypt_text(event["text"])
+                    if self.tts:
+                        result["translation_audio"][target_lang_code] = event["audio"]
+                    timings[f"translate_{target_lang_code}"] = time.perf_counter() - stage_start
+            timings["fan_out"] = time.perf_counter() - stage_start
+
+            for target_lang_code in missing:
+                translation = result["translations"].get(target_lang_code)
+                if translation and target_lang_code in cache_keys:
+                    self.result_cache.put(cache_keys[target_lang_code], {
+                        "transcription": result["transcription"],
+                        "translation": translation
+                    })
+
+        failed = [code for code in target_lang_codes if not result["translations"].get(code)]
+        if failed:
+            result["error"] = f"Failed to translate text into {', '.join(failed)}"
+            timings["total"] = time.perf_counter() - started
+            return result
+
+        if self.tts:
+            stage_start = time.perf_counter()
+            result["original_audio"] = self._synthesize(result["transcription"], source_lang_code)
+            for target_lang_code in result["cached"]:
+                result["translation_audio"][target_lang_code] = self._synthesize(
+                    result["translations"][target_lang_code], target_lang_code
+                )
+            timings["tts"] = time.perf_counter() - stage_start
+
+        result["status"] = "ok"
+        timings["total"] = time.perf_counter() - started
+        return result
+
+    def process_file(self, path, source_lang_code, target_lang_code):
+        """Read a WAV file from disk and run it through the pipeline"""
+        with open(path, "rb") as f:
+            audio_bytes = f.read()
+        result = self.process(audio_bytes, source_lang_code, target_lang_code)
+        result["path"] = path
+        return result
+
+    def _synthesize(self, text, lang_code):
+        return secure_text_to_speech(security.wrap(text), lang_code)
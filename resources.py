@@ -0,0 +1,214 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Connection pool sizes for the shared keep-alive HTTP session
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "8"))
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "32"))
+
+
+class ResourceRegistry:
+    """Process-wide, lazily built shared resources.
+
+    Each resource is registered with a factory and built once, on first
+    ``get``, no matter how many Streamlit reruns or sessions ask for it.
+    ``warm`` builds everything up front and ``health`` reports on what has
+    been built. Factories do their own imports, so heavy client libraries
+    are only loaded when they are first needed.
+    """
+
+    def __init__(self):
+        self._factories = {}
+        self._health_checks = {}
+        self._instances = {}
+        self._build_seconds = {}
+        self._errors = {}
+        self._lock = threading.RLock()
+
+    def register(self, name, factory, health_check=None):
+        """Register a factory (and optional health check) under name"""
+        with self._lock:
+            self._factories[name] = factory
+            if health_check is not None:
+                self._health_checks[name] = health_check
+
+    def get(self, name):
+        """Return the shared instance, building it on first use"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                started = time.perf_counter()
+                try:
+                    instance = self._factories[name]()
+                except Exception as e:
+                    self._errors[name] = str(e)
+                    raise
+                self._build_seconds[name] = time.perf_counter() - started
+                self._errors.pop(name, None)
+                self._instances[name] = instance
+            return instance
+
+    def warm(self, names=None):
+        """Build the given (or all) resources now; returns build errors by name"""
+        errors = {}
+        for name in names or list(self._factories):
+            try:
+                self.get(name)
+            except Exception as e:
+                logging.error(f"Failed to warm resource {name}: {str(e)}")
+                errors[name] = str(e)
+        return errors
+
+    def health(self, deep=False):
+        """Report build state, build time and health check result per resource
+
+        Shallow checks only look at local state; ``deep=True`` lets checks
+        make a network round trip.
+        """
+        report = {}
+        for name in list(self._factories):
+            instance = self._instances.get(name)
+            entry = {
+                "built": instance is not None,
+                "build_ms": round(self._build_seconds.get(name, 0.0) * 1000, 2),
+                "ok": instance is not None,
+                "detail": self._errors.get(name, ""),
+            }
+            check = self._health_checks.get(name)
+            if instance is not None and check is not None:
+                try:
+                    entry["ok"], entry["detail"] = check(instance, deep)
+                except Exception as e:
+                    entry["ok"], entry["detail"] = False, str(e)
+            report[name] = entry
+        return report
+
+    @contextmanager
+    def overridden(self, **instances):
+        """Temporarily replace resources, e.g. with offline fakes"""
+        with self._lock:
+            previous = {name: self._instances.get(name) for name in instances}
+            self._instances.update(instances)
+        try:
+            yield self
+        finally:
+            with self._lock:
+                for name, instance in previous.items():
+                    if instance is None:
+                        self._instances.pop(name, None)
+                    else:
+                        self._instances[name] = instance
+
+
+class _SharedSession:
+    """Stand-in for ``requests.Session()`` that reuses the pooled session
+
+    Libraries open a session per call with ``with requests.Session() as s``;
+    this keeps that code working while leaving the shared session open.
+    """
+
+    def __init__(self, session):
+        self._session = session
+
+    def __enter__(self):
+        return self._session
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+
+class _PooledRequests:
+    """Module-like proxy for ``requests`` that routes calls through one session"""
+
+    def __init__(self, session):
+        import requests
+        self._requests = requests
+        self._session = session
+
+    def get(self, *args, **kwargs):
+        return self._session.get(*args, **kwargs)
+
+    def post(self, *args, **kwargs):
+        return self._session.post(*args, **kwargs)
+
+    def Session(self):
+        return _SharedSession(self._session)
+
+    def __getattr__(self, name):
+        return getattr(self._requests, name)
+
+
+def _build_http_session():
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _build_groq():
+    from groq import Groq
+    # The dispatcher is the only retry layer: SDK retries would multiply its
+    # attempts and sleep past its max_delay cap, unseen by its counters
+    return Groq(api_key=os.getenv("api_key"), max_retries=0)
+
+
+def _build_translator():
+    from deep_translator import GoogleTranslator
+    from deep_translator import google as google_module
+
+    google_module.requests = _PooledRequests(registry.get("http_session"))
+    return GoogleTranslator
+
+
+def _build_tts():
+    from gtts import gTTS
+    from gtts import tts as tts_module
+
+    tts_module.requests = _PooledRequests(registry.get("http_session"))
+    return gTTS
+
+
+def _build_language_model():
+    from language_verification import NgramModel
+
+    # Reads every langdetect profile into one matrix; pay that cost here
+    return NgramModel.from_langdetect()
+
+
+def _check_groq(client, deep):
+    if not getattr(client, "api_key", None):
+        return False, "api_key is not set"
+    if deep:
+        client.models.list()
+    return True, ""
+
+
+def _check_language_model(model, deep):
+    return True, f"{len(model.codes)} languages"
+
+
+def _check_translator(translator_class, deep):
+    if deep:
+        translated = translator_class(source="en", target="es").translate("hello")
+        return bool(translated), ""
+    return True, ""
+
+
+registry = ResourceRegistry()
+registry.register("http_session", _build_http_session)
+registry.register("groq", _build_groq, _check_groq)
+registry.register("translator", _build_translator, _check_translator)
+registry.register("tts", _build_tts)
+registry.register("language_model", _build_language_model, _check_language_model)
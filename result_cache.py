@@ -0,0 +1,158 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+
+def make_cache_key(audio_bytes, source_lang_code, target_lang_code):
+    """Build a content-addressed key from the audio and the language pair"""
+    digest = hashlib.sha256()
+    digest.update(audio_bytes)
+    digest.update(b"\0" + source_lang_code.encode() + b"\0" + target_lang_code.encode())
+    return digest.hexdigest()
+
+
+class PipelineResultCache:
+    """LRU/TTL cache of pipeline results with an optional encrypted disk tier.
+
+    Values are small dicts (transcription and translation text). The memory
+    tier is bounded both by entry count and by the approximate size of the
+    stored text. When ``disk_dir`` and ``cipher`` are given, entries are also
+    written to disk encrypted with ``cipher.encrypt_text`` so they survive a
+    process restart.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=16 * 1024 * 1024, ttl_seconds=3600,
+                 disk_dir=None, cipher=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir if cipher is not None else None
+        self.cipher = cipher
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, mode=0o700, exist_ok=True)
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created, size, value = entry
+                if self._is_fresh(created, now):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return dict(value)
+                self._remove(key)
+
+        value, created = self._read_disk(key, now)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._store(key, value, created)
+        return dict(value)
+
+    def put(self, key, value):
+        """Store a result dict under key"""
+        created = time.time()
+        with self._lock:
+            self._store(key, dict(value), created)
+        self._write_disk(key, value, created)
+
+    def clear(self):
+        """Drop every in-memory entry (the disk tier is left in place)"""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self):
+        """Return hit/miss counters and current occupancy"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _is_fresh(self, created, now):
+        return not self.ttl_seconds or now - created < self.ttl_seconds
+
+    def _store(self, key, value, created):
+        size = len(json.dumps(value).encode())
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (created, size, value)
+        self._total_bytes += size
+        while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._total_bytes -= size
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.bin")
+
+    def _read_disk(self, key, now):
+        if not self.disk_dir:
+            return None, None
+        path = self._disk_path(key)
+        try:
+            with open(path, "r") as f:
+                payload = self.cipher.decrypt_text(f.read())
+            if not payload:
+                return None, None
+            record = json.loads(payload)
+            if not self._is_fresh(record["created"], now):
+                os.remove(path)
+                return None, None
+            return record["value"], record["created"]
+        except FileNotFoundError:
+            return None, None
+        except Exception as e:
+            logging.error(f"Result cache read error: {str(e)}")
+            return None, None
+
+    def _write_disk(self, key, value, created):
+        if not self.disk_dir:
+            return
+        tmp_path = None
+        try:
+            payload = self.cipher.encrypt_text(json.dumps({"created": created, "value": value}))
+            path = self._disk_path(key)
+            # A unique temp file per writer (created 0600), so concurrent
+            # writers of the same key never share one before the rename
+            with tempfile.NamedTemporaryFile(
+                "w", dir=self.disk_dir, prefix=f"{key}.", suffix=".tmp", delete=False
+            ) as f:
+                tmp_path = f.name
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logging.error(f"Result cache write error: {str(e)}")
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -0,0 +1,119 @@
+import contextvars
+import threading
+from contextlib import contextmanager
+
+_scope = contextvars.ContextVar("secure_scope", default=None)
+
+
+class _Scope:
+    def __init__(self, hold):
+        self.hold = hold
+        self.values = []
+        self.lock = threading.Lock()
+
+    def register(self, value):
+        with self.lock:
+            self.values.append(value)
+
+
+@contextmanager
+def secure_scope(hold=True):
+    """Let SecureText values keep their plaintext until the block ends
+
+    Values created or opened inside the block decrypt at most once and are
+    passed between stages without being re-encrypted; on exit their
+    plaintext buffers are zeroed. A value that must outlive the block (to be
+    stored or handed to another session) has to be ``seal``-ed first. A
+    nested scope joins the outer one. ``hold=False`` keeps nothing in the
+    clear, so every stage encrypts its output and decrypts its input again;
+    the benchmarks use it as the baseline.
+    """
+    if _scope.get() is not None:
+        yield _scope.get()
+        return
+    scope = _Scope(hold)
+    token = _scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _scope.reset(token)
+        for value in scope.values:
+            value.wipe()
+
+
+def _holding_scope():
+    scope = _scope.get()
+    return scope if scope is not None and scope.hold else None
+
+
+class SecureText:
+    """Text that moves between pipeline stages without repeated Fernet round trips.
+
+    A value holds a Fernet token, its plaintext, or both. Inside a
+    ``secure_scope`` the plaintext is kept in a bytearray that is zeroed when
+    the scope ends, so a value is decrypted at most once however many stages
+    read it, and text produced by a stage is only encrypted when ``seal`` is
+    called at a persistence or session boundary. Outside a scope it behaves
+    like the plain token strings it replaces: new values are encrypted
+    immediately and every ``reveal`` decrypts. The strings ``reveal`` returns
+    are ordinary Python strings and cannot be wiped.
+    """
+
+    __slots__ = ("_cipher", "_token", "_buffer", "_lock")
+
+    def __init__(self, cipher, token=None, plaintext=None):
+        self._cipher = cipher
+        self._token = token
+        self._buffer = None
+        self._lock = threading.Lock()
+        if plaintext is not None:
+            scope = _holding_scope()
+            if scope is None:
+                self._token = cipher.encrypt_text(plaintext)
+            else:
+                self._buffer = bytearray(plaintext.encode("utf-8"))
+                scope.register(self)
+
+    @classmethod
+    def coerce(cls, cipher, value):
+        """Return value as a SecureText; strings are taken to be Fernet tokens"""
+        if value is None or isinstance(value, SecureText):
+            return value
+        return cls(cipher, token=value)
+
+    def reveal(self):
+        """Return the plaintext, or None if it cannot be decrypted or was wiped unsealed"""
+        with self._lock:
+            if self._buffer is not None:
+                return self._buffer.decode("utf-8")
+            if self._token is None:
+                return None
+            plaintext = self._cipher.decrypt_text(self._token)
+            scope = _holding_scope()
+            if plaintext is not None and scope is not None:
+                self._buffer = bytearray(plaintext.encode("utf-8"))
+                scope.register(self)
+            return plaintext
+
+    def seal(self):
+        """Encrypt the plaintext if no token exists yet and return self"""
+        with self._lock:
+            if self._token is None and self._buffer is not None:
+                self._token = self._cipher.encrypt_text(self._buffer.decode("utf-8"))
+        return self
+
+    @property
+    def token(self):
+        """The Fernet token, encrypting now if needed"""
+        return self.seal()._token
+
+    def wipe(self):
+        """Zero and drop the plaintext buffer"""
+        with self._lock:
+            if self._buffer is not None:
+                # Same-length slice assignment overwrites the buffer in place
+                self._buffer[:] = bytes(len(self._buffer))
+                self._buffer = None
+
+    def __repr__(self):
+        return f"SecureText(sealed={self._token is not None}, held={self._buffer is not None})"
@@ -0,0 +1,173 @@
+import hashlib
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from audio_processing import decode_wav, encode_wav, split_on_silence, trailing_silence_ms
+from core import (
+    security, new_status,
+    secure_transcribe_audio_bytes, secure_enhance_and_translate,
+    secure_translate_text
+)
+from telemetry import request_scope
+from secure_text import secure_scope
+
+
+class StreamingTranscriber:
+    """Incremental transcription of a recording that arrives in pieces.
+
+    Audio passed to ``feed`` is buffered and split at silence boundaries with
+    the local energy VAD. Every segment that is followed by a real pause is
+    closed and submitted to the worker pool straight away, so the first
+    partial translation depends on the first segment's length rather than on
+    the whole utterance. ``finish`` flushes the remaining audio and returns the
+    stitched result.
+    """
+
+    def __init__(self, source_lang_code, target_lang_code, enhance=True, executor=None,
+                 min_silence_ms=500, min_segment_s=1.0, max_segment_s=20.0):
+        self.source_lang_code = source_lang_code
+        self.target_lang_code = target_lang_code
+        self.enhance = enhance
+        self.min_silence_ms = min_silence_ms
+        self.min_segment_s = min_segment_s
+        self.max_segment_s = max_segment_s
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=3)
+        self._lock = threading.Lock()
+        self._buffer = None
+        self._sample_rate = None
+        self._futures = []
+        self._last_clip_digest = None
+        self.request_id = uuid.uuid4().hex[:12]
+
+    def feed(self, audio_bytes):
+        """Add a WAV clip; returns the number of segments submitted"""
+        digest = hashlib.sha256(audio_bytes).hexdigest()
+        if digest == self._last_clip_digest:
+            # Streamlit hands the same recorder value back on every rerun
+            return 0
+        self._last_clip_digest = digest
+
+        samples, sample_rate = decode_wav(audio_bytes)
+        with self._lock:
+            if self._sample_rate is not None and sample_rate != self._sample_rate:
+                self._flush_buffer()
+            if self._buffer is None:
+                self._buffer = samples
+                self._sample_rate = sample_rate
+            else:
+                self._buffer = np.concatenate([self._buffer, samples])
+            return self._submit_closed_segments(final=False)
+
+    def partials(self):
+        """Results of the segments finished so far, in recording order"""
+        with self._lock:
+            futures = list(self._futures)
+        results = []
+        for future in futures:
+            if not future.done():
+                break
+            results.append(future.result())
+        return results
+
+    def pending(self):
+        """Number of submitted segments that are still being processed"""
+        with self._lock:
+            return sum(1 for future in self._futures if not future.done())
+
+    def finish(self):
+        """Flush the buffered audio, wait for every segment and stitch the result"""
+        with self._lock:
+            self._submit_closed_segments(final=True)
+            futures = list(self._futures)
+        segments = [future.result() for future in futures]
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
+        with request_scope(self.request_id):
+            return self._stitch(segments)
+
+    def _stitch(self, segments):
+        usable = [segment for segment in segments if segment["transcription"]]
+        result = {
+            "segments": segments,
+            "transcription": " ".join(segment["transcription"] for segment in usable),
+            "translation": " ".join(segment["translation"] or "" for segment in usable).strip(),
+            "error": None,
+        }
+        if not usable:
+            errors = [segment["error"] for segment in segments if segment["error"]]
+            result["error"] = errors[0] if errors else "No speech detected"
+            return result
+
+        if self.enhance:
+            # Segments were translated without the LLM pass to keep partials fast;
+            # the final result runs the full pipeline once on the stitched text.
+            signals = [segment["signals"] for segment in usable]
+            whisper_segments = None
+            if all(signals):
+                whisper_segments = [signal for segment_signals in signals for signal in segment_signals]
+            with secure_scope():
+                enhanced_text, translation = secure_enhance_and_translate(
+                    security.wrap(result["transcription"]),
+                    self.target_lang_code, self.source_lang_code, whisper_segments
+                )
+                result["transcription"] = security.decrypt_text(enhanced_text) or result["transcription"]
+                result["translation"] = security.decrypt_text(translation) or result["translation"]
+        return result
+
+    def _submit_closed_segments(self, final):
+        if self._buffer is None or len(self._buffer) == 0:
+            return 0
+        segments = split_on_silence(
+            self._buffer, self._sample_rate,
+            min_silence_ms=self.min_silence_ms,
+            min_segment_s=self.min_segment_s,
+            max_segment_s=self.max_segment_s
+        )
+        if not final and segments:
+            if trailing_silence_ms(self._buffer, self._sample_rate) < self.min_silence_ms:
+                # The speaker may still be talking: keep the last segment open
+                segments = segments[:-1]
+        if not segments:
+            if final:
+                self._buffer = None
+            return 0
+
+        for start, end in segments:
+            chunk = encode_wav(self._buffer[start:end], self._sample_rate)
+            index = len(self._futures)
+            self._futures.append(self._executor.submit(self._process_segment, index, chunk))
+
+        consumed = len(self._buffer) if final else segments[-1][1]
+        self._buffer = self._buffer[consumed:]
+        return len(segments)
+
+    def _flush_buffer(self):
+        self._submit_closed_segments(final=True)
+        self._buffer = None
+        self._sample_rate = None
+
+    def _process_segment(self, index, chunk):
+        with request_scope(self.request_id), secure_scope():
+            return self._run_segment(index, chunk)
+
+    def _run_segment(self, index, chunk):
+        result = {"index": index, "transcription": None, "translation": None, "error": None, "signals": None}
+        try:
+            status = new_status()
+            transcription = secure_transcribe_audio_bytes(chunk, self.source_lang_code, status)
+            if not transcription or status.language_error:
+                result["error"] = status.error_message or "Failed to transcribe audio"
+                return result
+            translation = secure_translate_text(transcription, self.target_lang_code, self.source_lang_code)
+            result["transcription"] = security.decrypt_text(transcription)
+            result["signals"] = status.transcript_segments
+            result["translation"] = security.decrypt_text(translation)
+        except Exception as e:
+            logging.error(f"Streaming segment error: {str(e)}")
+            result["error"] = str(e)
+        return result
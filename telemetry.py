@@ -0,0 +1,194 @@
+import contextvars
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+_request_id = contextvars.ContextVar("request_id", default=None)
+
+# Upper bounds (seconds) of the Prometheus histogram buckets
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def current_request_id():
+    """Request ID of the pipeline run the caller belongs to, if any"""
+    return _request_id.get()
+
+
+@contextmanager
+def request_scope(request_id=None):
+    """Tag every stage recorded inside the block with one request ID"""
+    request_id = request_id or uuid.uuid4().hex[:12]
+    token = _request_id.set(request_id)
+    try:
+        yield request_id
+    finally:
+        _request_id.reset(token)
+
+
+def bind_context(fn):
+    """Wrap fn so it runs with the caller's request ID when used from a worker thread"""
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.copy().run(fn, *args, **kwargs)
+    return run
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class _StageStats:
+    def __init__(self, window, buckets):
+        self.recent = deque(maxlen=window)
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.total_seconds = 0.0
+        self.outcomes = {}
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def record(self, duration, outcome, bytes_in, bytes_out):
+        self.recent.append(duration)
+        self.count += 1
+        self.total_seconds += duration
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        self.bytes_in += bytes_in or 0
+        self.bytes_out += bytes_out or 0
+        for i, bound in enumerate(self.buckets):
+            if duration <= bound:
+                self.bucket_counts[i] += 1
+
+
+class Tracer:
+    """Records duration, payload sizes and outcome for every pipeline stage.
+
+    Each finished stage is kept in a per-stage rolling window (for p50/p95/p99)
+    and in cumulative Prometheus histogram buckets, and is optionally written
+    as one JSON line to the ``lingualink.trace`` logger.
+    """
+
+    def __init__(self, window=1024, buckets=DEFAULT_BUCKETS, logger=None):
+        self.window = window
+        self.buckets = tuple(buckets)
+        self.logger = logger or logging.getLogger("lingualink.trace")
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name, bytes_in=None, log=True):
+        """Time the enclosed block as stage ``name``
+
+        The yielded dict may be updated with ``bytes_out`` and ``outcome``
+        (defaults to "ok", or "error" if the block raises).
+        """
+        span = {"bytes_in": bytes_in, "bytes_out": None, "outcome": "ok"}
+        started = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span["outcome"] = "error"
+            span["error"] = type(e).__name__
+            raise
+        finally:
+            duration = time.perf_counter() - started
+            self._record(name, duration, span, log)
+
+    def record(self, name, duration, outcome="ok", bytes_in=None, bytes_out=None, log=False):
+        """Record a duration measured elsewhere (e.g. time spent waiting) as stage ``name``"""
+        span = {"bytes_in": bytes_in, "bytes_out": bytes_out, "outcome": outcome}
+        self._record(name, duration, span, log)
+
+    def _record(self, name, duration, span, log):
+        with self._lock:
+            stats = self._stages.get(name)
+            if stats is None:
+                stats = self._stages[name] = _StageStats(self.window, self.buckets)
+            stats.record(duration, span["outcome"], span["bytes_in"], span["bytes_out"])
+
+        if log and self.logger.isEnabledFor(logging.INFO):
+            record = {
+                "event": "stage",
+                "request_id": current_request_id(),
+                "stage": name,
+                "duration_ms": round(duration * 1000, 3),
+                "outcome": span["outcome"],
+                "bytes_in": span["bytes_in"],
+                "bytes_out": span["bytes_out"],
+            }
+            if "error" in span:
+                record["error"] = span["error"]
+            self.logger.info(json.dumps(record))
+
+    def snapshot(self):
+        """Per-stage counts, outcomes, payload totals and rolling percentiles"""
+        with self._lock:
+            result = {}
+            for name, stats in sorted(self._stages.items()):
+                recent = sorted(stats.recent)
+                result[name] = {
+                    "count": stats.count,
+                    "outcomes": dict(stats.outcomes),
+                    "mean_ms": round(stats.total_seconds / stats.count * 1000, 3) if stats.count else 0.0,
+                    "p50_ms": round(_percentile(recent, 0.50) * 1000, 3),
+                    "p95_ms": round(_percentile(recent, 0.95) * 1000, 3),
+                    "p99_ms": round(_percentile(recent, 0.99) * 1000, 3),
+                    "bytes_in": stats.bytes_in,
+                    "bytes_out": stats.bytes_out,
+                }
+            return result
+
+    def prometheus(self):
+        """Render all stage metrics in the Prometheus text exposition format"""
+        lines = [
+            "# HELP lingualink_stage_duration_seconds Pipeline stage latency.",
+            "# TYPE lingualink_stage_duration_seconds histogram",
+        ]
+        with self._lock:
+            stages = sorted(self._stages.items())
+            for name, stats in stages:
+                for bound, count in zip(stats.buckets, stats.bucket_counts):
+                    lines.append(f'lingualink_stage_duration_seconds_bucket{{stage="{name}",le="{bound}"}} {count}')
+                lines.append(f'lingualink_stage_duration_seconds_bucket{{stage="{name}",le="+Inf"}} {stats.count}')
+                lines.append(f'lingualink_stage_duration_seconds_sum{{stage="{name}"}} {stats.total_seconds:.6f}')
+                lines.append(f'lingualink_stage_duration_seconds_count{{stage="{name}"}} {stats.count}')
+
+            lines.append("# HELP lingualink_stage_latency_quantile_seconds Rolling latency quantiles over recent calls.")
+            lines.append("# TYPE lingualink_stage_latency_quantile_seconds gauge")
+            for name, stats in stages:
+                recent = sorted(stats.recent)
+                for quantile in (0.5, 0.95, 0.99):
+                    lines.append(
+                        f'lingualink_stage_latency_quantile_seconds{{stage="{name}",quantile="{quantile}"}} '
+                        f'{_percentile(recent, quantile):.6f}'
+                    )
+
+            lines.append("# HELP lingualink_stage_calls_total Pipeline stage calls by outcome.")
+            lines.append("# TYPE lingualink_stage_calls_total counter")
+            for name, stats in stages:
+                for outcome, count in sorted(stats.outcomes.items()):
+                    lines.append(f'lingualink_stage_calls_total{{stage="{name}",outcome="{outcome}"}} {count}')
+
+            lines.append("# HELP lingualink_stage_bytes_total Payload bytes handled per stage.")
+            lines.append("# TYPE lingualink_stage_bytes_total counter")
+            for name, stats in stages:
+                lines.append(f'lingualink_stage_bytes_total{{stage="{name}",direction="in"}} {stats.bytes_in}')
+                lines.append(f'lingualink_stage_bytes_total{{stage="{name}",direction="out"}} {stats.bytes_out}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """Forget all recorded stages"""
+        with self._lock:
+            self._stages.clear()
+
+
+# Process-wide tracer used by every pipeline module
+tracer = Tracer()
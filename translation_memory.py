@@ -0,0 +1,429 @@
+import difflib
+import hashlib
+import logging
+import random
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+# A sentence ends at a newline or at terminal punctuation followed by whitespace;
+# full-width terminators end one even without a space after them
+_SPACE_RE = re.compile(r"\s+")
+_TERMINATORS = set(".!?。！？؟।")
+_UNSPACED_TERMINATORS = set("。！？")
+_QUESTION_MARKS = set("?？؟")
+_EXCLAMATION_MARKS = set("!！")
+
+# Words whose final "." does not end a sentence ("Dr. Smith", "3 p.m. today")
+_ABBREVIATIONS = {
+    "dr", "mr", "mrs", "ms", "mx", "prof", "sr", "jr", "st", "vs", "etc", "approx", "dept", "fig",
+    "e.g", "i.e", "a.m", "p.m", "cf", "no", "nr", "sra", "srta", "mme", "mlle", "hr", "fr",
+}
+
+# Targets whose sentences are not separated by spaces
+_UNSPACED_LANGS = {"ja", "zh-CN", "zh-TW", "th", "lo", "km", "my"}
+
+_MERSENNE_PRIME = (1 << 61) - 1
+
+# Spoken fillers a near-duplicate may add or drop without changing its meaning
+_FILLERS = {
+    "um", "umm", "uh", "uhh", "er", "erm", "ah", "hmm", "mm", "okay", "ok",
+    "eh", "este", "pues", "euh", "ben", "bah", "ähm", "äh", "né", "allora", "cioè",
+}
+
+# Numbers and negations; a sentence whose copies of these differ means something else
+_NUMERAL_RE = re.compile(r"\d")
+_NEGATIONS = {
+    "no", "not", "never", "none", "nobody", "nothing", "neither", "nor", "without", "cannot", "t",
+    "nunca", "nada", "nadie", "ni", "sin", "ne", "pas", "jamais", "sans", "aucun", "aucune",
+    "nicht", "kein", "keine", "keinen", "keinem", "keiner", "nie", "niemals", "ohne",
+    "não", "nem", "sem", "non", "mai", "senza", "nessuno",
+}
+
+
+def _word_before(text, position):
+    start = position
+    while start > 0 and not text[start - 1].isspace():
+        start -= 1
+    return text[start:position].lstrip("([{\"'").casefold()
+
+
+def _is_boundary(text, start, end):
+    """True if the terminator run text[start:end] ends a sentence"""
+    run = text[start:end]
+    if any(char in _UNSPACED_TERMINATORS for char in run):
+        return True
+    if end < len(text) and not text[end].isspace():
+        # "2.5", "p.m", "e.g": no space after the dot
+        return False
+    if run == ".":
+        if _word_before(text, start) in _ABBREVIATIONS:
+            return False
+        # Never split between two digits ("2. 5" from a transcriber)
+        following = end
+        while following < len(text) and text[following] in " \t":
+            following += 1
+        if start > 0 and text[start - 1].isdigit() and following < len(text) and text[following].isdigit():
+            return False
+    return True
+
+
+def _sentence_ends(text):
+    """Yield (end of sentence, end of the whitespace after it) for every sentence boundary"""
+    position = 0
+    while position < len(text):
+        char = text[position]
+        if char == "\n" or char in _TERMINATORS:
+            end = position
+            if char == "\n":
+                boundary = True
+            else:
+                while end < len(text) and text[end] in _TERMINATORS:
+                    end += 1
+                boundary = _is_boundary(text, position, end)
+            if boundary:
+                after = end
+                while after < len(text) and text[after].isspace():
+                    after += 1
+                yield end, after
+                position = after
+                continue
+            position = max(end, position + 1)
+            continue
+        position += 1
+
+
+def _add_part(parts, chunk, separator):
+    sentence = chunk.strip()
+    if sentence:
+        parts.append((sentence, chunk[len(chunk.rstrip()):] + separator))
+
+
+def split_sentences(text):
+    """Split text into (sentence, trailing separator) pairs, preserving order"""
+    parts = []
+    start = 0
+    for end, after in _sentence_ends(text):
+        _add_part(parts, text[start:end], text[end:after])
+        start = after
+    _add_part(parts, text[start:], "")
+    return parts
+
+
+def join_sentences(sentences, lang):
+    """Join sentences with the separator the language uses between them"""
+    joiner = "" if lang in _UNSPACED_LANGS else " "
+    return joiner.join(sentence for sentence in sentences if sentence)
+
+
+class SentenceBuffer:
+    """Collects streamed text and hands out sentences once they are complete
+
+    A sentence counts as complete once the text after its terminal
+    punctuation (whitespace or a newline) has arrived; the unfinished tail is
+    kept until more text or ``flush``. A sentence ending in "<digit>." is
+    held until a token after the whitespace arrives, since "Take 2." may
+    still continue as "Take 2.5 mg".
+    """
+
+    def __init__(self):
+        self._text = ""
+
+    def feed(self, delta):
+        """Add streamed text and return the sentences it completed"""
+        self._text += delta
+        text = self._text
+        sentences = []
+        consumed = 0
+        for end, after in _sentence_ends(text):
+            if end == len(text):
+                # Nothing after the terminator yet: the sentence may still grow
+                break
+            if after == len(text) and text[end - 1] == "." and end > 1 and text[end - 2].isdigit():
+                # "Take 2. " may be followed by "5 mg"
+                break
+            sentence = text[consumed:end].strip()
+            if sentence:
+                sentences.append(sentence)
+            consumed = after
+        self._text = text[consumed:]
+        return sentences
+
+    def flush(self):
+        """Return whatever is left as a final sentence"""
+        rest = self._text.strip()
+        self._text = ""
+        return [rest] if rest else []
+
+
+def normalize_sentence(sentence):
+    """Canonical form used for matching: casefolded, single-spaced, no punctuation
+
+    A final question or exclamation mark is kept as the last token, so a
+    question never matches the statement with the same words.
+    """
+    stripped = "".join(
+        " " if unicodedata.category(char).startswith("P") else char
+        for char in unicodedata.normalize("NFC", sentence.casefold())
+    )
+    normalized = _SPACE_RE.sub(" ", stripped).strip()
+    final = sentence.rstrip()[-1:]
+    if normalized and final in _QUESTION_MARKS:
+        return normalized + " ?"
+    if normalized and final in _EXCLAMATION_MARKS:
+        return normalized + " !"
+    return normalized
+
+
+def _shingles(text, size=3):
+    padded = f" {text} "
+    if len(padded) <= size:
+        return {padded}
+    return {padded[i:i + size] for i in range(len(padded) - size + 1)}
+
+
+def _jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def _guard_tokens(words):
+    """Numbers and negations of a normalized sentence, in order ("don't" normalizes to "don t")"""
+    return [word for word in words if _NUMERAL_RE.search(word) or word in _NEGATIONS]
+
+
+def same_meaning(normalized, candidate):
+    """True if two normalized sentences differ only by spoken fillers
+
+    A near-duplicate that changes a number, a negation or any other word is
+    a different sentence and must be translated on its own.
+    """
+    words, other = normalized.split(), candidate.split()
+    if _guard_tokens(words) != _guard_tokens(other):
+        return False
+    matcher = difflib.SequenceMatcher(a=words, b=other, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag != "equal" and not all(word in _FILLERS for word in words[i1:i2] + other[j1:j2]):
+            return False
+    return True
+
+
+class MinHashIndex:
+    """Locality-sensitive index over character shingles for near-duplicate lookup"""
+
+    def __init__(self, num_perm=64, bands=16, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        rng = random.Random(seed)
+        self.rows = num_perm // bands
+        self.bands = bands
+        self._perms = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+        self._buckets = {}
+
+    def signature(self, shingles):
+        hashes = [
+            int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "little")
+            for s in shingles
+        ]
+        return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in self._perms]
+
+    def _band_keys(self, signature):
+        for band in range(self.bands):
+            yield band, tuple(signature[band * self.rows:(band + 1) * self.rows])
+
+    def add(self, key, signature):
+        for band_key in self._band_keys(signature):
+            self._buckets.setdefault(band_key, set()).add(key)
+
+    def remove(self, key, signature):
+        for band_key in self._band_keys(signature):
+            bucket = self._buckets.get(band_key)
+            if bucket:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def candidates(self, signature):
+        found = set()
+        for band_key in self._band_keys(signature):
+            found.update(self._buckets.get(band_key, ()))
+        return found
+
+
+class TranslationMemory:
+    """Sentence-level translation memory with exact and fuzzy matching.
+
+    Entries are keyed by (source lang, target lang, normalized sentence). An
+    exact hash index answers repeated phrases directly; a MinHash index finds
+    near-duplicates whose shingle similarity reaches ``fuzzy_threshold``. A
+    near-duplicate is only reused when it differs by spoken fillers ("um",
+    "okay"); one that changes a number, a negation or any other word is a
+    miss and goes to the translator, so a dosage or a "not" is never carried
+    over from a different sentence. When
+    ``path`` is given, entries are persisted to SQLite with the sentence and
+    its translation encrypted by ``cipher``.
+    """
+
+    def __init__(self, path=None, cipher=None, fuzzy_threshold=0.9, max_entries=50000):
+        self.fuzzy_threshold = fuzzy_threshold
+        self.max_entries = max_entries
+        self.cipher = cipher
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._index = MinHashIndex()
+        self._db = None
+        self.lookups = 0
+        self.exact_hits = 0
+        self.fuzzy_hits = 0
+        self.misses = 0
+        self.saved_calls = 0
+        self.remote_calls = 0
+
+        if path and cipher is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS translation_memory ("
+                "key TEXT PRIMARY KEY, source_lang TEXT, target_lang TEXT, "
+                "source_text TEXT, target_text TEXT, created REAL)"
+            )
+            self._db.commit()
+            self._load()
+
+    @staticmethod
+    def _key(source_lang, target_lang, normalized):
+        return hashlib.sha256(f"{source_lang}\0{target_lang}\0{normalized}".encode()).hexdigest()
+
+    def _load(self):
+        rows = self._db.execute(
+            "SELECT key, source_lang, target_lang, source_text, target_text FROM translation_memory "
+            "ORDER BY created DESC LIMIT ?", (self.max_entries,)
+        ).fetchall()
+        skipped = 0
+        for _, source_lang, target_lang, source_enc, target_enc in rows:
+            source_text = self.cipher.decrypt_text(source_enc)
+            target_text = self.cipher.decrypt_text(target_enc)
+            if source_text is None or target_text is None:
+                # Written under a different ENCRYPTION_KEY
+                skipped += 1
+                continue
+            # Keys are recomputed, so rows written under an older normalization
+            # are found by the current one; the newest row for a key wins
+            normalized = normalize_sentence(source_text)
+            key = self._key(source_lang, target_lang, normalized)
+            if key not in self._entries:
+                self._add_entry(key, source_lang, target_lang, normalized, target_text)
+        if skipped:
+            logging.warning(f"Translation memory skipped {skipped} entries it could not decrypt")
+
+    def _add_entry(self, key, source_lang, target_lang, normalized, translation):
+        signature = self._index.signature(_shingles(normalized))
+        if key in self._entries:
+            self._index.remove(key, self._entries[key]["signature"])
+        elif len(self._entries) >= self.max_entries:
+            oldest = next(iter(self._entries))
+            self._index.remove(oldest, self._entries.pop(oldest)["signature"])
+        self._entries[key] = {
+            "pair": (source_lang, target_lang),
+            "normalized": normalized,
+            "translation": translation,
+            "signature": signature,
+        }
+        self._index.add(key, signature)
+
+    def lookup(self, source_lang, target_lang, sentence):
+        """Return a stored translation for sentence, or None"""
+        normalized = normalize_sentence(sentence)
+        key = self._key(source_lang, target_lang, normalized)
+        with self._lock:
+            self.lookups += 1
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.exact_hits += 1
+                return entry["translation"]
+
+            shingles = _shingles(normalized)
+            signature = self._index.signature(shingles)
+            best, best_score = None, self.fuzzy_threshold
+            for candidate in self._index.candidates(signature):
+                entry = self._entries[candidate]
+                if entry["pair"] != (source_lang, target_lang) or not same_meaning(normalized, entry["normalized"]):
+                    continue
+                score = _jaccard(shingles, _shingles(entry["normalized"]))
+                if score >= best_score:
+                    best, best_score = entry, score
+            if best is not None:
+                self.fuzzy_hits += 1
+                return best["translation"]
+
+            self.misses += 1
+            return None
+
+    def store(self, source_lang, target_lang, sentence, translation):
+        """Record the translation of one sentence"""
+        normalized = normalize_sentence(sentence)
+        if not normalized or not translation:
+            return
+        key = self._key(source_lang, target_lang, normalized)
+        with self._lock:
+            self._add_entry(key, source_lang, target_lang, normalized, translation)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO translation_memory VALUES (?, ?, ?, ?, ?, ?)",
+                        (key, source_lang, target_lang, self.cipher.encrypt_text(sentence),
+                         self.cipher.encrypt_text(translation), time.time())
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logging.error(f"Translation memory write error: {str(e)}")
+
+    def translate(self, text, source_lang, target_lang, remote_translate):
+        """Translate text sentence by sentence, sending only unmatched sentences
+
+        ``remote_translate`` takes a list of sentences and returns their
+        translations in the same order. It is called at most once per text.
+        """
+        parts = split_sentences(text)
+        if not parts:
+            return text
+
+        translations = [self.lookup(source_lang, target_lang, sentence) for sentence, _ in parts]
+        missing = [i for i, translation in enumerate(translations) if translation is None]
+        if missing:
+            remote = remote_translate([parts[i][0] for i in missing])
+            with self._lock:
+                self.remote_calls += 1
+            for i, translation in zip(missing, remote):
+                translations[i] = translation
+                self.store(source_lang, target_lang, parts[i][0], translation)
+        else:
+            with self._lock:
+                self.saved_calls += 1
+
+        joiner = "" if target_lang in _UNSPACED_LANGS else " "
+        output = []
+        for (sentence, separator), translation in zip(parts, translations):
+            output.append(translation or sentence)
+            output.append("\n" if "\n" in separator else joiner)
+        return "".join(output).strip()
+
+    def stats(self):
+        """Return hit counters for the memory"""
+        with self._lock:
+            hits = self.exact_hits + self.fuzzy_hits
+            return {
+                "entries": len(self._entries),
+                "lookups": self.lookups,
+                "exact_hits": self.exact_hits,
+                "fuzzy_hits": self.fuzzy_hits,
+                "misses": self.misses,
+                "hit_rate": hits / self.lookups if self.lookups else 0.0,
+                "remote_calls": self.remote_calls,
+                "saved_calls": self.saved_calls,
+            }
@@ -0,0 +1,147 @@
+import hashlib
+import io
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from dispatcher import dispatcher, request_key
+from resources import registry
+from telemetry import tracer, bind_context
+from translation_memory import split_sentences
+
+
+def _chunk_text(text, max_chars):
+    """Pack whole sentences into chunks of at most max_chars characters"""
+    chunks = []
+    current = ""
+    for sentence, _ in split_sentences(text):
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks or [text]
+
+
+class TTSEngine:
+    """gTTS rendered straight into memory, with an LRU cache and pre-rendering.
+
+    Audio is cached by (text hash, language) and bounded by entry count and
+    total bytes. ``prerender`` starts synthesis on a background pool so that a
+    later ``synthesize`` call for the same text only waits for (or reuses) the
+    work already in flight. Long texts are split at sentence boundaries,
+    synthesized in parallel and concatenated; MP3 frames are self-delimiting so
+    the joined stream plays back as one clip.
+    """
+
+    def __init__(self, max_entries=128, max_bytes=32 * 1024 * 1024, max_workers=4, chunk_chars=200):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.chunk_chars = chunk_chars
+        self._cache = OrderedDict()
+        self._cache_bytes = 0
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        # Separate pools so a pre-render job never waits on its own pool for chunks
+        self._render_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tts-render")
+        self._chunk_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tts-chunk")
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(text, lang):
+        return (hashlib.sha256(text.encode()).hexdigest(), lang)
+
+    def synthesize(self, text, lang):
+        """Return MP3 bytes for text, rendering it if it is not cached yet"""
+        key = self._key(text, lang)
+        with self._lock:
+            audio = self._cache.get(key)
+            if audio is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return audio
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                self.misses += 1
+                future = Future()
+                self._in_flight[key] = future
+        if owner:
+            self._run(future, key, text, lang)
+        return future.result()
+
+    def prerender(self, text, lang):
+        """Start rendering text in the background; returns a Future of the MP3 bytes"""
+        key = self._key(text, lang)
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                return future
+            future = Future()
+            if key in self._cache:
+                future.set_result(self._cache[key])
+                return future
+            self.misses += 1
+            self._in_flight[key] = future
+        self._render_pool.submit(bind_context(self._run), future, key, text, lang)
+        return future
+
+    def put(self, text, lang, audio):
+        """Cache audio rendered elsewhere (e.g. joined sentence clips) for text"""
+        self._store(self._key(text, lang), audio)
+
+    def stats(self):
+        """Return cache counters"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._cache),
+                "bytes": self._cache_bytes,
+                "in_flight": len(self._in_flight),
+            }
+
+    def _run(self, future, key, text, lang):
+        try:
+            chunks = _chunk_text(text, self.chunk_chars)
+            if len(chunks) == 1:
+                audio = self._render_chunk(chunks[0], lang)
+            else:
+                render = bind_context(lambda chunk: self._render_chunk(chunk, lang))
+                audio = b"".join(self._chunk_pool.map(render, chunks))
+            self._store(key, audio)
+            future.set_result(audio)
+        except Exception as e:
+            logging.error(f"Text-to-speech render error: {str(e)}")
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def _render_chunk(self, text, lang):
+        def render():
+            buffer = io.BytesIO()
+            registry.get("tts")(text=text, lang=lang).write_to_fp(buffer)
+            return buffer.getvalue()
+
+        with tracer.stage("tts", bytes_in=len(text)) as span:
+            audio = dispatcher.call("gtts", render, key=request_key(lang, text))
+            span["bytes_out"] = len(audio)
+        return audio
+
+    def _store(self, key, audio):
+        size = len(audio)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._cache:
+                self._cache_bytes -= len(self._cache.pop(key))
+            self._cache[key] = audio
+            self._cache_bytes += size
+            while len(self._cache) > self.max_entries or self._cache_bytes > self.max_bytes:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_bytes -= len(evicted)